@@ -12,8 +12,27 @@
 import math
 import time
 
-from Body import Body, OgiveCylinder
-from OuterBoundary import OuterBoundary, OuterCone
+from .Body import Body, OgiveCylinder, ogiveStations
+from .OuterBoundary import OuterBoundary, OuterCone
+from .Grid import etaGrid, inverseSpacing, scaledStep
+
+class Station:
+    '''Copy of the solver state needed to write one output station'''
+
+    def __init__(self,solver,mit,delm):
+        self.neta  = solver.neta
+        self.hinf  = solver.hinf
+        self.pinf  = solver.pinf
+        self.xminf = solver.xminf
+        self.march = solver.march
+        self.mit   = mit
+        self.delm  = delm
+        self.eta   = solver.eta
+        self.x     = solver.x.copy()
+        self.rho   = solver.rho.copy()
+        self.u     = solver.u.copy()
+        self.v     = solver.v.copy()
+        self.p     = solver.p.copy()
 
 class AXIsolver:
     '''Axisymettric Parabolized Navier Stokes Solver'''
@@ -22,8 +41,124 @@ class AXIsolver:
         '''Initialize solver with input values'''
         self.values = values
         self.initSolver()
-        self.fout = open("solution.dat",'w')
-        
+
+        # objects called with the solver after every precor step
+        self.observers = []
+
+        # background station writer (see runSolver)
+        self.writer = None
+
+        # opt-in phase timers and counters (see SolverStats)
+        self.stats = None
+        if values.get('stats', False):
+            self.enableStats()
+
+        # station output, None disables the file. The 'binary' format
+        # writes full precision columns to a .npy file (see SolutionFile).
+        # The files are opened when the run starts (see openOutput)
+        self.fout = None
+        self.bout = None
+        self.outpos = None
+
+        # periodic checkpoints (see Checkpoint)
+        self.checkpointer = None
+        if values.get('checkpoint'):
+            from .Checkpoint import Checkpointer
+            self.checkpointer = Checkpointer(values['checkpoint'],
+                                             values.get('checkpoint_every',
+                                                        100))
+
+        # converged conical solutions shared between runs (see ConicalCache)
+        self.conical = None
+        if values.get('conical_cache'):
+            from .ConicalCache import ConicalCache
+            self.conical = ConicalCache(values['conical_cache'],
+                                        values.get('conical_cache_size',
+                                                   64*1024*1024))
+
+        # conical iteration residuals and acceleration (see
+        # ConicalIteration), None keeps the plain delm test
+        self.iteration = None
+        if any(key.startswith('conical_') and key not in
+               ('conical_cache', 'conical_cache_size') for key in values):
+            from .ConicalIteration import ConicalIteration
+            self.iteration = ConicalIteration.fromValues(values)
+
+        # adaptive marching step (see StepControl), None keeps the fixed
+        # 0.5% growth per step. Stretched grids take it by default, the
+        # fixed growth outruns their stable step
+        self.stepper = None
+        if values.get('step_control', self.grid != 'uniform'):
+            from .StepControl import StepControl
+            self.stepper = StepControl.fromValues(values, self.dxi)
+
+        # full field record of the marching stations (see History)
+        self.history = None
+        if values.get('history'):
+            from .History import FieldHistory
+            self.history = FieldHistory.fromValues(values, self.neta)
+            self.observers.append(self.history)
+
+    def openOutput(self):
+        '''Open the station output file and the field history
+
+        A run resumed from a checkpoint reopens the files and cuts them
+        back to where they stood when the checkpoint was taken.
+        '''
+        if self.history:
+            self.history.start()
+        if self.values.get('format', 'text') == 'binary':
+            output = self.values.get('output', "solution.npy")
+            if output:
+                from .SolutionFile import SolutionWriter
+                self.bout = SolutionWriter(output, self.neta, count=self.outpos)
+        else:
+            output = self.values.get('output', "solution.dat")
+            if output:
+                if self.outpos is None:
+                    self.fout = open(output,'w')
+                    self.writeGrid()
+                else:
+                    self.fout = open(output,'r+')
+                    self.fout.truncate(self.outpos)
+                    self.fout.seek(self.outpos)
+
+    def writeGrid(self):
+        '''Start a text output file with the eta grid if it is stretched
+
+        Readers take a file without this line to be on the uniform grid,
+        so the original output format is unchanged.
+        '''
+        if self.grid != 'uniform':
+            self.fout.write("Eta = %s\n" % " ".join(
+                "%.10f" % e for e in self.eta[1:self.neta+1]))
+
+    def outputPosition(self):
+        '''Return how much station output has been written so far'''
+        if self.writer:
+            self.writer.drain()
+        if self.fout:
+            self.fout.flush()
+            return self.fout.tell()
+        if self.bout:
+            return self.bout.count
+        return 0
+
+    def restart(self,path):
+        '''Resume this solver from a checkpoint file'''
+        from .Checkpoint import loadCheckpoint
+        loadCheckpoint(self, path)
+
+    def finite(self):
+        '''Return True while every column value is a finite number'''
+        return math.isfinite(sum(self.rho) + sum(self.u) + sum(self.v) +
+                             sum(self.p))
+
+    def enableStats(self):
+        '''Record phase times and hot path counters in self.stats'''
+        from .SolverStats import SolverStats
+        self.stats = SolverStats()
+        self.stats.attach(self)
 
     def initSolver(self):
         '''Initialize flow field data'''
@@ -33,8 +168,10 @@ class AXIsolver:
         self.convrg  = False
         self.delm    = 0
         self.mit     = 0
+        self.xstep   = 0
         self.betloc  = False
         self.doprint = True
+        self.status  = 'running'
 
         # create empty lists for the variables
         self.eta = []
@@ -67,19 +204,8 @@ class AXIsolver:
         self.thetas  = self.thetas* drcon
 
         # body definition
-        self.x0  = 5.0
-        self.xl1 = 22.5
-        self.xl2 = self.xl1 + 27.5
-        self.xh  = 4.25
-        self.rn  = self.xh/2.0+self.xl1*self.xl1/(2.0*self.xh)
-        self.thetab  = math.asin((self.xl1-self.x0)/self.rn)
-        self.rb0 = self.xh - self.rn + math.sqrt(self.rn**2-(self.xl1-self.x0)**2)
-        self.dx0 = self.rb0/math.tan(self.thetab) - self.x0
-
-        self.x0  = self.x0 + self.dx0
-        self.xl1 = self.xl1 + self.dx0
-        self.xl2 = self.xl2 + self.dx0
-        
+        self.x0, self.xl1, self.xl2 = ogiveStations()
+
         # computational grid definitions
         self.dxi    = self.values['dxi']
         self.neta   = self.values['neta']
@@ -105,10 +231,32 @@ class AXIsolver:
             self.f1  += [0.0]
             self.f2  += [0.0]
             et  = et + self.deta
+
+        # a stretched grid replaces the uniform eta values (see Grid). The
+        # sweep differences each interval with its inverse spacing
+        self.grid = self.values.get('grid', 'uniform')
+        if self.grid == 'uniform':
+            self.dinv = inverseSpacing(self.eta, self.deta)
+        else:
+            self.eta = etaGrid(self.neta, self.grid,
+                               self.values.get('grid_stretch'))
+            self.dinv = inverseSpacing(self.eta)
+
+        # dxi is the step for the uniform 31 point grid. Step control (on
+        # by default for a stretched grid) starts from it cut to the
+        # smallest spacing and grows it back
+        if self.values.get('step_control', self.grid != 'uniform'):
+            self.dxi = scaledStep(self.eta, self.dxi)
     
         # set no slip boundary condition
         self.u[1]    = 0.0
         self.v[1]    = 0.0
+
+        # a converged column from a nearby case replaces the free stream
+        # start of the conical iteration (see WarmStart)
+        if self.values.get('seed') is not None:
+            from .WarmStart import applySeed
+            applySeed(self, self.values['seed'])
     
         # body and shock variables
         #   Since the original code used 1,2 for indices, define 3 values here
@@ -117,6 +265,9 @@ class AXIsolver:
         self.rs  = [ 0.0, 0.0, 0.0, 0.0 ]
         self.rsx = [ 0.0, 0.0, 0.0, 0.0 ]
         self.x   = [ 0.0, 0.0, 0.0, 0.0 ]
+
+        # body and shock data by station x (see geometry)
+        self.stations = {}
     
         #self.xmu1    = 0.0
         #self.xmu2    = 0.0
@@ -127,6 +278,13 @@ class AXIsolver:
     def body(self):
         '''Fill in body and shock data for given X'''
 
+        # pick the next step from the current column, once the first
+        # conical iteration has formed one
+        if(self.stepper and self.mit > 0):
+            dxi = self.stepper(self)
+            self.beta = self.beta*self.dxi/dxi
+            self.dxi = dxi
+
         # update the x location
         if(self.march):
             # when marching, advance x by dxi
@@ -142,52 +300,93 @@ class AXIsolver:
         self.xmu2 = self.xmuinf * self.x[2]
         
         # if we are marching accelerate the marching step size
-        if(self.march):
+        if(self.march and not self.stepper):
             self.dxi = 1.005 * self.dxi
             self.beta = self.beta/1.005
         # now get the body and shock data
-        bl = self.mybody.bodylength
-        self.rs[1] = self.shock.body.getRadius(self.x[1]*bl)/bl
-        self.rs[2] = self.shock.body.getRadius(self.x[2]*bl)/bl
-        self.rsx[1] = self.shock.body.getSlope(self.x[1]*bl)
-        self.rsx[2] = self.shock.body.getSlope(self.x[2]*bl)
-        
- 
-            
-        self.rb[1] = self.mybody.body.getRadius(self.x[1]*bl)/bl
-        self.rb[2] = self.mybody.body.getRadius(self.x[2]*bl)/bl
-        self.rbx[1] = self.mybody.body.getSlope(self.x[1]*bl)
-        self.rbx[2] = self.mybody.body.getSlope(self.x[2]*bl)
+        if(self.march):
+            # station 1 is the old station 2
+            self.rs[1]  = self.rs[2]
+            self.rsx[1] = self.rsx[2]
+            self.rb[1]  = self.rb[2]
+            self.rbx[1] = self.rbx[2]
+        else:
+            self.rs[1], self.rsx[1], self.rb[1], self.rbx[1] = \
+                self.geometry(self.x[1])
+        self.rs[2], self.rsx[2], self.rb[2], self.rbx[2] = \
+            self.geometry(self.x[2])
+
+    def geometry(self,x):
+        '''Return shock and body radius and slope at nondimensional x'''
+        # the conical iteration comes back to its two stations every
+        # pass, a marching x is new every step: keep the two latest
+        g = self.stations.pop(x, None)
+        if g is None:
+            bl = self.mybody.bodylength
+            xb = x*bl
+            g = (self.shock.body.getRadius(xb)/bl,
+                 self.shock.body.getSlope(xb),
+                 self.mybody.body.getRadius(xb)/bl,
+                 self.mybody.body.getSlope(xb))
+            if len(self.stations) > 1:
+                del self.stations[next(iter(self.stations))]
+        self.stations[x] = g
+        return g
+
     #--------------------------------------------------------------------
 
     def printer(self,mit,delm):
         '''ancient ascii printer plotting scheme'''
+        station = Station(self,mit,delm)
+        if self.writer:
+            self.writer.put(station)
+        else:
+            self.writeStation(station)
+
+    def writeStation(self,st):
+        '''Format one station snapshot to the console and output files'''
         print("Flow Field Properties")
-        if(self.march):
-            print("Axial Location %10.5f" % self.x[2])
+        if(st.march):
+            print("Axial Location %10.5f" % st.x[2])
         else:
-            print("Tangent Cone Iteration %3d (%10.5f)" % (mit, delm))
+            print("Tangent Cone Iteration %3d (%10.5f)" % (st.mit, st.delm))
         print("  I      Rho         U          V          P          T          M        Pt")
-        self.fout.write("Axial Location = %10.f\n" % self.x[2])
-        for i in range ( self.neta, 0, -1 ):
-            t = self.hinf - 0.5*(self.u[i]**2 + self.v[i]**2)
-            pt2 = self.p[i]
+        if self.bout:
+            from .SolutionFile import stationColumns
+            self.bout.append(stationColumns(st))
+        if self.fout:
+            self.fout.write("Axial Location = %10.f\n" % st.x[2])
+        for i in range ( st.neta, 0, -1 ):
+            t = st.hinf - 0.5*(st.u[i]**2 + st.v[i]**2)
+            pt2 = st.p[i]
             ptg = "----------"
             xm = 0.0
             if(i != 1):
                 ptg = "|          ";
-                xm = math.sqrt((self.u[i]**2+self.v[i]**2)/(0.4*t))
-                pt2 = self.p[i]/self.pinf*(xm/self.xminf)**7 \
-                    *((7.0*self.xminf**2-1.0)/(7.0*xm**2-1.0))**2.5
+                xm = math.sqrt((st.u[i]**2+st.v[i]**2)/(0.4*t))
+                pt2 = st.p[i]/st.pinf*(xm/st.xminf)**7 \
+                    *((7.0*st.xminf**2-1.0)/(7.0*xm**2-1.0))**2.5
             j = int(pt2/3.0 *10.0) +1
-            ptg = ""
-            for k in range (1,j+1):
-                ptg += "*"
+            ptg = "*" * j
             line = " %2d %10.5f %10.5f %10.5f %10.5f %10.5f %10.5f %10.5f" % \
-                (i,self.rho[i],self.u[i],self.v[i],self.p[i],t, xm, pt2)
+                (i,st.rho[i],st.u[i],st.v[i],st.p[i],t, xm, pt2)
             print(line)
-            self.fout.write(line)
-            self.fout.write('\n')
+            if self.fout:
+                self.fout.write(line)
+                self.fout.write('\n')
+
+    def closeOutput(self):
+        '''Drain the background writer and close the output files'''
+        try:
+            if self.writer:
+                writer = self.writer
+                self.writer = None
+                writer.close()
+        finally:
+            if self.fout:
+                self.fout.close()
+            if self.bout:
+                self.bout.close()
             
     #--------------------------------------------------------------------
     def solve(self,i,aa,bb,cc):
@@ -256,7 +455,7 @@ class AXIsolver:
                 if(i == 2):
                     etaxm=((self.eta[i]-1.0)*self.rbx[1] -
                             self.eta[i]*self.rsx[1])*etar
-                    den1 = 1./self.deta
+                    den1 = self.dinv[i-1]
                     uetam = (self.u[i]-self.u[i-1])*den1
                     vetam = (self.v[i]-self.v[i-1])*den1
                     deldvm = etaxm*uetam+etar*vetam+self.v[i]/r1
@@ -276,6 +475,7 @@ class AXIsolver:
                 etaxp = ((self.eta[i+1]-1.0)*self.rbx[1] - \
                             self.eta[i+1]*self.rsx[1])*etar 
                 etaxpp=etaxp
+                den1 = self.dinv[i]
                 uetap = (self.u[i+1]-self.u[i])*den1
                 vetap = (self.v[i+1]-self.v[i])*den1
                 if(i>2):
@@ -342,8 +542,8 @@ class AXIsolver:
                 if(i == 3):
                     etaxm=((self.eta[i-2]-1.0)*self.rbx[2]- \
                                 self.eta[i-2]*self.rsx[2])*etar
-                    uetam = (w[2][2]-w[2][1])*den1
-                    vetam = (w[3][2]-w[3][1])*den1
+                    uetam = (w[2][2]-w[2][1])*self.dinv[i-2]
+                    vetam = (w[3][2]-w[3][1])*self.dinv[i-2]
                     deldvm = etaxm*uetam+etar*vetam+w[3][1]/r2m
                     txxm = 2.0*self.xmu1*etaxm*uetam- \
                         2.0/3.0*self.xmu1*self.beta*deldvm
@@ -359,8 +559,8 @@ class AXIsolver:
 
                 etaxp = ((self.eta[i-1]-1.0)*self.rbx[2]- \
                             self.eta[i-1]*self.rsx[2])*etar 
-                uetap = (w[2][3]-w[2][2])*den1
-                vetap = (w[3][3]-w[3][2])*den1
+                uetap = (w[2][3]-w[2][2])*self.dinv[i-1]
+                vetap = (w[3][3]-w[3][2])*self.dinv[i-1]
                 deldvp = etaxp*uetap+etar*vetap+w[3][2]*r2
                 txxp = 2.0*self.xmu1*etaxp*uetap- \
                     2.0/3.0*self.xmu1*self.beta*deldvp
@@ -385,14 +585,15 @@ class AXIsolver:
                 h3 = -sigpp
                 h2 = 0.0
                 h1 = 0.0
-                ep1 = 0.5*(ep1 + xep1-self.dxi*etaxp*den1*(e1pc-e1mc) \
-                    -self.dxi*etar*den1*(f1pc-f1mc)+self.dxi*h1)
+                den1c = self.dinv[i-2]
+                ep1 = 0.5*(ep1 + xep1-self.dxi*etaxp*den1c*(e1pc-e1mc) \
+                    -self.dxi*etar*den1c*(f1pc-f1mc)+self.dxi*h1)
                     
-                ep2 = 0.5*(ep2 + xep2-self.dxi*etaxp*den1*(e2pc-e2mc) \
-                    -self.dxi*etar*den1*(f2pc-f2mc)+self.dxi*h2)
+                ep2 = 0.5*(ep2 + xep2-self.dxi*etaxp*den1c*(e2pc-e2mc) \
+                    -self.dxi*etar*den1c*(f2pc-f2mc)+self.dxi*h2)
 
-                ep3 = 0.5*(ep3 + xep3-self.dxi*etaxp*den1*(e3pc-e3mc) \
-                    -self.dxi*etar*den1*(f3pc-f3mc)+self.dxi*h3)
+                ep3 = 0.5*(ep3 + xep3-self.dxi*etaxp*den1c*(e3pc-e3mc) \
+                    -self.dxi*etar*den1c*(f3pc-f3mc)+self.dxi*h3)
                 aa = ep1/r2
                 bb = ep2/r2
                 cc = ep3/r2
@@ -421,53 +622,111 @@ class AXIsolver:
     #--------------------------------------------------------------------
 
     def runSolver(self):
-        # Main computational loop
-        mit = 0
-
-        xstep = 0
-        self.body()
-        if self.doprint > 0:
-            self.printer(mit,self.delm)
-        convrg = False
-        tic = time.perf_counter()
-        while convrg == False:
-            self.delm = 0.0
+        # Main computational loop (picks up where a restart left off)
+        if self.conical and self.mit == 0:
+            self.conical.fetch(self)
+        mit = self.mit
+        xstep = self.xstep
+        if mit == 0:
             self.body()
-            self.precor()
-            mit = mit + 1
-            if(self.march):
-                xstep = xstep + 1
-
-                # see if we reached he end of the body
-                if(self.x[2] > 1.0 - self.dxi):
-                        convrg = True
-                        print("Solution ending at x = %10.6f" % self.x[2])
-                        print("Axial steps: %d\n" % xstep)
-                        toc = time.perf_counter()
-                        print(f"  Total time: {toc - tic:0.4f} seconds")
-                # otherwise generate plot at xplot stations
-                elif(self.x[2] > self.xplot):
-                    if self.doprint > 0:
-                        self.printer(mit,self.delm)
-
-                    # set for next plot station
-                    self.xplot = self.xplot+self.dplot
+
+        self.openOutput()
+
+        # station output can be handed to a background writer thread
+        # holding up to values['writer'] stations
+        if self.values.get('writer', 0) and self.doprint > 0:
+            from .StationWriter import StationWriter
+            self.writer = StationWriter(self.writeStation,
+                                        self.values['writer'])
+        try:
+            if mit == 0 and self.doprint > 0:
+                self.printer(mit,self.delm)
+            convrg = False
+            tic = time.perf_counter()
+            while convrg == False:
+                self.delm = 0.0
+                self.body()
+                self.precor()
+                mit = mit + 1
+                if(self.march):
+                    xstep = xstep + 1
+
+                # the counts observers see are those of this step
+                self.mit   = mit
+                self.xstep = xstep
+
+                # a NaN drops out of delm, so it would pass the
+                # convergence test and march to the end of the body
+                if not self.finite():
+                    self.status = 'diverged'
+                    print("Run stopped, solution diverged on iteration %4d"
+                          % mit)
+                    break
+                if self.iteration and not self.march:
+                    self.iteration(self, mit)
+                for obs in self.observers:
+                    obs(self)
+                if(self.march):
+                    # see if we reached he end of the body
+                    if(self.x[2] > 1.0 - self.dxi):
+                            convrg = True
+                            self.status = 'converged'
+                            print("Solution ending at x = %10.6f" % self.x[2])
+                            print("Axial steps: %d\n" % xstep)
+                            toc = time.perf_counter()
+                            print(f"  Total time: {toc - tic:0.4f} seconds")
+                    # otherwise generate plot at xplot stations
+                    elif(self.x[2] > self.xplot):
+                        if self.doprint > 0:
+                            self.printer(mit,self.delm)
+
+                        # set for next plot station
+                        self.xplot = self.xplot+self.dplot
                     
-            else:
-                # see if we have reached nplot iterations
-                if((mit/self.nplot*self.nplot) == mit):
-                    if self.doprint >0:
-                        self.printer(mit,self.delm)
-
-                # check conical flow convergence
-                if(self.delm <= 0.0001):
-                    print("Conical solution converged on iteration %4d" % mit)
-                    self.march = True
                 else:
-                    if(mit >= self.nitmax):
-                        convrg = True
-                        print("Run stopped (nitmax = %4d)" % self.nitmax)
-        self.fout.close()
+                    # see if we have reached nplot iterations
+                    if((mit/self.nplot*self.nplot) == mit):
+                        if self.doprint >0:
+                            self.printer(mit,self.delm)
+
+                    # check conical flow convergence
+                    if self.iteration:
+                        done = self.iteration.converged(self)
+                    else:
+                        # delm grows with the step, the test is set for
+                        # the step given in the inputs
+                        done = self.delm <= 0.0001*self.dxi/self.values['dxi']
+                    if(done):
+                        print("Conical solution converged on iteration %4d" % mit)
+                        self.march = True
+                        if self.conical:
+                            self.conical.store(self)
+                    else:
+                        if self.iteration and self.iteration.stagnated:
+                            convrg = True
+                            self.status = 'stagnated'
+                            print("Run stopped, conical iteration stagnated "
+                                  "on iteration %4d" % mit)
+                        elif(mit >= self.nitmax):
+                            convrg = True
+                            self.status = 'stopped'
+                            print("Run stopped (nitmax = %4d)" % self.nitmax)
+
+                if self.checkpointer and not convrg:
+                    self.checkpointer(self)
+        finally:
+            self.closeOutput()
+            if self.stepper:
+                self.stepper.write()
+            if self.iteration:
+                self.iteration.write()
+            if self.history:
+                self.history.close()
+        self.mit     = mit
+        self.xstep   = xstep
+        self.elapsed = time.perf_counter() - tic
+        if self.stats:
+            self.stats.finish(self)
 
 #================================================================================
 if __name__ == '__main__':
@@ -493,9 +752,6 @@ if __name__ == '__main__':
     solver.mybody   = OgiveCylinder()
     solver.shock    = OuterCone(v['thetas'],solver.mybody.bodylength)
 
-    # initialize the solver for this case
-    solver.initSolver()
-
     # run the solver and display on console
     solver.runSolver()
                         
@@ -0,0 +1,270 @@
+#--------------------------------------------------------------------
+# File:     ArraySolver.py
+#--------------------------------------------------------------------
+
+# Axisymmetric Navier Stokes Solver - NumPy column engine
+#   The predictor and corrector sweeps of AXIsolver.precor are done
+#   over the whole eta column at once. The arithmetic follows the
+#   original sweep term for term so results match the reference solver.
+
+import time
+
+import numpy as np
+
+from .AXIsolver import AXIsolver
+from .Body import OgiveCylinder
+from .OuterBoundary import OuterCone
+from .Primitives import solvePrimitives
+
+def column(a,dtype=None):
+    '''Broadcast a per-case value against the eta axis'''
+    if np.ndim(a):
+        return np.asarray(a, dtype=dtype)[..., np.newaxis]
+    return a if dtype is None else dtype.type(a)
+
+DTYPES = ('float64', 'float32')
+
+def workingDtype(values):
+    '''Return the field dtype asked for by values['dtype']'''
+    name = str(values.get('dtype', 'float64'))
+    if name not in DTYPES:
+        raise ValueError("unsupported dtype '%s' (use one of %s)" %
+                         (name, ", ".join(DTYPES)))
+    return np.dtype(name)
+
+def precorSweep(eta,rho,u,v,p,rb,rbx,rs,rsx,xmu1,beta,dxi,dinv,hinf,pinf,
+                betloc,stats=None):
+    '''MacCormack's Predictor Corrector sweep over whole eta columns
+
+    rho, u, v and p have shape (..., neta+1) and are updated in place.
+    rb, rbx, rs and rsx are indexed by station (1, 2) like the solver
+    lists. The station values and xmu1, beta, dxi, hinf, pinf and betloc
+    are scalars for a single column or arrays over the leading axes (one
+    value per case). dinv holds the inverse eta spacings, dinv[j] =
+    1/(eta[j+1] - eta[j]) (see Grid). The sweep works in the dtype of
+    rho (float64 or float32). Returns the max pressure increase of each
+    column (NaN changes ignored) and the updated betloc flags. stats, if
+    given, is a SolverStats charged with the predictor, solve and
+    corrector times.
+    '''
+
+    # The predictor only reads the old column and the corrector only
+    # reads the predicted column plus the old value at its own point,
+    # so the two passes can be done one after the other. The only
+    # coupling left from the point by point sweep is the betloc flag.
+
+    gamma = 1.4
+    n = rho.shape[-1] - 1
+    dt = rho.dtype
+    dinv = np.asarray(dinv, dtype=dt)
+    rb1, rbx1, rs1, rsx1 = column(rb[1], dt), column(rbx[1], dt), \
+        column(rs[1], dt), column(rsx[1], dt)
+    rb2, rbx2, rs2, rsx2 = column(rb[2], dt), column(rbx[2], dt), \
+        column(rs[2], dt), column(rsx[2], dt)
+    xmu1 = column(xmu1, dt)
+    beta = column(beta, dt)
+    dxi = column(dxi, dt)
+    h1 = 0.0
+    h2 = 0.0
+    if stats is not None:
+        clock = time.perf_counter
+        betloc0 = betloc
+        tic = clock()
+
+    # predictor ===============================================================
+    # fluxes at points 2 -> neta, backward differences in eta
+    k  = slice(2, n+1)
+    km = slice(1, n)
+    etar = 1.0/(rs1-rb1)
+    r1 = rb1 + eta[k]*(rs1-rb1)
+    etax = ((eta[k]-1.0)*rbx1 - eta[k]*rsx1)*etar
+    ueta = (u[..., k]-u[..., km])*dinv[km]
+    veta = (v[..., k]-v[..., km])*dinv[km]
+    deldv = etax*ueta+etar*veta+v[..., k]*r1
+    deldv[..., :1] = etax[..., :1]*ueta[..., :1]+etar*veta[..., :1] \
+        +v[..., 2:3]/r1[..., :1]
+    txx = 2.0*xmu1*etax*ueta - 2.0/3.0*xmu1*beta*deldv
+    sigxr = xmu1*(etax*veta+etar*ueta)
+    trr = 2.0*xmu1*etar*veta - 2.0/3.0*xmu1*beta*deldv
+    e1 = rho[..., k]*u[..., k]*r1
+    e2 = e1*u[..., k]-txx*r1+p[..., k]*r1
+    e2[..., :1] = e1[..., :1]*u[..., 2:3]+p[..., 2:3]*r1[..., :1] \
+        -txx[..., :1]*r1[..., :1]
+    e3 = e1*v[..., k]-sigxr*r1
+    f1 = rho[..., k]*v[..., k]*r1
+    f2 = f1*u[..., k]-sigxr*r1
+    f3 = f1*v[..., k]+p[..., k]*r1-trr*r1
+
+    # predicted points 2 -> neta-1
+    pts = slice(2, n)
+    r1 = r1[..., :-1]
+    etaxm = etax[..., :-1]
+    ep1 = rho[..., pts]*u[..., pts]*r1
+    ep2 = ep1*u[..., pts]+p[..., pts]*r1
+    ep3 = ep1*v[..., pts]
+    sigpp = -p[..., pts]+2.0*xmu1*v[..., pts]/r1 \
+        -2.0/3.0*xmu1*beta*deldv[..., :-1]
+    h3 = -sigpp
+    den1 = dinv[pts]
+    ep1 = ep1 -dxi*etaxm*den1*(e1[..., 1:]-e1[..., :-1]) - \
+        dxi*etar*den1*(f1[..., 1:]-f1[..., :-1])+dxi*h1
+    ep2 = ep2 -dxi*etaxm*den1*(e2[..., 1:]-e2[..., :-1]) - \
+        dxi*etar*den1*(f2[..., 1:]-f2[..., :-1])+dxi*h2
+    ep3 = ep3 -dxi*etaxm*den1*(e3[..., 1:]-e3[..., :-1]) - \
+        dxi*etar*den1*(f3[..., 1:]-f3[..., :-1])+dxi*h3
+    r2 = rb2+eta[pts]*(rs2-rb2)
+    if stats is not None:
+        toc = clock()
+        stats.add('predictor', toc - tic)
+        tic = toc
+    rr, uu, vv, pp, hits = solvePrimitives(ep1/r2, ep2/r2, ep3/r2,
+                                           hinf, betloc, stats)
+    if stats is not None:
+        toc = clock()
+        stats.add('solve', toc - tic)
+        tic = toc
+
+    # working column: wall (1), predicted (2 -> neta-1), outer (neta)
+    wr = np.empty(rho.shape, dtype=dt)
+    wu = np.empty(rho.shape, dtype=dt)
+    wv = np.empty(rho.shape, dtype=dt)
+    wp = np.empty(rho.shape, dtype=dt)
+    wr[..., pts] = rr
+    wu[..., pts] = uu
+    wv[..., pts] = vv
+    wp[..., pts] = pp
+    wp[..., 1] = wp[..., 2]
+    wu[..., 1] = 0.0
+    wv[..., 1] = 0.0
+    wr[..., 1:2] = gamma*wp[..., 1:2]/((gamma - 1)*column(hinf))
+    wr[..., n] = 1.0
+    wu[..., n] = 1.0
+    wv[..., n] = 0.0
+    wp[..., n:] = column(pinf)
+
+    # corrector ===============================================================
+    # fluxes at points 1 -> neta-1, forward differences in eta
+    k  = slice(1, n)
+    kp = slice(2, n+1)
+    etar = 1.0/(rs2-rb2)
+    r2 = rb2 + eta[k]*(rs2-rb2)
+    etax = ((eta[k]-1.0)*rbx2-eta[k]*rsx2)*etar
+    ueta = (wu[..., kp]-wu[..., k])*dinv[k]
+    veta = (wv[..., kp]-wv[..., k])*dinv[k]
+    deldv = etax*ueta+etar*veta+wv[..., k]*r2
+    deldv[..., :1] = etax[..., :1]*ueta[..., :1]+etar*veta[..., :1] \
+        +wv[..., 1:2]/r2[..., :1]
+    txx = 2.0*xmu1*etax*ueta-2.0/3.0*xmu1*beta*deldv
+    sigxr = xmu1*(etax*veta+etar*ueta)
+    trr = 2.0*xmu1*etar*veta-2.0/3.0*xmu1*beta*deldv
+    e1 = wr[..., k]*wu[..., k]*r2
+    e2 = e1*wu[..., k]-txx*r2+wp[..., k]*r2
+    e3 = e1*wv[..., k]-sigxr*r2
+    f1 = wr[..., k]*wv[..., k]*r2
+    f2 = f1*wu[..., k]-sigxr*r2
+    f3 = f1*wv[..., k]+wp[..., k]*r2-trr*r2
+
+    # corrected points 2 -> neta-1
+    r1 = rb1 + eta[pts]*(rs1-rb1)
+    xep1 = rho[..., pts]*u[..., pts]*r1
+    xep2 = xep1 * u[..., pts]+p[..., pts]*r1
+    xep3 = xep1*v[..., pts]
+    r2 = r2[..., 1:]
+    etaxp = etax[..., 1:]
+    ep1 = wr[..., pts]*wu[..., pts]*r2
+    ep2 = ep1*wu[..., pts]+wp[..., pts]*r2
+    ep3 = ep1*wv[..., pts]
+    sigpp = -wp[..., pts]+2.0*xmu1*wv[..., pts]/r2- \
+        2.0/3.0*xmu1*beta*deldv[..., 1:]
+    h3 = -sigpp
+    den1 = dinv[1:n-1]
+    ep1 = 0.5*(ep1 + xep1-dxi*etaxp*den1*(e1[..., 1:]-e1[..., :-1]) \
+        -dxi*etar*den1*(f1[..., 1:]-f1[..., :-1])+dxi*h1)
+    ep2 = 0.5*(ep2 + xep2-dxi*etaxp*den1*(e2[..., 1:]-e2[..., :-1]) \
+        -dxi*etar*den1*(f2[..., 1:]-f2[..., :-1])+dxi*h2)
+    ep3 = 0.5*(ep3 + xep3-dxi*etaxp*den1*(e3[..., 1:]-e3[..., :-1]) \
+        -dxi*etar*den1*(f3[..., 1:]-f3[..., :-1])+dxi*h3)
+
+    # the point by point sweep reduces predictor points 2 and 3
+    # before the first corrector point
+    betloc = np.logical_or(betloc, hits[..., :2].any(axis=-1))
+    if stats is not None:
+        toc = clock()
+        tcorr = toc - tic
+        tic = toc
+    rr, uu, vv, pp, chits = solvePrimitives(ep1/r2, ep2/r2, ep3/r2,
+                                            hinf, betloc, stats)
+    betloc = betloc | hits.any(axis=-1) | chits.any(axis=-1)
+    if stats is not None:
+        toc = clock()
+        stats.add('solve', toc - tic)
+        tic = toc
+        stats.count('betloc_activations',
+                    int(np.count_nonzero(betloc & ~np.asarray(betloc0))))
+
+    # convergence depends on the max change in pressure
+    delm = np.fmax.reduce(pp - p[..., pts], axis=-1)
+    rho[..., pts] = rr
+    u[..., pts] = uu
+    v[..., pts] = vv
+    p[..., pts] = pp
+
+    # Body conditions
+    p[..., 1] = p[..., 2]
+    rho[..., 1:2] = gamma*p[..., 1:2]/((gamma - 1)*column(hinf))
+    if stats is not None:
+        stats.add('corrector', tcorr + clock() - tic)
+    return delm, betloc
+
+class ArraySolver(AXIsolver):
+    '''Axisymmetric PNS solver using whole-column array sweeps'''
+
+    def initSolver(self):
+        '''Initialize flow field data as NumPy arrays
+
+        values['dtype'] picks the working precision, 'float64' (the
+        default) or 'float32'.
+        '''
+        AXIsolver.initSolver(self)
+        self.dtype = workingDtype(self.values)
+        self.eta = np.array(self.eta, dtype=self.dtype)
+        self.dinv = np.array(self.dinv, dtype=self.dtype)
+        self.rho = np.array(self.rho, dtype=self.dtype)
+        self.u   = np.array(self.u, dtype=self.dtype)
+        self.v   = np.array(self.v, dtype=self.dtype)
+        self.p   = np.array(self.p, dtype=self.dtype)
+
+    def finite(self):
+        '''Return True while every column value is a finite number'''
+        return bool(np.isfinite(self.rho).all() and np.isfinite(self.u).all()
+                    and np.isfinite(self.v).all() and
+                    np.isfinite(self.p).all())
+
+    #--------------------------------------------------------------------
+    def precor(self):
+        '''MacCormack's Predictor Corrector Solver (whole column)'''
+        delm, betloc = precorSweep(self.eta, self.rho, self.u, self.v,
+                                   self.p, self.rb, self.rbx, self.rs,
+                                   self.rsx, self.xmu1, self.beta, self.dxi,
+                                   self.dinv, self.hinf, self.pinf,
+                                   self.betloc, self.stats)
+        self.delm = max(self.delm, delm)
+        self.betloc = bool(betloc)
+
+#================================================================================
+if __name__ == '__main__':
+
+    from .main import DEFAULTS
+
+    # test case initial data
+    v = dict(DEFAULTS)
+
+    # create a solver object
+    solver          = ArraySolver(v)
+
+    # define the body and outer boundary
+    solver.mybody   = OgiveCylinder()
+    solver.shock    = OuterCone(v['thetas'],solver.mybody.bodylength)
+
+    # run the solver and display on console
+    solver.runSolver()
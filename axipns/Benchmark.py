@@ -0,0 +1,272 @@
+#--------------------------------------------------------------------
+# File:     Benchmark.py
+#--------------------------------------------------------------------
+
+# Solver benchmarks
+#   Times the pieces of a run for every installed backend (see Backends)
+#   over a few grid sizes and step sizes:
+#
+#       conical-iter    one tangent cone iteration (body + precor)
+#       marching-step   one marching step (body + precor)
+#       precor          one predictor corrector sweep
+#       solve           the primitive reduction, per point
+#       geometry        Body getRadius/getSlope, per call
+#
+#   These are per iteration costs: each is timed over a fixed number of
+#   iterations from the free stream start, not over a conical start or
+#   march run to convergence, so the whole suite takes seconds. Each figure is the minimum over --repeat short batches of
+#   --steps calls; the minimum is the run least disturbed by the rest of
+#   the machine. Results go to a JSON file with the machine details and
+#   are checked against the baseline kept in the repository:
+#
+#       python -m axipns.Benchmark --out bench.json --baseline bench_baseline.json
+#
+#   Any time more than --threshold slower than the baseline is flagged
+#   and the exit status is 1. A baseline from another machine is only
+#   comparable in broad terms, and the report says so. --update rewrites
+#   the baseline from this run. A missing baseline is written from the
+#   current run, except with --ci (or the CI environment variable set),
+#   where it is an error: a check against itself would always pass.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import timeit
+
+import numpy as np
+
+from .Backends import BACKENDS, available
+from .Body import OgiveCylinder
+from .main import DEFAULTS
+from .OuterBoundary import OuterCone
+from .Primitives import solvePrimitives
+
+NETAS = (31, 101, 501)
+DXIS  = (0.0001, 0.0004)
+
+def caseValues(neta,dxi):
+    '''Return the test case inputs for one grid and step size'''
+    return dict(DEFAULTS, dxi=dxi, neta=neta, output=None)
+
+def makeSolver(cls,neta,dxi,body,shock):
+    solver = cls(caseValues(neta, dxi))
+    solver.mybody = body
+    solver.shock  = shock
+    solver.doprint = False
+    return solver
+
+def best(func,number,repeat):
+    '''Return the best time per call of func'''
+    return min(timeit.repeat(func, number=number, repeat=repeat))/number
+
+def machineInfo():
+    '''Return a description of this machine and its Python'''
+    return {
+        'platform':  platform.platform(),
+        'machine':   platform.machine(),
+        'processor': platform.processor(),
+        'cpus':      os.cpu_count(),
+        'python':    platform.python_version(),
+        'numpy':     np.__version__,
+        'backends':  available(),
+    }
+
+#--------------------------------------------------------------------
+def benchPhases(results,name,cls,neta,dxi,body,shock,steps,repeat):
+    '''Time conical iterations, marching steps and single sweeps'''
+    key = "%s/neta=%d/dxi=%g" % (name, neta, dxi)
+
+    def iterate(solver):
+        solver.delm = 0.0
+        solver.body()
+        solver.precor()
+
+    # the few steps from the free stream start may raise floating point
+    # warnings, which say nothing about the cost of a step
+    with np.errstate(all='ignore'):
+        # warm up first (a compiled backend builds its kernels here)
+        iterate(makeSolver(cls, neta, dxi, body, shock))
+
+        # conical iterations from the free stream start
+        times = []
+        for r in range(repeat):
+            solver = makeSolver(cls, neta, dxi, body, shock)
+            times.append(timeit.timeit(lambda: iterate(solver),
+                                       number=steps))
+        results['conical-iter/' + key] = min(times)/steps
+
+        # marching steps, continuing from a few conical iterations
+        times = []
+        for r in range(repeat):
+            solver = makeSolver(cls, neta, dxi, body, shock)
+            for k in range(3):
+                iterate(solver)
+            solver.march = True
+            times.append(timeit.timeit(lambda: iterate(solver),
+                                       number=steps))
+        results['marching-step/' + key] = min(times)/steps
+
+        # one sweep at a fixed station
+        solver = makeSolver(cls, neta, dxi, body, shock)
+        solver.body()
+        results['precor/' + key] = best(solver.precor, steps, repeat)
+
+def benchSolve(results,neta,number,repeat):
+    '''Time the point and column primitive reductions, per point'''
+    from .AXIsolver import AXIsolver
+
+    class Probe(AXIsolver):
+        def __init__(self):
+            self.hinf = (1.0+2.0/(0.4*5.95**2))/2.0
+            self.betloc = False
+
+    probe = Probe()
+    aa = np.linspace(0.8, 1.2, neta-2)
+    bb = np.linspace(1.0, 1.3, neta-2)
+    cc = np.linspace(0.0, 0.05, neta-2)
+    pts = list(zip(aa.tolist(), bb.tolist(), cc.tolist()))
+
+    def point():
+        for a, b, c in pts:
+            probe.solve(3, a, b, c)
+
+    results['solve/reference/neta=%d' % neta] = \
+        best(point, number, repeat)/len(pts)
+    results['solve/numpy/neta=%d' % neta] = \
+        best(lambda: solvePrimitives(aa, bb, cc, probe.hinf), number,
+             repeat)/len(pts)
+
+def benchGeometry(results,body,number,repeat):
+    '''Time body radius and slope lookups, per call'''
+    shape = body.body
+    xs = np.linspace(0.0, body.bodylength, 101).tolist()
+
+    def radius():
+        for x in xs:
+            shape.getRadius(x)
+
+    def slope():
+        for x in xs:
+            shape.getSlope(x)
+
+    results['geometry/getRadius'] = best(radius, number, repeat)/len(xs)
+    results['geometry/getSlope'] = best(slope, number, repeat)/len(xs)
+    xa = np.array(xs)
+    results['geometry/getRadii'] = \
+        best(lambda: shape.getRadii(xa), number, repeat)/len(xs)
+
+def runBenchmarks(netas=NETAS,dxis=DXIS,backends=None,steps=10,repeat=30):
+    '''Run the suite and return the result dict'''
+    body = OgiveCylinder()
+    shock = OuterCone(22.0, body.bodylength)
+    results = {}
+    for name in backends or available():
+        cls = BACKENDS[name][1]()
+        for neta in netas:
+            for dxi in dxis:
+                benchPhases(results, name, cls, neta, dxi, body, shock,
+                            steps, repeat)
+    for neta in netas:
+        benchSolve(results, neta, steps, repeat)
+    benchGeometry(results, body, 10*steps, repeat)
+    return {
+        'date':    datetime.datetime.now().isoformat(timespec='seconds'),
+        'machine': machineInfo(),
+        'steps':   steps,
+        'repeat':  repeat,
+        'results': results,
+    }
+
+#--------------------------------------------------------------------
+def compare(current,baseline,threshold=0.3):
+    '''Return [(key, baseline, current, ratio)] and the regressed keys'''
+    rows = []
+    slow = []
+    for key in sorted(current['results']):
+        now = current['results'][key]
+        base = baseline['results'].get(key)
+        if base is None:
+            rows.append((key, None, now, None))
+            continue
+        ratio = now/base if base > 0 else float('inf')
+        rows.append((key, base, now, ratio))
+        if ratio > 1.0 + threshold:
+            slow.append(key)
+    return rows, slow
+
+def report(rows,slow):
+    '''Print a comparison table'''
+    print("%-42s %12s %12s %7s" % ("benchmark", "baseline", "current",
+                                   "ratio"))
+    for key, base, now, ratio in rows:
+        if base is None:
+            print("%-42s %12s %12.3e %7s" % (key, "-", now, "new"))
+        else:
+            flag = "  SLOWER" if key in slow else ""
+            print("%-42s %12.3e %12.3e %7.2f%s" % (key, base, now, ratio,
+                                                   flag))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="axipns solver benchmarks")
+    parser.add_argument('--out', default="bench.json",
+                        help="JSON file for the results")
+    parser.add_argument('--baseline',
+                        help="baseline JSON to compare")
+    parser.add_argument('--update', action='store_true',
+                        help="write this run as the baseline")
+    parser.add_argument('--ci', action='store_true',
+                        default=bool(os.environ.get('CI')),
+                        help="fail if the baseline is missing (default "
+                             "when CI is set)")
+    parser.add_argument('--threshold', type=float, default=0.3,
+                        help="slowdown flagged as a regression (0.3 = 30%%)")
+    parser.add_argument('--neta', type=int, nargs='+', default=list(NETAS))
+    parser.add_argument('--dxi', type=float, nargs='+', default=list(DXIS))
+    parser.add_argument('--backend', nargs='+', choices=sorted(BACKENDS),
+                        help="backends to time (default all installed)")
+    parser.add_argument('--steps', type=int, default=10,
+                        help="calls per timed batch")
+    parser.add_argument('--repeat', type=int, default=30,
+                        help="batches, the fastest is kept")
+    args = parser.parse_args(argv)
+    if args.update and not args.baseline:
+        parser.error("--update needs --baseline")
+    if args.ci and args.baseline and not args.update and \
+       not os.path.exists(args.baseline):
+        print("baseline %s is missing" % args.baseline, file=sys.stderr)
+        return 2
+
+    current = runBenchmarks(args.neta, args.dxi, args.backend, args.steps,
+                            args.repeat)
+    with open(args.out, 'w') as fout:
+        json.dump(current, fout, indent=2)
+
+    if args.baseline and os.path.exists(args.baseline) and not args.update:
+        with open(args.baseline) as fin:
+            baseline = json.load(fin)
+        for key in ('platform', 'processor', 'cpus', 'python', 'numpy'):
+            if baseline['machine'].get(key) != current['machine'][key]:
+                print("baseline is from another setup (%s: %s, here %s)" %
+                      (key, baseline['machine'].get(key),
+                       current['machine'][key]))
+        rows, slow = compare(current, baseline, args.threshold)
+        report(rows, slow)
+        if slow:
+            print("%d benchmarks slower than the baseline" % len(slow))
+            return 1
+        return 0
+
+    rows = [(key, None, now, None)
+            for key, now in sorted(current['results'].items())]
+    report(rows, [])
+    if args.baseline:
+        with open(args.baseline, 'w') as fout:
+            json.dump(current, fout, indent=2)
+        print("baseline written to %s" % args.baseline)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
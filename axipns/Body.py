@@ -8,97 +8,33 @@
 
 import math
 
-class PolyBody:
-    '''Class to manage polynomial body segments'''
-
-    def __init__(self,x0,x1,poly):
-        '''CONSTRUCTOR - create polynomial for body segment'''
-        self.x0 = x0
-        self.x1 = x1
-        self.coef = []
-        self.degree = len(poly)
-        for c in poly:
-            self.coef.append(c)
-       
-    def getSegRadius(self,x):
-        '''Return the radius for a given x'''
-        xbar = (x-self.x0)/(self.x1-self.x0)
-        if (xbar < 0)or(xbar>1.0):
-            rad = -1.0
-        else:
-            # figure the polynomial
-            rad = self.coef[0]
-            for i in range(0,self.degree-1):
-                rad = rad*xbar+self.coef[i+1]
-        return rad
-
-    def getSegSlope(self,x):
-        '''Return the slope for a given x'''
-        xbar = (x - self.x0)/(self.x1 - self.x0)
-        if(xbar <0)or(xbar>1.0):
-            slope = 1.0
-            return slope
-        else:
-            factor = float(self.degree -1)
-            slope = factor*self.coef[0]
-            for i in range(0,self.degree-2):
-                 factor = factor-1.0
-                 slope = slope*xbar+factor*self.coef[i+1]
-        slope = slope / (self.x1-self.x0)
-        return slope
-    
-    def getSegCurvature(self,x):
-        '''Return the curvature for a given x'''
-        xbar = (x - self.x0)/(self.x1 - self.x0)
-        if(xbar <0)or(xbar>1.0):
-            curve = 1.5
-            return curve
-        else:
-            d1 = self.degree-2
-            d2 = self.degree-1
-            factor = float(d1*d2)
-            curve = factor*(self.coef[0])
-            for i in range(0,self.degree-3):
-                d1 = d1-1
-                d2 = d2-1
-                factor = float(d1*d2)
-                curve = curve*xbar+factor*self.coef[i+1]
-            curve = curve / (self.x1 - self.x0)**2
-        return curve
-    
-class Body:
+from .PiecewisePoly import PiecewisePoly, PolySegment
+
+# body segments are plain polynomial segments
+PolyBody = PolySegment
+
+class Body(PiecewisePoly):
     '''Class to manage body definition'''
     def __init__(self,segments):
         '''CONSTRUCTOR - initialize segment array for this body'''
-        self.segments = segments
-
-    def getRadius(self,x):
-        '''Return radius for any given x on a segmented body'''
-        nseg = len(self.segments)
-        for seg in range (0,nseg):
-            rad= self.segments[seg].getSegRadius(x)
-            if rad > 0.0:
-                break
-        return rad
-
-    def getSlope(self,x):
-        '''Return slope for any given x on a segmented body'''
-        nseg = len(self.segments)
-        for seg in range (0,nseg):
-            slope= self.segments[seg].getSegSlope(x)
-            if slope < 1.0:
-                break
-        return slope
-    
-    def getCurvature(self,x):
-        '''Return curvature for any given x on a segmented body'''
-        nseg=len(self.segments)
-        for seg in range(0,nseg):
-            curve = self.segments[seg].getSegCurvature(x)
-            if (curve < 1.0):
-                break
-        return curve
+        PiecewisePoly.__init__(self,segments)
         
+def ogiveStations():
+    '''Return x0, xl1, xl2 of the ogive cylinder used by the solvers
+
+    These are the start of the computation, the end of the ogive and the
+    end of the body, shifted so the cone tip sits at x = 0.
+    '''
+    x0  = 5.0
+    xl1 = 22.5
+    xl2 = xl1 + 27.5
+    xh  = 4.25
+    rn  = xh/2.0+xl1*xl1/(2.0*xh)
+    thetab  = math.asin((xl1-x0)/rn)
+    rb0 = xh - rn + math.sqrt(rn**2-(xl1-x0)**2)
+    dx0 = rb0/math.tan(thetab) - x0
+    return x0 + dx0, xl1 + dx0, xl2 + dx0
+
 class OgiveCylinder:
     '''Test Body for CFDexplorer'''
 
@@ -175,6 +111,18 @@ class OgiveCylinder:
            x = x + dx
            curves.append([x/dx,y/dx])
         return curves
+
+    def getBodyPointArray(self,num,dx,scale):
+        '''Array version of getBodyPoints, shape (num, 2)'''
+        return self.body.pointArray(num,dx,scale)
+
+    def getBodySlopeArray(self,num,dx,scale):
+        '''Array version of getBodySlopes, shape (num, 2)'''
+        return self.body.slopeArray(num,dx,scale)
+
+    def getBodyCurvatureArray(self,num,dx,scale):
+        '''Array version of getBodyCurvatures, shape (num, 2)'''
+        return self.body.curvatureArray(num,dx,scale)
     
 if __name__ == "__main__":
     
@@ -0,0 +1,101 @@
+#--------------------------------------------------------------------
+# File:     Checkpoint.py
+#--------------------------------------------------------------------
+
+# Solver checkpoints
+#   A checkpoint holds everything the marching loop carries from one
+#   step to the next, stored as float64/int/bool arrays in a .npz file,
+#   so a restarted run repeats the original bit for bit. That includes
+#   the state of an accelerated conical start (see ConicalIteration),
+#   stored under a 'conical_' prefix, and the position of a field
+#   history (see History) under 'history_'. It also records how much
+#   station output had been written, so the output file can be cut back
+#   to match on restart.
+
+import os
+import tempfile
+
+import numpy as np
+
+# column and station data
+ARRAYS  = ['eta', 'dinv', 'rho', 'u', 'v', 'p', 'x', 'rb', 'rbx', 'rs',
+           'rsx']
+
+# loop state carried between steps
+SCALARS = ['dxi', 'beta', 'betloc', 'march', 'xplot', 'mit', 'xstep',
+           'delm', 'neta', 'xminf', 'thetas']
+
+def saveCheckpoint(solver,path):
+    '''Write the solver state to path (replaced atomically)'''
+    data = {}
+    for name in ARRAYS:
+        data[name] = np.asarray(getattr(solver, name), dtype=float)
+    for name in SCALARS:
+        data[name] = np.asarray(getattr(solver, name))
+    data['outpos'] = np.asarray(solver.outputPosition())
+    if getattr(solver, 'iteration', None):
+        for name, value in solver.iteration.saveState().items():
+            data['conical_' + name] = value
+    if getattr(solver, 'history', None):
+        for name, value in solver.history.saveState().items():
+            data['history_' + name] = value
+    # a temporary name of its own, processes sharing a directory may
+    # write the same path at once
+    fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as fout:
+            np.savez(fout, **data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+def loadCheckpoint(solver,path):
+    '''Restore the solver state saved in path'''
+    with np.load(path) as data:
+        for name in ('neta', 'xminf', 'thetas'):
+            if data[name].item() != getattr(solver, name):
+                raise ValueError("checkpoint %s does not match this case "
+                                 "(%s = %s)" % (path, name, data[name].item()))
+        for name in ARRAYS:
+            if isinstance(getattr(solver, name), list):
+                setattr(solver, name, data[name].tolist())
+            else:
+                # back to the solver's working dtype (float32 round trips)
+                setattr(solver, name,
+                        data[name].astype(getattr(solver, name).dtype))
+        for name in SCALARS:
+            setattr(solver, name, data[name].item())
+        solver.outpos = int(data['outpos'])
+        if getattr(solver, 'iteration', None) and 'conical_hist_mit' in data:
+            solver.iteration.loadState(
+                {name[8:]: data[name] for name in data.files
+                 if name.startswith('conical_')})
+        if getattr(solver, 'history', None) and 'history_count' in data:
+            solver.history.loadState(
+                {name[8:]: data[name] for name in data.files
+                 if name.startswith('history_')})
+        solver.status = 'running'
+
+class Checkpointer:
+    '''Save a checkpoint every so many solver iterations'''
+
+    def __init__(self,path,every=100):
+        self.path  = path
+        self.every = max(int(every), 1)
+        self.thinned = 0
+
+    def __call__(self,solver):
+        # thinning rewrites the stored history rows, so an older
+        # checkpoint no longer matches the file
+        history = getattr(solver, 'history', None)
+        thinned = history.thinned if history else 0
+        if solver.mit % self.every == 0 or thinned != self.thinned:
+            self.thinned = thinned
+            saveCheckpoint(solver, self.path)
+
+if __name__ == '__main__':
+    import sys
+    with np.load(sys.argv[1]) as data:
+        for name in SCALARS + ['outpos']:
+            print("%-8s %s" % (name, data[name].item()))
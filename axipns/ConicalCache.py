@@ -0,0 +1,141 @@
+#--------------------------------------------------------------------
+# File:     ConicalCache.py
+#--------------------------------------------------------------------
+
+# Cache of converged conical starting solutions
+#   The tangent cone iteration depends only on the free stream, the grid,
+#   the initial step and the nose geometry. Its converged state is kept
+#   on disk as a checkpoint named by a hash of those inputs, so a later
+#   run with the same inputs starts marching straight away. The cache
+#   is held under a size limit by dropping the least recently used
+#   entries. Numbers are hashed as floats, so minf = 6 and minf = 6.0
+#   share an entry.
+
+import hashlib
+import json
+import numbers
+import os
+
+from .Checkpoint import saveCheckpoint, loadCheckpoint
+
+def plainNumbers(value):
+    '''Return a JSON value with every number (not bool) as a float'''
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, dict):
+        return {k: plainNumbers(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plainNumbers(v) for v in value]
+    return value
+
+def digest(desc):
+    '''Return the sha256 hex digest of a JSON description'''
+    text = json.dumps(plainNumbers(desc), sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def shapeKey(shape):
+    '''Return a hashable description of a PiecewisePoly chain'''
+    return [shape.x0s, shape.x1s, shape.rows]
+
+def discard(path):
+    '''Remove a cache entry; one already gone was removed by another run'''
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class ConicalCache:
+    '''On-disk LRU cache of converged conical solutions'''
+
+    def __init__(self,directory,maxbytes=64*1024*1024):
+        self.directory = directory
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self,solver):
+        '''Return the content hash for a solver's conical start'''
+        v = solver.values
+        desc = {
+            'minf':   v['minf'],
+            'thetas': v['thetas'],
+            'muinf':  v['muinf'],
+            'neta':   v['neta'],
+            'grid':   [v.get('grid', 'uniform'), v.get('grid_stretch')],
+            'dxi':    v['dxi'],
+            'x0':     solver.x0,
+            'xl2':    solver.xl2,
+            'engine': type(solver).__name__,
+            'dtype':  str(v.get('dtype', 'float64')),
+            'length': solver.mybody.bodylength,
+            'body':   shapeKey(solver.mybody.body),
+            'shock':  shapeKey(solver.shock.body),
+        }
+        it = getattr(solver, 'iteration', None)
+        if it:
+            desc['iteration'] = [it.relax, it.extrap, it.tol, it.field]
+        step = getattr(solver, 'stepper', None)
+        if step:
+            desc['step'] = [step.safety, step.dxi_min, step.dxi_max,
+                            step.growth, step.slope_tol, step.mach_cut]
+        return digest(desc)
+
+    def path(self,key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def fetch(self,solver):
+        '''Load a cached conical solution into solver, True on a hit'''
+        path = self.path(self.key(solver))
+        if not os.path.exists(path):
+            self.misses += 1
+            return False
+        try:
+            loadCheckpoint(solver, path)
+        except (OSError, ValueError, KeyError):
+            # unreadable entry, drop it and solve from scratch
+            self.misses += 1
+            discard(path)
+            return False
+
+        # no conical stations were written by this run
+        solver.outpos = None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return True
+
+    def store(self,solver):
+        '''Save the converged conical solution held by solver'''
+        saveCheckpoint(solver, self.path(self.key(solver)))
+        self.evict()
+
+    def evict(self):
+        '''Drop least recently used entries until under the size limit'''
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.npz'):
+                # another process may have evicted it since the listing
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+        entries.sort()
+        total = sum(e[1] for e in entries)
+        while entries and total > self.maxbytes:
+            mtime, size, name = entries.pop(0)
+            discard(os.path.join(self.directory, name))
+            total -= size
+
+if __name__ == '__main__':
+    import sys
+    cache = ConicalCache(sys.argv[1] if len(sys.argv) > 1 else "conical")
+    names = sorted(n for n in os.listdir(cache.directory) if n.endswith('.npz'))
+    for name in names:
+        size = os.path.getsize(os.path.join(cache.directory, name))
+        print("%s %8d bytes" % (name, size))
@@ -0,0 +1,204 @@
+#--------------------------------------------------------------------
+# File:     Equivalence.py
+#--------------------------------------------------------------------
+
+# Engine equivalence checks
+#   Runs the reference AXIsolver and another backend (see Backends) on
+#   the ogive-cylinder case at several Mach numbers and grid sizes,
+#   records the full column at every marching station and compares them
+#   station by station:
+#
+#       |alt - ref| <= atol + rtol*max|ref|   for rho, u, v, p, x, rb, rs
+#
+#   with max|ref| taken over the column, so fields passing through zero
+#   (v) are held to the same relative standard as the others.
+#
+#   Both runs must also end the same way after the same number of
+#   conical iterations and marching steps, and the reference must stay
+#   finite (a NaN matches nothing, so two diverged runs fail). The
+#   report gives the largest deviations, where they occur, and the
+#   speedup of the alternative engine over the reference. The reference
+#   is always AXIsolver, whatever AXIPNS_BACKEND says.
+#
+#       python -m axipns.Equivalence numpy numba --rtol 1e-10
+#
+#   With --dtype float32 the alternative engine runs in single precision
+#   and the report gives its accuracy against the float64 reference.
+#   On these cases that is about 1e-3 of the field scale, mostly from
+#   the conical start stopping an iteration early or late, which counts
+#   as a failure.
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+import numpy as np
+
+from .ArraySolver import DTYPES
+from .Backends import BACKENDS, available
+from .Body import OgiveCylinder
+from .main import DEFAULTS
+from .OuterBoundary import OuterCone
+
+FIELDS = ('rho', 'u', 'v', 'p')
+MACHS  = (5.5, 5.95, 6.5)
+NETAS  = (31, 51)
+
+def canonicalCases(machs=MACHS,netas=NETAS):
+    '''Return the value dicts for the canonical test cases
+
+    The starting step is 0.0004 at neta = 31, scaled with the spacing so
+    the finer grids stay stable; the smaller step needs more conical
+    iterations.
+    '''
+    cases = []
+    for minf in machs:
+        for neta in netas:
+            cases.append(dict(DEFAULTS, minf=minf, dxi=0.012/(neta-1),
+                              neta=neta, nitmax=3000, output=None))
+    return cases
+
+class FieldRecorder:
+    '''Solver observer keeping the full column at each marching station'''
+
+    def __init__(self):
+        self.stations = []
+
+    def __call__(self,solver):
+        if solver.march:
+            n = solver.neta
+            row = [np.array(getattr(solver, name)[1:n+1], dtype=float)
+                   for name in FIELDS]
+            row.append(np.array([solver.x[2], solver.rb[2], solver.rs[2]]))
+            self.stations.append(row)
+
+def runEngine(cls,values,body):
+    '''Run one case and return (recorder, solver, seconds)'''
+    solver = cls(dict(values))
+    solver.mybody = body
+    solver.shock = OuterCone(values['thetas'], body.bodylength)
+    solver.doprint = False
+    recorder = FieldRecorder()
+    solver.observers.append(recorder)
+    tic = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        solver.runSolver()
+    return recorder, solver, time.perf_counter() - tic
+
+def compareRuns(ref,alt,rtol,atol):
+    '''Compare two recorders station by station
+
+    Returns a dict with the worst absolute and relative deviation of
+    each field, the station of the first violation (None if all pass),
+    the number of stations compared and whether the reference stayed
+    finite.
+    '''
+    names = FIELDS + ('geometry',)
+    worst = {name: [0.0, 0.0] for name in names}
+    first = None
+    finite = all(np.all(np.isfinite(a)) for st in ref.stations for a in st)
+    nstat = min(len(ref.stations), len(alt.stations))
+    for k in range(nstat):
+        for name, a, b in zip(names, ref.stations[k], alt.stations[k]):
+            # a NaN on either side is a violation
+            diff = np.abs(b - a)
+            diff[np.isnan(diff)] = np.inf
+            scale = np.fmax.reduce(np.abs(a))
+            rel = diff/scale if scale > 0 else diff
+            worst[name][0] = max(worst[name][0], float(np.max(diff)))
+            worst[name][1] = max(worst[name][1], float(np.max(rel)))
+            if first is None and not np.all(diff <= atol + rtol*scale):
+                first = (k, name, float(ref.stations[k][4][0]))
+    return {'worst': worst, 'first': first, 'stations': nstat,
+            'finite': finite}
+
+def checkCase(values,engine,rtol=1.0e-9,atol=1.0e-12,body=None,dtype=None):
+    '''Run the reference and engine on one case and return a result row
+
+    dtype, if given, is the working precision of the engine run.
+    '''
+    body = body or OgiveCylinder()
+    # loaded directly, AXIPNS_BACKEND must not replace the reference
+    ref, rsolver, rtime = runEngine(BACKENDS['reference'][1](), values, body)
+    if dtype:
+        values = dict(values, dtype=dtype)
+    alt, asolver, atime = runEngine(BACKENDS[engine][1](), values, body)
+    cmp = compareRuns(ref, alt, rtol, atol)
+    finite = cmp['finite'] and rsolver.status != 'diverged'
+    same = (rsolver.status == asolver.status
+            and rsolver.mit == asolver.mit
+            and rsolver.xstep == asolver.xstep
+            and len(ref.stations) == len(alt.stations)
+            and len(ref.stations) > 0)
+    return {
+        'engine':   engine,
+        'minf':     values['minf'],
+        'neta':     values['neta'],
+        'status':   (rsolver.status, asolver.status),
+        'steps':    (len(ref.stations), len(alt.stations)),
+        'mit':      (rsolver.mit, asolver.mit),
+        'finite':   finite,
+        'worst':    cmp['worst'],
+        'first':    cmp['first'],
+        'passed':   same and finite and cmp['first'] is None,
+        'speedup':  rtime/atime if atime > 0 else float('inf'),
+        'times':    (rtime, atime),
+    }
+
+def report(row):
+    '''Print one result row'''
+    absdev = max(w[0] for w in row['worst'].values())
+    reldev = max(w[1] for w in row['worst'].values())
+    print("%-8s M=%5.2f neta=%4d  %s  max abs %9.2e  rel %9.2e  "
+          "speedup %5.2f  (%.3f s / %.3f s)" %
+          (row['engine'], row['minf'], row['neta'],
+           "PASS" if row['passed'] else "FAIL", absdev, reldev,
+           row['speedup'], row['times'][0], row['times'][1]))
+    if row['steps'][0] != row['steps'][1] or row['mit'][0] != row['mit'][1]:
+        print("    steps differ: reference %d (mit %d), engine %d (mit %d)" %
+              (row['steps'][0], row['mit'][0], row['steps'][1],
+               row['mit'][1]))
+    if row['status'][0] != row['status'][1]:
+        print("    status differs: reference %s, engine %s" % row['status'])
+    if not row['finite']:
+        print("    reference is not finite (%s)" % row['status'][0])
+    if row['steps'][0] == 0:
+        print("    reference did not march (%s), nothing compared" %
+              row['status'][0])
+    if row['first'] is not None:
+        k, name, x = row['first']
+        print("    first out of tolerance: station %d (x = %.6f), %s" %
+              (k, x, name))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="compare solver backends with the reference engine")
+    parser.add_argument('engines', nargs='*',
+                        help="backends to check (default all installed)")
+    parser.add_argument('--rtol', type=float, default=1.0e-9)
+    parser.add_argument('--atol', type=float, default=1.0e-12)
+    parser.add_argument('--mach', type=float, nargs='+', default=list(MACHS))
+    parser.add_argument('--neta', type=int, nargs='+', default=list(NETAS))
+    parser.add_argument('--dtype', choices=DTYPES,
+                        help="working precision of the checked engines")
+    args = parser.parse_args(argv)
+
+    engines = args.engines or [n for n in available() if n != 'reference']
+    for name in engines:
+        if name not in BACKENDS:
+            parser.error("unknown backend '%s'" % name)
+
+    body = OgiveCylinder()
+    failed = 0
+    for values in canonicalCases(args.mach, args.neta):
+        for engine in engines:
+            row = checkCase(values, engine, args.rtol, args.atol, body,
+                            args.dtype)
+            report(row)
+            failed += not row['passed']
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
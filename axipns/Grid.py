@@ -0,0 +1,98 @@
+#--------------------------------------------------------------------
+# File:     Grid.py
+#--------------------------------------------------------------------
+
+# Eta grid distributions
+#   eta runs from 0 at the body to 1 at the outer boundary, stored at
+#   indices 1 -> neta with a ghost point below the wall at index 0. The
+#   solvers difference across each interval with the inverse spacing
+#   (the grid metric), so any increasing distribution works:
+#
+#       uniform     deta = 1/(neta-1) everywhere (the original grid)
+#       tanh        eta = 1 + tanh(s*(z-1))/tanh(s), z uniform in [0, 1];
+#                   larger s packs more points at the wall
+#       geometric   each spacing is s times the one below it
+#
+#   The defaults (tanh 1.0, geometric 1.03) give a wall spacing about
+#   0.4 of the outer spacing at neta 31.
+#
+#   The explicit scheme is limited by the smallest spacing, so a
+#   stretched grid runs with step control (see StepControl) unless
+#   step_control is set false: the starting step dxi is cut with the
+#   square of the smallest spacing (scaledStep) and each later step
+#   follows the limit from the current column. A fine uniform grid needs
+#   step_control set, and either kind more conical iterations (nitmax)
+#   as the step shrinks. With the fixed 0.5% step growth instead, the step
+#   soon outruns the limit and the run diverges, which the solver
+#   reports as status 'diverged'.
+
+import math
+
+GRIDS = ('uniform', 'tanh', 'geometric')
+
+def etaGrid(neta,kind='uniform',stretch=None):
+    '''Return eta[0 -> neta] for a grid distribution
+
+    The uniform grid is built by the same running sum as the solver
+    always used, so it repeats the original values exactly.
+    '''
+    if kind == 'uniform':
+        deta = 1.0/float(neta-1)
+        eta = []
+        et = -deta
+        for i in range(neta+1):
+            eta.append(et)
+            et = et + deta
+        return eta
+    if kind == 'tanh':
+        s = 1.0 if stretch is None else float(stretch)
+        if s <= 0:
+            raise ValueError("tanh grid stretch must be positive")
+        z = [j/float(neta-1) for j in range(neta)]
+        pts = [1.0 + math.tanh(s*(zj - 1.0))/math.tanh(s) for zj in z]
+    elif kind == 'geometric':
+        q = 1.03 if stretch is None else float(stretch)
+        if q <= 0:
+            raise ValueError("geometric grid ratio must be positive")
+        if q == 1.0:
+            return etaGrid(neta)
+        h0 = (q - 1.0)/(q**(neta-1) - 1.0)
+        pts = [0.0]
+        for j in range(neta-1):
+            pts.append(pts[-1] + h0*q**j)
+    else:
+        raise ValueError("unknown eta grid '%s' (use one of %s)" %
+                         (kind, ", ".join(GRIDS)))
+    pts[0] = 0.0
+    pts[-1] = 1.0
+
+    # ghost point mirrors the first interval below the wall
+    return [-pts[1]] + pts
+
+def inverseSpacing(eta,deta=None):
+    '''Return 1/(eta[j+1] - eta[j]) for j = 0 -> neta-1
+
+    For the uniform grid pass deta: every interval then uses 1/deta, the
+    value the solver divided by before nonuniform grids were supported.
+    '''
+    if deta is not None:
+        return [1./deta] * (len(eta) - 1)
+    return [1.0/(eta[j+1] - eta[j]) for j in range(len(eta) - 1)]
+
+def scaledStep(eta,dxi=0.0004,neta=31):
+    '''Return dxi cut to the smallest spacing of a grid
+
+    dxi is the step that runs on the uniform grid of neta points; it is
+    scaled with the square of the smallest spacing, and never raised.
+    '''
+    h = min(eta[j+1] - eta[j] for j in range(1, len(eta) - 1))
+    return dxi * min(h*(neta - 1), 1.0)**2
+
+if __name__ == '__main__':
+    import sys
+    kind = sys.argv[1] if len(sys.argv) > 1 else 'tanh'
+    neta = int(sys.argv[2]) if len(sys.argv) > 2 else 31
+    eta = etaGrid(neta, kind)
+    for j in range(1, neta+1):
+        print("%4d %12.8f %12.8f" % (j, eta[j],
+                                     eta[j] - eta[j-1] if j > 1 else 0.0))
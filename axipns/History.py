@@ -0,0 +1,209 @@
+#--------------------------------------------------------------------
+# File:     History.py
+#--------------------------------------------------------------------
+
+# Full field history
+#   A FieldHistory observer keeps the marching solution at every kept
+#   station as one float64 row
+#
+#       x, rb, rs, rho[1 -> neta], u[...], v[...], p[...]
+#
+#   in a preallocated array that grows a chunk of rows at a time, or in
+#   a memory mapped .npy file with the same fixed header as SolutionFile
+#   (np.load reads it, mmap_mode='r' pages it in on demand). Plots,
+#   integrals and comparisons can then work from the stored field
+#   instead of re-running the case.
+#
+#   Stations are kept every 'every' marching steps and at least 'dx'
+#   apart in x. max_bytes caps the store: when it is full the stored rows
+#   are thinned to every other one and both decimation settings doubled,
+#   so the record still covers the whole body at a coarser spacing.
+#
+#   The store is opened when the run starts. A run resumed from a
+#   checkpoint (see Checkpoint) reopens the file and carries on after the
+#   stations it held at the checkpoint; an in-memory store starts empty.
+
+import numpy as np
+
+from .SolutionFile import HEADER, writeHeader
+
+FIELDS = ('rho', 'u', 'v', 'p')
+
+class FieldHistory:
+    '''Record the full marching field, decimated and size capped'''
+
+    def __init__(self,neta,path=None,every=1,dx=0.0,max_bytes=256*1024*1024,
+                 chunk=256):
+        self.neta  = neta
+        self.path  = path
+        self.every = max(int(every), 1)
+        self.dx    = dx
+        self.chunk = max(int(chunk), 1)
+        self.width = 3 + len(FIELDS)*neta
+        self.rowsize = 8*self.width
+        self.maxrows = int(max_bytes) // self.rowsize
+        if self.maxrows < 2:
+            raise ValueError("history max_bytes %d holds fewer than two "
+                             "stations" % max_bytes)
+        self.count = 0
+        self.step  = 0
+        self.lastx = None
+        self.thinned = 0
+        self.fout = None
+        self.data = np.empty((0, self.width))
+
+    @classmethod
+    def fromValues(cls,values,neta):
+        '''Build a history from the solver input values
+
+        values['history'] is True for an in-memory store or the path of
+        the .npy file to map.
+        '''
+        path = values['history']
+        return cls(neta, path if isinstance(path, str) else None,
+                   values.get('history_every', 1),
+                   values.get('history_dx', 0.0),
+                   values.get('history_max_mb', 256)*1024*1024)
+
+    @classmethod
+    def open(cls,path):
+        '''Return a read only history for a stored .npy file'''
+        data = np.load(path, mmap_mode='r')
+        hist = cls.__new__(cls)
+        hist.neta = (data.shape[1] - 3)//len(FIELDS)
+        hist.path = path
+        hist.width = data.shape[1]
+        hist.count = data.shape[0]
+        hist.fout = None
+        hist.data = data
+        return hist
+
+    #--------------------------------------------------------------------
+    def start(self):
+        '''Open the store for a run'''
+        if self.path:
+            self.fout = open(self.path, 'r+b' if self.count else 'w+b')
+        self.grow(max(self.count, min(self.chunk, self.maxrows)))
+
+    def saveState(self):
+        '''Return the recording state as arrays for a checkpoint'''
+        return {
+            'count':   np.asarray(self.count if self.path else 0),
+            'step':    np.asarray(self.step),
+            'lastx':   np.asarray(np.nan if self.lastx is None
+                                  else self.lastx),
+            'every':   np.asarray(self.every),
+            'dx':      np.asarray(self.dx),
+            'thinned': np.asarray(self.thinned),
+        }
+
+    def loadState(self,data):
+        '''Restore the state saved by saveState, before start'''
+        self.count = int(data['count'])
+        self.step = int(data['step'])
+        lastx = float(data['lastx'])
+        self.lastx = None if np.isnan(lastx) else lastx
+        self.every = int(data['every'])
+        self.dx = float(data['dx'])
+        self.thinned = int(data['thinned'])
+
+    def grow(self,rows):
+        '''Make room for rows stations'''
+        if self.fout:
+            if isinstance(self.data, np.memmap):
+                self.data.flush()
+            self.data = None
+            self.fout.truncate(HEADER + rows*self.rowsize)
+            self.data = np.memmap(self.fout, dtype='<f8', mode='r+',
+                                  offset=HEADER, shape=(rows, self.width))
+        else:
+            data = np.empty((rows, self.width))
+            data[:self.count] = self.data[:self.count]
+            self.data = data
+
+    def thin(self):
+        '''Halve the stored stations and the rate new ones are kept'''
+        keep = self.data[0:self.count:2].copy()
+        self.count = len(keep)
+        self.data[:self.count] = keep
+        self.every = 2*self.every
+        self.dx = 2*self.dx
+        self.thinned += 1
+
+    def append(self,x,rb,rs,rho,u,v,p):
+        '''Add one station'''
+        if self.count == len(self.data):
+            if self.count == self.maxrows:
+                self.thin()
+            else:
+                self.grow(min(self.count + self.chunk, self.maxrows))
+        n = self.neta
+        row = self.data[self.count]
+        row[0] = x
+        row[1] = rb
+        row[2] = rs
+        for k, q in enumerate((rho, u, v, p)):
+            row[3+k*n:3+(k+1)*n] = q
+        self.count += 1
+        self.lastx = x
+
+    def __call__(self,solver):
+        if not solver.march:
+            return
+        self.step += 1
+        x = solver.x[2]
+        if (self.step - 1) % self.every:
+            return
+        if self.lastx is not None and x - self.lastx < self.dx:
+            return
+        n = self.neta
+        self.append(x, solver.rb[2], solver.rs[2], solver.rho[1:n+1],
+                    solver.u[1:n+1], solver.v[1:n+1], solver.p[1:n+1])
+
+    def close(self):
+        '''Trim the file to the stored stations and write its header'''
+        if not self.fout:
+            return
+        self.data.flush()
+        self.data = None
+        self.fout.truncate(HEADER + self.count*self.rowsize)
+        writeHeader(self.fout, (self.count, self.width))
+        self.fout.close()
+        self.fout = None
+        self.data = np.load(self.path, mmap_mode='r')
+
+    #--------------------------------------------------------------------
+    def rows(self):
+        '''Return the (count, 3 + 4*neta) array of stored stations'''
+        return self.data[:self.count]
+
+    @property
+    def x(self):
+        return self.data[:self.count, 0]
+
+    @property
+    def rb(self):
+        return self.data[:self.count, 1]
+
+    @property
+    def rs(self):
+        return self.data[:self.count, 2]
+
+    def field(self,name):
+        '''Return the (count, neta) history of rho, u, v or p'''
+        k = FIELDS.index(name)
+        n = self.neta
+        return self.data[:self.count, 3+k*n:3+(k+1)*n]
+
+    def nbytes(self):
+        return self.count*self.width*8
+
+if __name__ == '__main__':
+    import sys
+    hist = FieldHistory.open(sys.argv[1])
+    print("%d stations, %d points, %.1f MB" %
+          (hist.count, hist.neta, hist.nbytes()/1.0e6))
+    p = hist.field('p')
+    for k in range(0, hist.count, max(hist.count//20, 1)):
+        print("x = %10.5f  rb = %9.5f  rs = %9.5f  p_wall = %12.8f" %
+              (hist.x[k], hist.rb[k], hist.rs[k], p[k, 0]))
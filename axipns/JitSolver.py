@@ -0,0 +1,313 @@
+#--------------------------------------------------------------------
+# File:     JitSolver.py
+#--------------------------------------------------------------------
+
+# Compiled point by point sweep
+#   The reference precor and solve written as plain functions over NumPy
+#   columns, so Numba can compile them to machine code. They run the
+#   same point by point arithmetic as AXIsolver and give the same
+#   results. Without Numba they still run, as slow Python.
+#
+#   The compiled code is cached on disk by Numba (cache=True), so only
+#   the first run on a machine pays the compile time.
+
+import math
+
+import numpy as np
+
+from .ArraySolver import ArraySolver
+
+try:
+    import numba
+    jit = numba.njit(cache=True)
+except ImportError:
+    numba = None
+    def jit(func):
+        return func
+
+@jit
+def solvePoint(i,aa,bb,cc,hinf,betloc):
+    '''Reduce one solution vector, returns rr, uu, vv, pp and betloc'''
+    gamma = 1.4
+    xk = hinf - 0.5*(cc/aa)**2
+    phi = 2*(gamma-1) * xk * aa * aa/(gamma * bb * bb)
+    phm = gamma/(gamma+1)
+    phs = 0.95 * phm
+    if(phi > phs):
+        betloc = True
+    if((i == 2) and betloc):
+        phi = phm
+
+    # we restrict solutions to supersonic. As long as phi is less that phm
+    #   we ignore the radical in calculating phi.
+    rad = 0.0
+    if(phi < phm):
+        rad = math.sqrt(1.0-phi-phi/gamma)
+    den = gamma*phi - (gamma - 1)
+
+    # calculate  M_x^2
+    xmx = (1.0 - phi + rad)/den
+
+    pp = bb /(1.0 + gamma*xmx)
+    tt = xk/(1.0 + 0.2*xmx)
+    rr = 1.4*pp/((gamma - 1)*tt)
+    uu = aa / rr
+    vv = cc / aa
+    return rr, uu, vv, pp, betloc
+
+@jit
+def precorColumn(eta,rho,u,v,p,rb,rbx,rs,rsx,xmu1,beta,dxi,dinv,hinf,pinf,
+                 betloc):
+    '''MacCormack's Predictor Corrector sweep, point by point
+
+    rho, u, v and p are updated in place; rb, rbx, rs and rsx are the
+    station arrays. Returns the max pressure increase and betloc.
+    '''
+    neta = rho.shape[0] - 1
+    delm = 0.0
+
+    # values carried from one point to the next
+    den1 = etaxm = etaxpp = deldvm = dldvpp = 0.0
+    e1p = e2p = e3p = f1p = f2p = f3p = 0.0
+    e1pc = e2pc = e3pc = f1pc = f2pc = f3pc = 0.0
+
+    # clear working array
+    w = np.zeros((5, 4))
+
+    gamma = 1.4
+    # main predictor corrector sweep ========================================
+    for i in range (2,neta+1):
+
+        # on last pass, copy new working values back into position
+        if(i == neta):
+            for j in range(1,5):
+                w[j][1] = w[j][2]
+                w[j][2] = w[j ][3]
+            # set
+            w[1][3] = 1.0
+            w[2][3] = 1.0
+            w[3][3] = 0.0
+            w[4][3] = pinf
+        else:
+            # Flowfield point - predictor ( 2 -> neta-1 )
+            r1 = rb[1] + eta[i]*(rs[1]-rb[1])
+            r1p = rb[1] +eta[i+1]*(rs[1]-rb[1])
+            ep1 = rho[i]*u[i]*r1
+            ep2 = ep1 * u[i]+p[i]*r1
+            ep3 = ep1*v[i]
+            etar = 1.0/(rs[1]-rb[1])
+            if(i == 2):
+                etaxm=((eta[i]-1.0)*rbx[1] -
+                        eta[i]*rsx[1])*etar
+                den1 = dinv[i-1]
+                uetam = (u[i]-u[i-1])*den1
+                vetam = (v[i]-v[i-1])*den1
+                deldvm = etaxm*uetam+etar*vetam+v[i]/r1
+                txxm = 2.0*xmu1*etaxm*uetam - \
+                    2.0/3.0*xmu1*beta*deldvm
+                sigxrm=xmu1*(etaxm*vetam+etar*uetam)
+                trrm = 2.0*xmu1*etar*vetam - \
+                    2.0/3.0*xmu1*beta*deldvm
+                e1p = rho[i]*u[i]*r1
+                e2p = e1p*u[i]+p[i]*r1-txxm*r1
+                e3p = e1p*v[i]-sigxrm*r1
+                f1p = rho[i]*v[i]*r1
+                f2p = f1p*u[i]-sigxrm*r1
+                f3p = f1p*v[i]+p[i]*r1-trrm*r1
+            if(i>2):
+                etaxm=etaxpp
+            etaxp = ((eta[i+1]-1.0)*rbx[1] - \
+                        eta[i+1]*rsx[1])*etar
+            etaxpp=etaxp
+            den1 = dinv[i]
+            uetap = (u[i+1]-u[i])*den1
+            vetap = (v[i+1]-v[i])*den1
+            if(i>2):
+                deldvm = dldvpp
+            deldvp = etaxp*uetap+etar*vetap+v[i+1]*r1p
+            dldvpp = deldvp
+            txpp = 2.0*xmu1*etaxp*uetap - \
+                2.0/3.0*xmu1*beta*deldvp
+            sigxrp=xmu1*(etaxp*vetap+etar*uetap)
+            e1m = e1p
+            e1p = rho[i+1]*u[i+1]*r1p
+            e2m = e2p
+            e2p = e1p*u[i+1]-txpp*r1p+p[i+1]*r1p
+            e3m = e3p
+            e3p=e1p*v[i+1]-sigxrp*r1p
+            trrp = 2.0*xmu1*etar*vetap - \
+                2.0/3.0*xmu1*beta*deldvp
+            f1m = f1p
+            f1p = rho[i+1]*v[i+1]*r1p
+            f2m = f2p
+            f2p = f1p*u[i+1]-sigxrp*r1p
+            f3m = f3p
+            f3p = f1p*v[i+1]+p[i+1]*r1p-trrp*r1p
+            sigpp = -p[i]+2.0*xmu1*v[i]/r1 \
+                -2.0/3.0*xmu1*beta*deldvm
+            h3 = -sigpp
+            h2 = 0.0
+            h1 = 0.0
+            ep1 = ep1 -dxi*etaxm*den1*(e1p-e1m) - \
+                dxi*etar*den1*(f1p-f1m)+dxi*h1
+            ep2 = ep2 -dxi*etaxm*den1*(e2p-e2m) - \
+                dxi*etar*den1*(f2p-f2m)+dxi*h2
+            ep3 = ep3 -dxi*etaxm*den1*(e3p-e3m) - \
+                dxi*etar*den1*(f3p-f3m)+dxi*h3
+            r2 = rb[2]+eta[i]*(rs[2]-rb[2])
+            aa = ep1/r2
+            bb = ep2/r2
+            cc = ep3/r2
+            # solve for primative variables and store in work area
+            rr, uu, vv, pp, betloc = solvePoint(i,aa,bb,cc,hinf,betloc)
+
+            # move data in working array back for corrector pass
+            for j in range (1,5):
+                w[j][1] = w[j][2]
+                w[j][2] = w[j][3]
+
+            # save current results in working array
+            w[1][3] = rr
+            w[2][3] = uu
+            w[3][3] = vv
+            w[4][3] = pp
+        if(i != 2):
+            # Corrector - lags one point
+            r1 = rb[1] + eta[i-1]*(rs[1]-rb[1])
+            xep1 = rho[i-1]*u[i-1]*r1
+            xep2 = xep1 * u[i-1]+p[i-1]*r1
+            xep3 = xep1*v[i-1]
+            r2 = rb[2] + eta[i-1]*(rs[2]-rb[2])
+            r2m = rb[2] + eta[i-2]*(rs[2]-rb[2])
+            ep1 = w[1][2]*w[2][2]*r2
+            ep2 = ep1*w[2][2]+w[4][2]*r2
+            ep3 = ep1*w[3][2]
+            etar = 1.0/(rs[2]-rb[2])
+            if(i == 3):
+                etaxm=((eta[i-2]-1.0)*rbx[2]- \
+                            eta[i-2]*rsx[2])*etar
+                uetam = (w[2][2]-w[2][1])*dinv[i-2]
+                vetam = (w[3][2]-w[3][1])*dinv[i-2]
+                deldvm = etaxm*uetam+etar*vetam+w[3][1]/r2m
+                txxm = 2.0*xmu1*etaxm*uetam- \
+                    2.0/3.0*xmu1*beta*deldvm
+                sigxrm=xmu1*(etaxm*vetam+etar*uetam)
+                trrm = 2.0*xmu1*etar*vetam- \
+                    2.0/3.0*xmu1*beta*deldvm
+                e1pc = w[1][1]*w[2][1]*r2m
+                e2pc = e1pc*w[2][1]-txxm*r2m + w[4][1]*r2m
+                e3pc = e1pc*w[3][1]-sigxrm*r2m
+                f1pc = w[1][1]*w[3][1]*r2m
+                f2pc = f1pc*w[2][1]-sigxrm*r2m
+                f3pc = f1pc*w[3][1]+w[4][1]*r2m-trrm*r2m
+
+            etaxp = ((eta[i-1]-1.0)*rbx[2]- \
+                        eta[i-1]*rsx[2])*etar
+            uetap = (w[2][3]-w[2][2])*dinv[i-1]
+            vetap = (w[3][3]-w[3][2])*dinv[i-1]
+            deldvp = etaxp*uetap+etar*vetap+w[3][2]*r2
+            txxp = 2.0*xmu1*etaxp*uetap- \
+                2.0/3.0*xmu1*beta*deldvp
+            sigxrp=xmu1*(etaxp*vetap+etar*uetap)
+            e1mc = e1pc
+            e1pc = w[1][2]*w[2][2]*r2
+            e2mc = e2pc
+            e2pc = e1pc*w[2][2]-txxp*r2+w[4][2]*r2
+            e3mc = e3pc
+            e3pc=e1pc*w[3][2]-sigxrp*r2
+            trrp = 2.0*xmu1*etar*vetap- \
+                2.0/3.0*xmu1*beta*deldvp
+            f1mc = f1pc
+            f1pc = w[1][2]*w[3][2]*r2
+            f2mc = f2pc
+            f2pc = f1pc*w[2][2]-sigxrp*r2
+            f3mc = f3pc
+            f3pc = f1pc*w[3][2]+w[4][2]*r2-trrp*r2
+            sigpp = -w[4][2]+2.0*xmu1*w[3][2]/r2- \
+                2.0/3.0*xmu1*beta*deldvp
+
+            h3 = -sigpp
+            h2 = 0.0
+            h1 = 0.0
+            den1c = dinv[i-2]
+            ep1 = 0.5*(ep1 + xep1-dxi*etaxp*den1c*(e1pc-e1mc) \
+                -dxi*etar*den1c*(f1pc-f1mc)+dxi*h1)
+
+            ep2 = 0.5*(ep2 + xep2-dxi*etaxp*den1c*(e2pc-e2mc) \
+                -dxi*etar*den1c*(f2pc-f2mc)+dxi*h2)
+
+            ep3 = 0.5*(ep3 + xep3-dxi*etaxp*den1c*(e3pc-e3mc) \
+                -dxi*etar*den1c*(f3pc-f3mc)+dxi*h3)
+            aa = ep1/r2
+            bb = ep2/r2
+            cc = ep3/r2
+            rr, uu, vv, pp, betloc = solvePoint(i-1,aa,bb,cc,hinf,betloc)
+            rho[i-1]   = rr
+            u[i-1]     = uu
+            v[i-1]     = vv
+
+            # convergence depends on the max change in pressure
+            psav            = p[i-1]   # save last value
+            p[i-1]     = pp
+            delp            = pp - psav  # calculate difference
+            if(delp > delm):
+                delm   = delp             # update max this pass
+        else:
+            # we are at the lower boundary
+            w[4][2] = w[4][3]
+            w[2][2] = 0.0
+            w[3][2] = 0.0
+            w[1][2] = gamma*w[4][2]/((gamma - 1)*hinf)
+
+    # Body conditions
+    p[1] = p[2]
+    rho[1] = gamma*p[1]/((gamma - 1)*hinf)
+    return delm, betloc
+
+class JitSolver(ArraySolver):
+    '''Axisymmetric PNS solver using the compiled point by point sweep'''
+
+    def initSolver(self):
+        '''Initialize flow field and station data as NumPy arrays'''
+        ArraySolver.initSolver(self)
+        self.rb  = np.array(self.rb)
+        self.rbx = np.array(self.rbx)
+        self.rs  = np.array(self.rs)
+        self.rsx = np.array(self.rsx)
+        self.x   = np.array(self.x)
+
+    #--------------------------------------------------------------------
+    def precor(self):
+        '''MacCormack's Predictor Corrector Solver (compiled sweep)'''
+        delm, betloc = precorColumn(self.eta, self.rho, self.u, self.v,
+                                    self.p, self.rb, self.rbx, self.rs,
+                                    self.rsx, float(self.xmu1),
+                                    float(self.beta), float(self.dxi),
+                                    self.dinv, float(self.hinf),
+                                    float(self.pinf), bool(self.betloc))
+        self.delm = max(self.delm, delm)
+        self.betloc = bool(betloc)
+
+#================================================================================
+if __name__ == '__main__':
+
+    # time the first (compiling or cached) and later sweeps
+    import time
+    from .Body import OgiveCylinder
+    from .OuterBoundary import OuterCone
+    from .main import DEFAULTS
+
+    v = dict(DEFAULTS, output=None)
+    solver = JitSolver(v)
+    solver.mybody = OgiveCylinder()
+    solver.shock  = OuterCone(v['thetas'], solver.mybody.bodylength)
+    solver.body()
+    tic = time.perf_counter()
+    solver.precor()
+    first = time.perf_counter() - tic
+    tic = time.perf_counter()
+    for k in range(100):
+        solver.precor()
+    later = (time.perf_counter() - tic)/100
+    print("numba %s: first sweep %.4f s, then %.1f us per sweep" %
+          (numba.__version__ if numba else "not installed", first, later*1e6))
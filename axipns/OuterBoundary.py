@@ -8,96 +8,16 @@
 
 import math
 
-class OuterBoundary:
-    '''Class to manage outer computational boundary'''
+from .PiecewisePoly import PiecewisePoly, PolySegment
 
-    def __init__(self,x0,x1,poly):
-        '''CONSTRUCTOR - create polynomial for outer boundary'''
-        self.x0 = x0
-        self.x1 = x1
-        self.coef = []
-        self.degree = len(poly)
-        for c in poly:
-            self.coef.append(c)
-       
-    def getSegRadius(self,x):
-        '''Return the radius for a given x'''
-        xbar = (x-self.x0)/(self.x1-self.x0)
-        if (xbar < 0)or(xbar>1.0):
-            rad = -1.0
-        else:
-            # figure the polynomial
-            rad = self.coef[0]
-            for i in range(0,self.degree-1):
-                rad = rad*xbar+self.coef[i+1]
-        return rad
+# outer boundary segments are plain polynomial segments
+OuterBoundary = PolySegment
 
-    def getSegSlope(self,x):
-        '''Return the slope for a given x'''
-        xbar = (x - self.x0)/(self.x1 - self.x0)
-        if(xbar <0)or(xbar>1.0):
-            slope = 1.0
-            return slope
-        else:
-            factor = float(self.degree -1)
-            slope = factor*self.coef[0]
-            for i in range(0,self.degree-2):
-                 factor = factor-1.0
-                 slope = slope*xbar+factor*self.coef[i+1]
-        slope = slope / (self.x1-self.x0)
-        return slope
-    
-    def getSegCurvature(self,x):
-        '''Return the curvature for a given x'''
-        xbar = (x - self.x0)/(self.x1 - self.x0)
-        if(xbar <0)or(xbar>1.0):
-            curve = 1.5
-            return curve
-        else:
-            d1 = self.degree-2
-            d2 = self.degree-1
-            factor = float(d1*d2)
-            curve = factor*(self.coef[0])
-            for i in range(0,self.degree-3):
-                d1 = d1-1
-                d2 = d2-1
-                factor = float(d1*d2)
-                curve = curve*xbar+factor*self.coef[i+1]
-            curve = curve / (self.x1 - self.x0)**2
-        return curve
-    
-class Boundary:
+class Boundary(PiecewisePoly):
     '''Class to manage outer boundary definition'''
     def __init__(self,segments):
-        '''CONSTRUCTOR - initialize segment array for this body'''
-        self.segments = segments
-
-    def getRadius(self,x):
-        '''Return radius for any given x on a segmented body'''
-        nseg = len(self.segments)
-        for seg in range (0,nseg):
-            rad= self.segments[seg].getSegRadius(x)
-            if rad > 0.0:
-                break
-        return rad
-
-    def getSlope(self,x):
-        '''Return slope for any given x on a segmented body'''
-        nseg = len(self.segments)
-        for seg in range (0,nseg):
-            slope= self.segments[seg].getSegSlope(x)
-            if slope < 1.0:
-                break
-        return slope
-    
-    def getCurvature(self,x):
-        '''Return curvature for any given x on a segmented outer boundary'''
-        nseg=len(self.segments)
-        for seg in range(0,nseg):
-            curve = self.segments[seg].getSegCurvature(x)
-            if (curve < 1.0):
-                break
-        return curve
+        '''CONSTRUCTOR - initialize segment array for this boundary'''
+        PiecewisePoly.__init__(self,segments)
         
 class OuterCone:
     '''Test Outer Boundary for CFDexplorer'''
@@ -143,6 +63,18 @@ class OuterCone:
            x = x + dx
            curves.append([x/dx,y/dx])
         return curves
+
+    def getBoundaryPointArray(self,num,dx,scale):
+        '''Array version of getBoundaryPoints, shape (num, 2)'''
+        return self.body.pointArray(num,dx,scale)
+
+    def getBoundarySlopeArray(self,num,dx,scale):
+        '''Array version of getBoundarySlopes, shape (num, 2)'''
+        return self.body.slopeArray(num,dx,scale)
+
+    def getBoundaryCurvatureArray(self,num,dx,scale):
+        '''Array version of getBoundaryCurvatures, shape (num, 2)'''
+        return self.body.curvatureArray(num,dx,scale)
     
 if __name__ == "__main__":
     
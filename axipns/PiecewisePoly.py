@@ -0,0 +1,271 @@
+#--------------------------------------------------------------------
+# File:     PiecewisePoly.py
+#--------------------------------------------------------------------
+
+# Piecewise polynomial geometry kernel
+#   Bodies and outer boundaries are chains of polynomial segments in the
+#   local coordinate xbar = (x - x0)/(x1 - x0), coefficients highest
+#   power first. The function, slope and curvature coefficients are all
+#   worked out once at construction, and a point is placed in its segment
+#   by bisection, so a lookup costs the same for three segments or three
+#   hundred. The array evaluation builds its NumPy tables on first use;
+#   scalar lookups never import NumPy.
+
+import bisect
+
+class PolySegment:
+    '''Class to manage one polynomial segment'''
+
+    def __init__(self,x0,x1,poly):
+        '''CONSTRUCTOR - create polynomial for segment'''
+        self.x0 = x0
+        self.x1 = x1
+        self.coef = []
+        self.degree = len(poly)
+        for c in poly:
+            self.coef.append(c)
+
+    def getSegRadius(self,x):
+        '''Return the radius for a given x'''
+        xbar = (x-self.x0)/(self.x1-self.x0)
+        if (xbar < 0)or(xbar>1.0):
+            rad = -1.0
+        else:
+            # figure the polynomial
+            rad = self.coef[0]
+            for i in range(0,self.degree-1):
+                rad = rad*xbar+self.coef[i+1]
+        return rad
+
+    def getSegSlope(self,x):
+        '''Return the slope for a given x'''
+        xbar = (x - self.x0)/(self.x1 - self.x0)
+        if(xbar <0)or(xbar>1.0):
+            slope = 1.0
+            return slope
+        else:
+            factor = float(self.degree -1)
+            slope = factor*self.coef[0]
+            for i in range(0,self.degree-2):
+                 factor = factor-1.0
+                 slope = slope*xbar+factor*self.coef[i+1]
+        slope = slope / (self.x1-self.x0)
+        return slope
+
+    def getSegCurvature(self,x):
+        '''Return the curvature for a given x'''
+        xbar = (x - self.x0)/(self.x1 - self.x0)
+        if(xbar <0)or(xbar>1.0):
+            curve = 1.5
+            return curve
+        else:
+            d1 = self.degree-2
+            d2 = self.degree-1
+            factor = float(d1*d2)
+            curve = factor*(self.coef[0])
+            for i in range(0,self.degree-3):
+                d1 = d1-1
+                d2 = d2-1
+                factor = float(d1*d2)
+                curve = curve*xbar+factor*self.coef[i+1]
+            curve = curve / (self.x1 - self.x0)**2
+        return curve
+
+class PiecewisePoly:
+    '''Array backed chain of polynomial segments'''
+
+    # values returned for x off the chain (same as the segment classes)
+    offRadius    = -1.0
+    offSlope     = 1.0
+    offCurvature = 1.5
+
+    def __init__(self,segments):
+        '''CONSTRUCTOR - build lookup tables from a list of segments'''
+        self.segments = segments
+
+        # scalar tables: breakpoints and unpadded coefficient rows
+        self.x0s = [float(seg.x0) for seg in segments]
+        self.x1s = [float(seg.x1) for seg in segments]
+        self.spans = [float(seg.x1 - seg.x0) for seg in segments]
+        self.spans2 = [(seg.x1 - seg.x0)**2 for seg in segments]
+        self.rows = []
+        self.drows = []
+        self.ddrows = []
+        for seg in segments:
+            d = seg.degree
+            c = [float(a) for a in seg.coef]
+            self.rows.append(c)
+            self.drows.append([float(d-1-j)*c[j] for j in range(d-1)])
+            self.ddrows.append([float((d-2-j)*(d-1-j))*c[j]
+                                for j in range(d-2)])
+
+        # array tables, built by arrays() on first use
+        self.coef = None
+
+    @classmethod
+    def fromBreaks(cls,breaks,polys):
+        '''Build a chain from nseg+1 breakpoints and nseg coefficient lists'''
+        segments = []
+        for k in range(len(polys)):
+            segments.append(PolySegment(breaks[k], breaks[k+1], polys[k]))
+        return cls(segments)
+
+    @classmethod
+    def fromPoints(cls,x,r):
+        '''Build a piecewise linear chain through tabulated (x, r) points'''
+        polys = []
+        for k in range(len(x)-1):
+            polys.append([r[k+1]-r[k], r[k]])
+        return cls.fromBreaks(x, polys)
+
+    # scalar evaluation -------------------------------------------------
+
+    def findSegment(self,x):
+        '''Return (segment, xbar) for x, segment is -1 off the chain'''
+        k = bisect.bisect_left(self.x1s, x)
+        if k == len(self.x1s) or x < self.x0s[k]:
+            return -1, 0.0
+        return k, (x - self.x0s[k])/self.spans[k]
+
+    def getRadius(self,x):
+        '''Return radius for any given x on the chain'''
+        k, xbar = self.findSegment(x)
+        if k < 0:
+            return self.offRadius
+        row = self.rows[k]
+        rad = row[0]
+        for c in row[1:]:
+            rad = rad*xbar + c
+        return rad
+
+    def getSlope(self,x):
+        '''Return slope for any given x on the chain'''
+        k, xbar = self.findSegment(x)
+        if k < 0:
+            return self.offSlope
+        row = self.drows[k]
+        if not row:
+            return 0.0
+        slope = row[0]
+        for c in row[1:]:
+            slope = slope*xbar + c
+        return slope / self.spans[k]
+
+    def getCurvature(self,x):
+        '''Return curvature for any given x on the chain'''
+        k, xbar = self.findSegment(x)
+        if k < 0:
+            return self.offCurvature
+        row = self.ddrows[k]
+        if not row:
+            return 0.0
+        curve = row[0]
+        for c in row[1:]:
+            curve = curve*xbar + c
+        return curve / self.spans2[k]
+
+    # array evaluation --------------------------------------------------
+
+    def arrays(self):
+        '''Build the array tables, rows padded with leading zeros'''
+        import numpy as np
+        nseg = len(self.segments)
+        ncoef = max(seg.degree for seg in self.segments)
+        self.xs0 = np.array(self.x0s)
+        self.xs1 = np.array(self.x1s)
+        self.span = np.array(self.spans)
+        self.span2 = np.array(self.spans2)
+        self.dcoef = np.zeros((nseg, max(ncoef-1, 1)))
+        self.ddcoef = np.zeros((nseg, max(ncoef-2, 1)))
+        coef = np.zeros((nseg, ncoef))
+        for k in range(nseg):
+            for table, row in ((coef, self.rows[k]),
+                               (self.dcoef, self.drows[k]),
+                               (self.ddcoef, self.ddrows[k])):
+                if row:
+                    table[k, table.shape[1]-len(row):] = row
+        self.coef = coef
+
+    def locate(self,x):
+        '''Return segment index, local xbar and on-chain mask for an x array'''
+        import numpy as np
+        if self.coef is None:
+            self.arrays()
+        x = np.asarray(x, dtype=float)
+        seg = np.searchsorted(self.xs1, x, side='left')
+        inside = seg < len(self.segments)
+        seg = np.minimum(seg, len(self.segments)-1)
+        inside &= x >= self.xs0[seg]
+        xbar = (x - self.xs0[seg])/self.span[seg]
+        return seg, xbar, inside
+
+    def horner(self,table,seg,xbar):
+        '''Evaluate padded coefficient rows by Horner's rule'''
+        c = table[seg]
+        val = c[..., 0]
+        for j in range(1, table.shape[1]):
+            val = val*xbar + c[..., j]
+        return val
+
+    def getRadii(self,x):
+        '''Return radii for an array of x values'''
+        import numpy as np
+        seg, xbar, inside = self.locate(x)
+        rad = self.horner(self.coef, seg, xbar)
+        return np.where(inside, rad, self.offRadius)
+
+    def getSlopes(self,x):
+        '''Return slopes for an array of x values'''
+        import numpy as np
+        seg, xbar, inside = self.locate(x)
+        slope = self.horner(self.dcoef, seg, xbar)
+        return np.where(inside, slope/self.span[seg], self.offSlope)
+
+    def getCurvatures(self,x):
+        '''Return curvatures for an array of x values'''
+        import numpy as np
+        seg, xbar, inside = self.locate(x)
+        curve = self.horner(self.ddcoef, seg, xbar)
+        return np.where(inside, curve/self.span2[seg], self.offCurvature)
+
+    # sampled tables -----------------------------------------------------
+
+    def sampleX(self,num,dx):
+        '''Return the x positions used by the point helpers'''
+        import numpy as np
+        x = np.concatenate(([0.0], np.cumsum(np.full(num, float(dx)))))
+        return x
+
+    def sampled(self,values,num,dx,scale):
+        '''Return rows of (k+1, values(k*dx)*scale/dx) for k < num'''
+        import numpy as np
+        x = self.sampleX(num,dx)
+        y = values(x[:-1])*scale
+        return np.column_stack((x[1:]/dx, y/dx))
+
+    def pointArray(self,num,dx,scale):
+        '''Sampled radii, shape (num, 2)'''
+        return self.sampled(self.getRadii,num,dx,scale)
+
+    def slopeArray(self,num,dx,scale):
+        '''Sampled slopes, shape (num, 2)'''
+        return self.sampled(self.getSlopes,num,dx,scale)
+
+    def curvatureArray(self,num,dx,scale):
+        '''Sampled curvatures, shape (num, 2)'''
+        return self.sampled(self.getCurvatures,num,dx,scale)
+
+if __name__ == "__main__":
+
+    # a tabulated shape with many segments against a single polynomial
+    import math
+    import timeit
+
+    xt = [0.1*i for i in range(501)]
+    rt = [math.sqrt(x) for x in xt]
+    table = PiecewisePoly.fromPoints(xt, rt)
+    cone = PiecewisePoly.fromBreaks([0.0, 50.0], [[20.0, 0.0]])
+    for name, shape in (("cone", cone), ("table", table)):
+        t = timeit.timeit(lambda: shape.getRadius(23.45), number=100000)
+        print("%-6s %4d segments %8.3f us per lookup" %
+              (name, len(shape.segments), t*10.0))
@@ -0,0 +1,88 @@
+#--------------------------------------------------------------------
+# File:     Primitives.py
+#--------------------------------------------------------------------
+
+# Array version of AXIsolver.solve
+#   Reduces the conservative solution vector (aa, bb, cc) to the
+#   primitive values rho, u, v, p for a whole column, or for a batch of
+#   columns stacked along leading axes, in one call.
+
+import numpy as np
+
+def solvePrimitives(aa,bb,cc,hinf,betloc=False,stats=None):
+    '''Reduce solution vectors to primitive values
+
+    aa, bb and cc have shape (..., npts) with the last axis running up
+    the eta column; its first entry is the point next to the wall
+    (i == 2 in the solver). hinf and betloc are scalars or arrays over
+    the leading axes (one value per case). betloc is the state of the
+    local beta flag before the column is reduced. The results have the
+    working dtype of aa, bb and cc.
+
+    Returns rho, u, v, p and a mask of the points where phi passed the
+    betloc threshold. stats, if given, is a SolverStats that counts the
+    reduced points and radical branch hits.
+    '''
+    gamma = 1.4
+    hinf = np.asarray(hinf)[..., np.newaxis] if np.ndim(hinf) else hinf
+
+    # phi and the radical are always formed in float64: near phm the
+    # radical 1 - phi - phi/gamma loses all its digits in float32
+    work = np.result_type(aa, bb, cc)
+    a64, b64, c64 = aa, bb, cc
+    if work != np.float64:
+        a64, b64, c64 = [np.asarray(a, dtype=np.float64) for a in (aa, bb, cc)]
+    xk = hinf - 0.5*(c64/a64)**2
+    phi = 2*(gamma-1) * xk * a64 * a64/(gamma * b64 * b64)
+    phm = gamma/(gamma+1)
+    phs = 0.95 * phm
+    hits = phi > phs
+
+    # clamp the wall point once the local beta flag is set
+    clamp = np.logical_or(betloc, hits[..., 0])
+    phi[..., 0] = np.where(clamp, phm, phi[..., 0])
+
+    # we restrict solutions to supersonic. As long as phi is less that phm
+    #   we ignore the radical in calculating phi.
+    sub = phi < phm
+    rad = np.where(sub, np.sqrt(np.where(sub, 1.0 - phi - phi/gamma, 0.0)),
+                   0.0)
+    den = gamma*phi - (gamma - 1)
+    if stats is not None:
+        stats.count('solve_calls')
+        stats.count('solve_points', phi.size)
+        stats.count('radical_hits', int(np.count_nonzero(sub)))
+
+    # calculate  M_x^2
+    xmx = (1.0 - phi + rad)/den
+    if work != np.float64:
+        xmx = xmx.astype(work)
+        xk = xk.astype(work)
+
+    pp = bb /(1.0 + gamma*xmx)
+    tt = xk/(1.0 + 0.2*xmx)
+    rr = 1.4*pp/((gamma - 1)*tt)
+    uu = aa / rr
+    vv = cc / aa
+    return rr, uu, vv, pp, hits
+
+if __name__ == '__main__':
+
+    # compare against the point by point reduction of AXIsolver.solve
+    from .AXIsolver import AXIsolver
+
+    class Probe(AXIsolver):
+        def __init__(self):
+            self.hinf = (1.0+2.0/(0.4*5.95**2))/2.0
+            self.betloc = False
+
+    probe = Probe()
+    aa = np.linspace(0.8, 1.2, 9)
+    bb = np.linspace(1.0, 1.3, 9)
+    cc = np.linspace(0.0, 0.05, 9)
+    rr, uu, vv, pp, hits = solvePrimitives(aa, bb, cc, probe.hinf)
+    for j in range(len(aa)):
+        probe.solve(j+2, aa[j], bb[j], cc[j])
+        print("%2d %12.8f %12.8f %12.8f %12.8f" %
+              (j+2, probe.rr-rr[j], probe.uu-uu[j], probe.vv-vv[j],
+               probe.pp-pp[j]))
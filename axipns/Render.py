@@ -0,0 +1,136 @@
+#--------------------------------------------------------------------
+# File:     Render.py
+#--------------------------------------------------------------------
+
+# Headless animation frames
+#   Renders one property of a stored solution (text or binary, see
+#   SolutionReader) as a PNG per station with the Agg backend, no
+#   display needed. Stations are split into contiguous blocks over a
+#   pool of worker processes; each worker builds its figure once and
+#   redraws the line for every frame. The frames can then be assembled
+#   into an animated GIF with Pillow.
+#
+#       python -m axipns.Render solution.dat --prop 6 --out frames --gif mach.gif
+
+import concurrent.futures
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .Animate import DisplayProperty
+from .SolutionReader import openSolution
+
+FRAME = "frame_%05d.png"
+
+def renderBlock(path,prop,stations,outdir,limits,dpi=100,size=(6.4, 4.8)):
+    '''Render the given stations to PNG files, return (count, seconds)'''
+    tic = time.perf_counter()
+    reader = openSolution(path)
+    fig = Figure(figsize=size)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    ax.set_xlim(*limits)
+    ax.set_ylim(0, 1)
+    ax.set_xlabel(DisplayProperty.propName[prop])
+    ax.set_ylabel("eta")
+    ax.grid(True)
+    line, = ax.plot([], [], 'k-')
+    title = ax.set_title("")
+    y = reader.eta
+    for k in stations:
+        block = reader.station(k)
+        line.set_data(block[prop], y)
+        title.set_text("station %d  x = %.5f" % (k, block[0, 0]))
+        fig.savefig(os.path.join(outdir, FRAME % k), dpi=dpi)
+    return len(stations), time.perf_counter() - tic
+
+def renderFrames(path,prop,outdir,stations=None,workers=None,dpi=100):
+    '''Render a property at every station (or the given ones) to outdir
+
+    Returns a dict with the frame files and the timing. workers=1 draws
+    in this process.
+    '''
+    tic = time.perf_counter()
+    reader = openSolution(path)
+    if stations is None:
+        stations = list(range(len(reader)))
+    os.makedirs(outdir, exist_ok=True)
+    lo, hi = reader.limits(prop)
+    limits = (lo, hi if hi > lo else lo + 1.0)
+
+    workers = workers or os.cpu_count() or 1
+    workers = max(min(workers, len(stations)), 1)
+    if workers == 1:
+        renderBlock(path, prop, stations, outdir, limits, dpi)
+    else:
+        # contiguous blocks keep each worker's reads together
+        blocks = [stations[w*len(stations)//workers:
+                           (w+1)*len(stations)//workers]
+                  for w in range(workers)]
+        with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+            jobs = [pool.submit(renderBlock, path, prop, block, outdir,
+                                limits, dpi) for block in blocks]
+            for job in jobs:
+                job.result()
+    seconds = time.perf_counter() - tic
+    return {
+        'frames':  [os.path.join(outdir, FRAME % k) for k in stations],
+        'workers': workers,
+        'seconds': seconds,
+        'rate':    len(stations)/seconds if seconds > 0 else float('inf'),
+    }
+
+def makeGif(frames,path,fps=10):
+    '''Assemble PNG frames into an animated GIF'''
+    from PIL import Image
+
+    if not frames:
+        raise ValueError("no frames to assemble into %s" % path)
+
+    # grey scale copies (the plots are black line art), so the PNG files
+    # are closed as they are read
+    images = []
+    for name in frames:
+        with Image.open(name) as image:
+            images.append(image.convert('L'))
+    images[0].save(path, save_all=True, append_images=images[1:],
+                   duration=int(1000/fps), loop=0)
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="render solution frames without a display")
+    parser.add_argument('path', nargs='?', default="solution.dat")
+    parser.add_argument('--prop', type=int, default=7,
+                        help="property number (see Animate.propName)")
+    parser.add_argument('--out', default="frames",
+                        help="directory for the PNG frames")
+    parser.add_argument('--every', type=int, default=1,
+                        help="render every n-th station")
+    parser.add_argument('--workers', type=int,
+                        help="worker processes (default one per core)")
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--gif', help="also write an animated GIF")
+    parser.add_argument('--fps', type=float, default=10)
+    args = parser.parse_args(argv)
+
+    reader = openSolution(args.path)
+    stations = list(range(0, len(reader), max(args.every, 1)))
+    result = renderFrames(args.path, args.prop, args.out, stations,
+                          args.workers, args.dpi)
+    print("%d frames of %s in %.2f s on %d workers (%.1f frames/s)" %
+          (len(stations), DisplayProperty.propName[args.prop],
+           result['seconds'], result['workers'], result['rate']))
+    if args.gif:
+        tic = time.perf_counter()
+        makeGif(result['frames'], args.gif, args.fps)
+        print("%s written in %.2f s" % (args.gif, time.perf_counter() - tic))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,391 @@
+#--------------------------------------------------------------------
+# File:     Service.py
+#--------------------------------------------------------------------
+
+# Local solver service
+#   A long running asyncio server on a Unix socket or a loopback port.
+#   Cases are queued onto a pool of warm worker processes (the body is
+#   built once per worker, see Sweep.initWorker) and each caller gets a
+#   stream of newline delimited JSON events:
+#
+#       {"op": "solve", "id": 1, "values": {...}, "geometry": {...}}
+#
+#       {"event": "queued",   "id": 1, "job": 3, "shared": false}
+#       {"event": "progress", "id": 1, "job": 3, "mit": 250, "x": ...}
+#       {"event": "result",   "id": 1, "job": 3, "result": {...}}
+#
+#   values may leave keys out as a case file does (see main), so
+#   {"minf": 6.5} is a request; geometry only names the body. The
+#   result is the Sweep summary row. With the defaults filled in, a
+#   request identical to one in flight joins it, and one identical to a
+#   recently finished case gets the stored result at once
+#   ("cached": true). {"op": "stats"} reports
+#   the queue and cache counters, {"op": "ping"} answers "pong".
+#
+#       python -m axipns.Service serve --socket /tmp/axipns.sock
+#       python -m axipns.Service submit case.json --socket /tmp/axipns.sock
+
+import asyncio
+import collections
+import concurrent.futures
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+
+from . import Sweep
+from .ConicalCache import digest
+from .main import DEFAULTS, checkValues, loadCases
+
+# geometry the workers can build
+GEOMETRIES = ('ogive-cylinder',)
+
+# progress queue of this worker process
+_progress = None
+_every = 25
+
+def ping():
+    return True
+
+def initService(progress,every=25):
+    '''Worker initializer: build the geometry, keep the progress queue'''
+    global _progress, _every
+    Sweep.initWorker()
+    _progress = progress
+    _every = every
+
+class ProgressReporter:
+    '''Solver observer posting the iteration state to the service'''
+
+    def __init__(self,job):
+        self.job = job
+
+    def __call__(self,solver):
+        if solver.mit % _every == 0:
+            _progress.put({'job': self.job, 'mit': int(solver.mit),
+                           'march': bool(solver.march),
+                           'x': float(solver.x[2]),
+                           'delm': float(solver.delm)})
+
+def solveJob(job,values):
+    '''Run one case in a worker and return its row as plain JSON types'''
+    row = Sweep.runCase(job, values, observers=[ProgressReporter(job)])
+    for key, value in row.items():
+        if hasattr(value, 'tolist'):
+            row[key] = value.tolist()
+    return row
+
+def caseKey(values):
+    '''Return the content hash identifying a request (6 and 6.0 alike)
+
+    values are the full solver inputs, defaults filled in, so requests
+    differing only in the keys they leave out share a key.
+    '''
+    return digest({'values': values})
+
+class Job:
+    '''One case being solved and the streams waiting on it'''
+
+    def __init__(self,number,key):
+        self.number = number
+        self.key = key
+        self.listeners = []
+        self.result = None
+        self.error = None
+
+    def publish(self,event):
+        for queue in self.listeners:
+            queue.put_nowait(event)
+
+#--------------------------------------------------------------------
+class SolverService:
+    '''Queue cases onto warm workers, share identical requests'''
+
+    def __init__(self,workers=None,keep=128,every=25):
+        self.workers = workers or os.cpu_count() or 1
+        self.keep = keep
+        self.every = every
+        self.running = {}
+        self.done = collections.OrderedDict()
+        self.jobs = {}
+        self.counts = {'submitted': 0, 'computed': 0, 'shared': 0,
+                       'cached': 0, 'failed': 0}
+        self.pool = None
+        self.server = None
+
+    async def start(self,path=None,host='127.0.0.1',port=0):
+        '''Start the workers and listen on a Unix socket or loopback port'''
+        self.loop = asyncio.get_running_loop()
+
+        # workers must not inherit client sockets (a connection held open
+        # by a worker never reaches EOF): they come from a fork server,
+        # and are all started before the server listens
+        method = 'forkserver'
+        if method not in multiprocessing.get_all_start_methods():
+            method = 'spawn'
+        ctx = multiprocessing.get_context(method)
+        self.progress = ctx.Queue()
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            self.workers, mp_context=ctx, initializer=initService,
+            initargs=(self.progress, self.every))
+        await asyncio.gather(*[self.loop.run_in_executor(self.pool, ping)
+                               for _ in range(self.workers)])
+        self.relay = threading.Thread(target=self.relayProgress,
+                                      name="ServiceProgress", daemon=True)
+        self.relay.start()
+        if path:
+            if os.path.exists(path):
+                os.unlink(path)
+            self.server = await asyncio.start_unix_server(self.handle, path)
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    def address(self):
+        '''Return the socket path or (host, port) clients connect to'''
+        sock = self.server.sockets[0]
+        if sock.family == socket.AF_UNIX:
+            return sock.getsockname()
+        return sock.getsockname()[:2]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+        # waiting for the workers blocks, keep it off the event loop
+        await self.loop.run_in_executor(
+            None, lambda: self.pool.shutdown(wait=True, cancel_futures=True))
+        self.progress.put(None)
+        await self.loop.run_in_executor(None, self.relay.join)
+
+    def relayProgress(self):
+        '''Hand worker progress messages to the event loop'''
+        while True:
+            msg = self.progress.get()
+            if msg is None:
+                return
+            self.loop.call_soon_threadsafe(self.publishProgress, msg)
+
+    def publishProgress(self,msg):
+        job = self.jobs.get(msg['job'])
+        if job and job.result is None:
+            job.publish(dict(msg, event='progress'))
+
+    #--------------------------------------------------------------------
+    def submit(self,values,geometry):
+        '''Return (job, how) for a request, starting a new case if needed
+
+        how is 'new', 'shared' (joined a case in flight) or 'cached'.
+        values may leave keys out, as a case file may (see main). The
+        workers build the one body in GEOMETRIES, so geometry is only
+        checked and does not enter the case key.
+        '''
+        geometry = dict(geometry or {})
+        body = geometry.pop('body', 'ogive-cylinder')
+        if body not in GEOMETRIES:
+            raise ValueError("unknown body '%s' (use one of %s)" %
+                             (body, ", ".join(GEOMETRIES)))
+        if geometry:
+            raise ValueError("unknown geometry settings: %s" %
+                             ", ".join(sorted(geometry)))
+        if not isinstance(values, dict):
+            raise TypeError("values must be an object")
+        values = dict(DEFAULTS, **values)
+        checkValues(values, "values")
+        key = caseKey(values)
+        self.counts['submitted'] += 1
+        if key in self.done:
+            self.done.move_to_end(key)
+            self.counts['cached'] += 1
+            return self.done[key], 'cached'
+        if key in self.running:
+            self.counts['shared'] += 1
+            return self.running[key], 'shared'
+
+        job = Job(self.counts['submitted'], key)
+        self.running[key] = job
+        self.jobs[job.number] = job
+        future = self.loop.run_in_executor(self.pool, solveJob, job.number,
+                                           values)
+        future.add_done_callback(lambda f: self.finish(job, f))
+        return job, 'new'
+
+    def finish(self,job,future):
+        '''Publish a finished case and keep it for repeat requests'''
+        del self.running[job.key]
+        del self.jobs[job.number]
+        try:
+            job.result = future.result()
+        except Exception as err:
+            job.error = "%s: %s" % (type(err).__name__, err)
+            self.counts['failed'] += 1
+            job.publish({'event': 'error', 'job': job.number,
+                         'error': job.error})
+            return
+        self.counts['computed'] += 1
+        job.publish({'event': 'result', 'job': job.number,
+                     'result': job.result})
+        self.done[job.key] = job
+        while len(self.done) > self.keep:
+            self.done.popitem(last=False)
+
+    def stats(self):
+        return dict(self.counts, workers=self.workers,
+                    running=len(self.running), stored=len(self.done))
+
+    #--------------------------------------------------------------------
+    async def handle(self,reader,writer):
+        '''Serve one connection; requests may be pipelined'''
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def send(event):
+            async with lock:
+                writer.write(json.dumps(event).encode('utf-8') + b'\n')
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError as err:
+                    await send({'event': 'error', 'error': str(err)})
+                    continue
+                task = asyncio.ensure_future(self.request(request, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def request(self,request,send):
+        '''Answer one request, streaming solve events'''
+        rid = request.get('id')
+        op = request.get('op', 'solve')
+        if op == 'ping':
+            await send({'event': 'pong', 'id': rid})
+            return
+        if op == 'stats':
+            await send({'event': 'stats', 'id': rid, 'stats': self.stats()})
+            return
+        if op != 'solve':
+            await send({'event': 'error', 'id': rid,
+                        'error': "unknown op '%s'" % op})
+            return
+        try:
+            job, how = self.submit(request['values'],
+                                   request.get('geometry'))
+        except (KeyError, TypeError, ValueError) as err:
+            await send({'event': 'error', 'id': rid,
+                        'error': "bad request: %s" % err})
+            return
+        if how == 'cached':
+            await send({'event': 'result', 'id': rid, 'job': job.number,
+                        'cached': True, 'result': job.result})
+            return
+        queue = asyncio.Queue()
+        job.listeners.append(queue)
+        await send({'event': 'queued', 'id': rid, 'job': job.number,
+                    'shared': how == 'shared'})
+        while True:
+            event = await queue.get()
+            event['id'] = rid
+            await send(event)
+            if event['event'] != 'progress':
+                return
+
+#--------------------------------------------------------------------
+def connect(address):
+    '''Open a client socket to a service path or (host, port)'''
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.connect(address)
+    return sock
+
+def submit(values,address,geometry=None,progress=None):
+    '''Solve one case on a running service and return the result row
+
+    A blocking client, usable from notebooks. progress, if given, is
+    called with each progress event. Raises RuntimeError if the service
+    reports an error.
+    '''
+    with connect(address) as sock:
+        request = {'op': 'solve', 'id': 0, 'values': values,
+                   'geometry': geometry or {}}
+        sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        with sock.makefile('r', encoding='utf-8') as fin:
+            for line in fin:
+                event = json.loads(line)
+                if event['event'] == 'result':
+                    return event['result']
+                if event['event'] == 'error':
+                    raise RuntimeError(event['error'])
+                if event['event'] == 'progress' and progress:
+                    progress(event)
+    raise RuntimeError("service closed the connection")
+
+def request(op,address):
+    '''Send a stats or ping request and return the answer'''
+    with connect(address) as sock:
+        sock.sendall(json.dumps({'op': op}).encode('utf-8') + b'\n')
+        with sock.makefile('r', encoding='utf-8') as fin:
+            return json.loads(fin.readline())
+
+async def serve(path=None,host='127.0.0.1',port=0,workers=None):
+    service = SolverService(workers)
+    await service.start(path, host, port)
+    print("axipns service on %s with %d workers" %
+          (service.address(), service.workers), flush=True)
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.close()
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="axipns solver service")
+    parser.add_argument('mode', choices=('serve', 'submit', 'stats'))
+    parser.add_argument('cases', nargs='*',
+                        help="case files of solver values (submit)")
+    parser.add_argument('--socket', help="Unix socket path")
+    parser.add_argument('--port', type=int, default=0,
+                        help="loopback port when no socket is given")
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args(argv)
+    address = args.socket or ('127.0.0.1', args.port)
+
+    if args.mode == 'serve':
+        try:
+            asyncio.run(serve(args.socket, port=args.port,
+                              workers=args.workers))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.mode == 'stats':
+        print(json.dumps(request('stats', address)['stats'], indent=2))
+        return 0
+
+    def show(event):
+        print("  job %d  mit %5d  x = %.5f" % (event['job'], event['mit'],
+                                              event['x']))
+
+    for path in args.cases:
+        for name, values in loadCases(path):
+            row = submit(values, address, progress=show)
+            pw = row['wall_p'][-1] if row['wall_p'] else float('nan')
+            print("%s: %s, %d steps, x = %.5f, p_wall = %.6f" %
+                  (name, row['status'], row['xstep'], row['xend'], pw))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
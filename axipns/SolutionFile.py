@@ -0,0 +1,117 @@
+#--------------------------------------------------------------------
+# File:     SolutionFile.py
+#--------------------------------------------------------------------
+
+# Binary solution output
+#   Each printed station is stored as a (9, neta) block of float64
+#   values in a standard .npy file of shape (nstations, 9, neta):
+#
+#       0  x (axial location, repeated across the column)
+#       1  Density          5  Static Temperature
+#       2  Axial Velocity   6  Mach Number
+#       3  Radial Velocity  7  Total Pressure
+#       4  Static Pressure  8  eta (the grid, see Grid)
+#
+#   The property numbers match Animate.DisplayProperty.propName. The
+#   column runs from the wall (i = 1) out to the outer boundary. The
+#   header has a fixed size so the file can grow in place; space is
+#   reserved a chunk of stations at a time and trimmed on close.
+
+import struct
+
+import numpy as np
+
+HEADER = 128        # bytes reserved for the .npy header
+NPROP  = 9
+ETA    = 8          # row holding the eta grid
+
+def stationColumns(solver):
+    '''Return the (9, neta) output block for the current solver station'''
+    n = solver.neta
+    rho = np.asarray(solver.rho[1:n+1], dtype=float)
+    u   = np.asarray(solver.u[1:n+1], dtype=float)
+    v   = np.asarray(solver.v[1:n+1], dtype=float)
+    p   = np.asarray(solver.p[1:n+1], dtype=float)
+    q2  = u*u + v*v
+    t   = solver.hinf - 0.5*q2
+    xm  = np.sqrt(q2/(0.4*t))
+    xm[0] = 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pt = p/solver.pinf*(xm/solver.xminf)**7 \
+            *((7.0*solver.xminf**2-1.0)/(7.0*xm**2-1.0))**2.5
+    pt[0] = p[0]
+    block = np.empty((NPROP, n))
+    block[0] = solver.x[2]
+    block[1] = rho
+    block[2] = u
+    block[3] = v
+    block[4] = p
+    block[5] = t
+    block[6] = xm
+    block[7] = pt
+    block[ETA] = np.asarray(solver.eta[1:n+1], dtype=float)
+    return block
+
+def writeHeader(fout,shape):
+    '''Write a fixed size float64 .npy header for shape at the file start'''
+    d = "{'descr': '<f8', 'fortran_order': False, 'shape': %s, }" \
+        % (tuple(shape),)
+    d = d.ljust(HEADER - 11) + '\n'
+    fout.seek(0)
+    fout.write(b'\x93NUMPY\x01\x00')
+    fout.write(struct.pack('<H', len(d)))
+    fout.write(d.encode('latin1'))
+
+class SolutionWriter:
+    '''Append station blocks to a growable .npy file'''
+
+    def __init__(self,path,neta,chunk=64,count=None):
+        '''Create the file, or with count reopen it keeping count stations'''
+        self.path  = path
+        self.neta  = neta
+        self.chunk = chunk
+        self.recsize = NPROP * neta * 8
+        if count is None:
+            self.count = 0
+            self.fout = open(path, 'w+b')
+        else:
+            self.count = count
+            self.fout = open(path, 'r+b')
+        self.capacity = self.count
+        self.fout.truncate(HEADER + self.count*self.recsize)
+        self.writeHeader()
+
+    def writeHeader(self):
+        '''Write the .npy header for the stations stored so far'''
+        writeHeader(self.fout, (self.count, NPROP, self.neta))
+
+    def append(self,block):
+        '''Add one (9, neta) station block'''
+        if self.count == self.capacity:
+            self.capacity += self.chunk
+            self.fout.truncate(HEADER + self.capacity*self.recsize)
+        self.fout.seek(HEADER + self.count*self.recsize)
+        self.fout.write(np.ascontiguousarray(block, dtype='<f8').tobytes())
+        self.count += 1
+        self.writeHeader()
+
+    def flush(self):
+        self.fout.flush()
+
+    def close(self):
+        '''Trim the reserved space and close the file'''
+        self.fout.truncate(HEADER + self.count*self.recsize)
+        self.writeHeader()
+        self.fout.close()
+
+def loadSolution(path,mmap=True):
+    '''Return the (nstations, 9, neta) solution array, memory mapped'''
+    return np.load(path, mmap_mode='r' if mmap else None)
+
+if __name__ == '__main__':
+    import sys
+    data = loadSolution(sys.argv[1] if len(sys.argv) > 1 else "solution.npy")
+    print("%d stations, %d points" % (data.shape[0], data.shape[2]))
+    for k in range(data.shape[0]):
+        print("x = %10.5f  p_wall = %12.8f  M_edge = %10.5f" %
+              (data[k, 0, 0], data[k, 4, 0], data[k, 6, -1]))
@@ -0,0 +1,185 @@
+#--------------------------------------------------------------------
+# File:     SolutionReader.py
+#--------------------------------------------------------------------
+
+# Indexed solution reader
+#   Opening a solution file only builds a station index: the byte offset
+#   of each "Axial Location" header in a text file, or the memory mapped
+#   (nstations, 9, neta) array of a binary .npy file (see SolutionFile).
+#   A station is parsed when it is first asked for and kept in a small
+#   LRU cache, and readers are shared per file, so animating several
+#   properties of one run reads the file once.
+#
+#   Stations come back as (9, neta) blocks in the SolutionFile layout,
+#   wall first, with row numbers matching Animate.DisplayProperty.propName:
+#
+#       0  x                 4  Static Pressure
+#       1  Density           5  Static Temperature
+#       2  Axial Velocity    6  Mach Number
+#       3  Radial Velocity   7  Total Pressure
+#                            8  eta
+#
+#   The text format prints x rounded to an integer, so row 0 of a text
+#   station is only as good as that header. A text file from a stretched
+#   grid starts with an "Eta =" line giving the grid; one without it is
+#   on the uniform grid. The grid is also kept as reader.eta.
+
+import collections
+import mmap
+import os
+import re
+
+import numpy as np
+
+from .SolutionFile import ETA, NPROP, loadSolution
+
+HEADER = re.compile(rb'^Axial Location = *(\S+)', re.MULTILINE)
+GRID = b'Eta ='
+
+# columns of a text station line: i, then the properties 1 -> 7
+NCOL = 8
+
+class SolutionReader:
+    '''Lazy station access to a text or binary solution file'''
+
+    def __init__(self,path,cache=1024):
+        self.path  = path
+        self.cache = collections.OrderedDict()
+        self.cachesize = max(int(cache), 1)
+        st = os.stat(path)
+        self.stamp = (st.st_mtime_ns, st.st_size)
+        if path.endswith('.npy'):
+            self.data = loadSolution(path)
+            self.offsets = None
+            self.x = None
+            self.nstations = self.data.shape[0]
+            self.neta = self.data.shape[2]
+            if self.nstations:
+                self.eta = np.array(self.data[0, ETA])
+            else:
+                self.eta = np.linspace(0, 1, self.neta)
+        else:
+            self.data = None
+            self.indexText()
+
+    def indexText(self):
+        '''Record where each station starts in the text file'''
+        offsets = []
+        xs = []
+        with open(self.path, 'rb') as fin:
+            if os.fstat(fin.fileno()).st_size == 0:
+                buf = b''
+            else:
+                buf = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+            for m in HEADER.finditer(buf):
+                offsets.append(m.end())
+                xs.append(float(m.group(1)))
+            end = len(buf)
+            if offsets:
+                # the column length from the first station
+                first = offsets[1] if len(offsets) > 1 else end
+                self.neta = buf[offsets[0]:first].count(b'\n') - 1
+            else:
+                self.neta = 0
+            if buf[:len(GRID)] == GRID:
+                line = buf[len(GRID):buf.find(b'\n')]
+                self.eta = np.array(line.split(), dtype=float)
+            else:
+                self.eta = np.linspace(0, 1, self.neta)
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+        self.offsets = offsets + [end]
+        self.x = xs
+        self.nstations = len(xs)
+
+    def __len__(self):
+        return self.nstations
+
+    #--------------------------------------------------------------------
+    def station(self,k):
+        '''Return the (9, neta) block for station k'''
+        if k < 0:
+            k = k + self.nstations
+        if not 0 <= k < self.nstations:
+            raise IndexError("station %d not in %s (%d stations)" %
+                             (k, self.path, self.nstations))
+        block = self.cache.get(k)
+        if block is not None:
+            self.cache.move_to_end(k)
+            return block
+        if self.data is not None:
+            block = np.array(self.data[k])
+        else:
+            block = self.parseStation(k)
+        self.cache[k] = block
+        if len(self.cache) > self.cachesize:
+            self.cache.popitem(last=False)
+        return block
+
+    def parseStation(self,k):
+        '''Read station k from the text file'''
+        start, end = self.offsets[k], self.offsets[k+1]
+        with open(self.path, 'rb') as fin:
+            fin.seek(start)
+            text = fin.read(end - start)
+
+        # columns are i, rho, u, v, p, T, M, pt from the outer boundary in
+        values = np.array(text.split()[:NCOL*self.neta], dtype=float)
+        rows = values.reshape(self.neta, NCOL)[::-1]
+        block = np.empty((NPROP, self.neta))
+        block[:NCOL] = rows.T
+        block[0] = self.x[k]
+        block[ETA] = self.eta
+        return block
+
+    def property(self,prop,k):
+        '''Return property prop (see propName) at station k, wall first'''
+        return self.station(k)[prop]
+
+    def frames(self,prop,stations=None):
+        '''Yield property prop at each station'''
+        for k in (range(self.nstations) if stations is None else stations):
+            yield self.property(prop, k)
+
+    def limits(self,prop):
+        '''Return the (min, max) of a property over the whole file'''
+        lo = np.inf
+        hi = -np.inf
+        for col in self.frames(prop):
+            lo = min(lo, float(np.nanmin(col)))
+            hi = max(hi, float(np.nanmax(col)))
+        return lo, hi
+
+    def current(self):
+        '''Return True if the file is unchanged since it was indexed'''
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return (st.st_mtime_ns, st.st_size) == self.stamp
+
+# one reader per solution file, rebuilt when the file changes
+_readers = {}
+
+def openSolution(path,cache=1024):
+    '''Return the shared reader for a solution file'''
+    key = os.path.abspath(path)
+    reader = _readers.get(key)
+    if reader is None or not reader.current():
+        reader = SolutionReader(path, cache)
+        _readers[key] = reader
+    return reader
+
+if __name__ == '__main__':
+    import sys
+    import time
+    path = sys.argv[1] if len(sys.argv) > 1 else "solution.dat"
+    tic = time.perf_counter()
+    reader = openSolution(path)
+    toc = time.perf_counter()
+    print("%s: %d stations, %d points, indexed in %.4f s" %
+          (path, len(reader), reader.neta, toc - tic))
+    if len(reader):
+        last = reader.station(-1)
+        print("last station: p_wall = %10.5f  M_edge = %10.5f" %
+              (last[4, 0], last[6, -1]))
@@ -0,0 +1,127 @@
+#--------------------------------------------------------------------
+# File:     SolverStats.py
+#--------------------------------------------------------------------
+
+# Solver instrumentation
+#   Phase timers and hot path counters for a solver run. Nothing here is
+#   touched unless a run asks for it (AXIsolver.enableStats): the solver
+#   methods are wrapped on that one instance only, and the array sweep
+#   checks a single stats argument.
+#
+#   Phases are nested: 'solve' time is part of 'precor', and for the
+#   array engine 'predictor' and 'corrector' are the two halves of
+#   'precor' without their reductions.
+
+import json
+import time
+
+class SolverStats:
+    '''Phase times and counters collected during a solver run'''
+
+    def __init__(self):
+        self.times = {}
+        self.calls = {}
+        self.counters = {
+            'solve_calls':        0,
+            'solve_points':       0,
+            'betloc_activations': 0,
+            'radical_hits':       0,
+            'conical_iterations': 0,
+            'marching_steps':     0,
+        }
+        self.peak_delm = 0.0
+        self.elapsed = 0.0
+        self.status = 'running'
+
+    def add(self,phase,dt):
+        '''Charge dt seconds to a phase'''
+        self.times[phase] = self.times.get(phase, 0.0) + dt
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def count(self,name,n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def timed(self,phase,func):
+        '''Return func wrapped to charge its run time to phase'''
+        clock = time.perf_counter
+        def wrapper(*args):
+            tic = clock()
+            try:
+                return func(*args)
+            finally:
+                self.add(phase, clock() - tic)
+        return wrapper
+
+    #--------------------------------------------------------------------
+    def attach(self,solver):
+        '''Instrument one solver instance'''
+        solver.body    = self.timed('body', solver.body)
+        solver.precor  = self.timed('precor', solver.precor)
+        solver.printer = self.timed('printer', solver.printer)
+        if getattr(solver, 'solve', None) is not None:
+            solver.solve = self.countedSolve(solver)
+        solver.observers.append(self)
+
+    def countedSolve(self,solver):
+        '''Wrap the point by point reduction with its counters'''
+        solve = self.timed('solve', solver.solve)
+        gamma = 1.4
+        phm = gamma/(gamma+1)
+        def wrapper(i,aa,bb,cc):
+            before = solver.betloc
+            solve(i,aa,bb,cc)
+            self.counters['solve_calls'] += 1
+            self.counters['solve_points'] += 1
+            if solver.betloc and not before:
+                self.counters['betloc_activations'] += 1
+            if not (i == 2 and solver.betloc):
+                xk = solver.hinf - 0.5*(cc/aa)**2
+                phi = 2*(gamma-1) * xk * aa * aa/(gamma * bb * bb)
+                if phi < phm:
+                    self.counters['radical_hits'] += 1
+        return wrapper
+
+    def __call__(self,solver):
+        '''Solver observer: count iterations and track delm'''
+        if solver.march:
+            self.counters['marching_steps'] += 1
+        else:
+            self.counters['conical_iterations'] += 1
+        if solver.delm > self.peak_delm:
+            self.peak_delm = float(solver.delm)
+
+    def finish(self,solver):
+        '''Record the end of the run'''
+        self.elapsed = solver.elapsed
+        self.status = solver.status
+
+    #--------------------------------------------------------------------
+    def asDict(self):
+        return {
+            'status':    self.status,
+            'elapsed':   self.elapsed,
+            'times':     dict(self.times),
+            'calls':     dict(self.calls),
+            'counters':  dict(self.counters),
+            'peak_delm': self.peak_delm,
+        }
+
+    def toJSON(self,path=None):
+        '''Return the stats as JSON text, also written to path if given'''
+        text = json.dumps(self.asDict(), indent=2)
+        if path:
+            with open(path, 'w') as fout:
+                fout.write(text + '\n')
+        return text
+
+    def report(self):
+        '''Print a short summary table'''
+        print("Phase            calls    seconds   share")
+        for phase in sorted(self.times, key=self.times.get, reverse=True):
+            t = self.times[phase]
+            share = t/self.elapsed*100.0 if self.elapsed > 0 else 0.0
+            print("%-14s %7d %10.4f %6.1f%%" %
+                  (phase, self.calls[phase], t, share))
+        for name in self.counters:
+            print("%-20s %10d" % (name, self.counters[name]))
+        print("%-20s %10.6f" % ('peak_delm', self.peak_delm))
@@ -0,0 +1,56 @@
+#--------------------------------------------------------------------
+# File:     StationWriter.py
+#--------------------------------------------------------------------
+
+# Background station output
+#   The solver hands each output station (a Station snapshot) to a
+#   writer thread through a bounded queue, so formatting and console/disk
+#   output overlap with the next marching steps. When the queue is full
+#   the solver waits for the writer to catch up.
+
+import queue
+import threading
+
+class StationWriter(threading.Thread):
+    '''Write solver output stations on a background thread'''
+
+    def __init__(self,write,size=8):
+        '''write is called with each station, size bounds the queue'''
+        threading.Thread.__init__(self, name="StationWriter", daemon=True)
+        self.write = write
+        self.queue = queue.Queue(maxsize=max(int(size), 1))
+        self.error = None
+        self.start()
+
+    def run(self):
+        while True:
+            station = self.queue.get()
+            if station is None:
+                self.queue.task_done()
+                break
+            # after a failure keep draining so the solver never blocks
+            if self.error is None:
+                try:
+                    self.write(station)
+                except Exception as err:
+                    self.error = err
+            self.queue.task_done()
+
+    def put(self,station):
+        '''Queue a station, waiting while the queue is full'''
+        if self.error is not None:
+            raise self.error
+        self.queue.put(station)
+
+    def drain(self):
+        '''Wait until every queued station has been written'''
+        self.queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        '''Write out everything queued and stop the thread'''
+        self.queue.put(None)
+        self.join()
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,153 @@
+#--------------------------------------------------------------------
+# File:     StepControl.py
+#--------------------------------------------------------------------
+
+# Adaptive step control
+#   The solver normally grows the marching step by a fixed 0.5% a step.
+#   A StepControl instead picks each step from the current column, in
+#   the conical iteration as well as the march:
+#
+#       cfl       characteristic slopes mapped to eta, dxi <= deta/|lambda|,
+#                 with deta the smaller interval next to each point. At
+#                 points subsonic or near sonic in x (the wall sublayer,
+#                 held sonic by the solve clamp) the radial signal speed
+#                 |v| + a carried at u bounds the slope instead
+#       viscous   explicit diffusion, dxi <= rho u deta^2/(2 c mu etar^2),
+#                 c = 2 - 2/3 beta with the solver's bulk viscosity factor
+#       body      change in body slope, dxi <= tol/|d rbx/dx|
+#       shock     change in outer boundary slope, as for the body
+#
+#   The smallest limit times a safety factor is used, held to a maximum
+#   growth per step and to bounds (by default no less than a hundredth
+#   of the starting step). The solver keeps beta*dxi fixed as the step
+#   changes. Every choice is recorded along with the limit that set it.
+
+import numpy as np
+
+class StepControl:
+    '''Pick the marching step from the local flow and geometry'''
+
+    def __init__(self,safety=0.8,dxi_min=None,dxi_max=0.02,growth=1.05,
+                 slope_tol=0.005,mach_cut=1.1,log=None):
+        self.safety    = safety
+        self.dxi_min   = dxi_min
+        self.dxi_max   = dxi_max
+        self.growth    = growth
+        self.slope_tol = slope_tol
+        self.mach_cut  = mach_cut
+        self.log       = log
+        self.history   = []
+
+    @classmethod
+    def fromValues(cls,values,dxi):
+        '''Build a controller from the solver input values
+
+        dxi is the starting step; the smallest step defaults to a
+        hundredth of it.
+        '''
+        opts = {'dxi_min': 0.01*dxi}
+        for key in ('safety', 'dxi_min', 'dxi_max', 'growth', 'slope_tol',
+                    'mach_cut'):
+            if 'step_' + key in values:
+                opts[key] = values['step_' + key]
+        return cls(log=values.get('step_log'), **opts)
+
+    #--------------------------------------------------------------------
+    def limits(self,solver):
+        '''Return the stable step estimates for the current column
+
+        The column at station 2 is the one the next step starts from.
+        '''
+        gamma = 1.4
+        n = solver.neta
+        eta = np.asarray(solver.eta[2:n+1], dtype=float)
+        rho = np.asarray(solver.rho[2:n+1], dtype=float)
+        u   = np.asarray(solver.u[2:n+1], dtype=float)
+        v   = np.asarray(solver.v[2:n+1], dtype=float)
+        rb, rbx = solver.rb[2], solver.rbx[2]
+        rs, rsx = solver.rs[2], solver.rsx[2]
+        etar = 1.0/(rs - rb)
+
+        # smaller of the two eta intervals next to each point
+        h = 1.0/np.asarray(solver.dinv, dtype=float)
+        deta = np.minimum(h[1:n], np.append(h[2:n], h[n-1]))
+        etax = ((eta - 1.0)*rbx - eta*rsx)*etar
+
+        # characteristic slopes dr/dx where the flow is supersonic in x.
+        # Near sonic points (the wall sublayer, held sonic by the solve
+        # clamp) the slopes blow up, so there the radial signal speed
+        # |v| + a, carried downstream at u, bounds the step instead
+        q2 = u*u + v*v
+        a2 = (gamma - 1)*(solver.hinf - 0.5*q2)
+        sup = (u*u > self.mach_cut**2*a2) & (a2 > 0)
+        den = np.where(sup, u*u - a2, 1.0)
+        root = np.sqrt(np.where(sup, a2*(q2 - a2), 0.0))
+        lam = np.maximum(np.abs(etax + etar*(u*v + root)/den),
+                         np.abs(etax + etar*(u*v - root)/den))
+        sub = ~sup & (u > 0)
+        a = np.sqrt(np.maximum(a2, 0.0))
+        lsub = np.abs(etax) + etar*(np.abs(v) + a)/np.where(sub, u, 1.0)
+        lam = np.where(sub, lsub, np.where(sup, lam, 0.0))
+        pos = lam > 0
+        cfl = np.min(deta[pos]/lam[pos]) if np.any(pos) else np.inf
+
+        # explicit viscous limit, skipping points with no streamwise flux.
+        # The normal stresses carry 2 - 2/3 beta times the viscosity (the
+        # solver's adjustment factor beta, beta = 1 is the plain 4/3)
+        xmu = solver.xmuinf * solver.x[2]
+        coef = max(2.0 - 2.0/3.0*float(solver.beta), 4.0/3.0)
+        flux = rho*u
+        pos = flux > 0
+        if xmu > 0 and np.any(pos):
+            viscous = np.min(flux[pos]*deta[pos]**2) / \
+                (2.0*coef*xmu*etar**2)
+        else:
+            viscous = np.inf
+
+        # slope change along the body and the outer boundary
+        bl = solver.mybody.bodylength
+        xb = solver.x[2]*bl
+        kb = abs(solver.mybody.body.getCurvature(xb))*bl
+        ks = abs(solver.shock.body.getCurvature(xb))*bl
+        body = self.slope_tol/kb if kb > 0 else np.inf
+        shock = self.slope_tol/ks if ks > 0 else np.inf
+        return {'cfl': float(cfl), 'viscous': float(viscous),
+                'body': float(body), 'shock': float(shock)}
+
+    def __call__(self,solver):
+        '''Return the next marching step for solver'''
+        lims = self.limits(solver)
+        for name in lims:
+            if not lims[name] > 0:
+                lims[name] = np.inf
+        limit = min(lims, key=lims.get)
+        dxi = self.safety*lims[limit]
+        if dxi > self.growth*solver.dxi:
+            dxi = self.growth*solver.dxi
+            limit = 'growth'
+        if dxi > self.dxi_max:
+            dxi = self.dxi_max
+            limit = 'dxi_max'
+        if self.dxi_min is not None and dxi < self.dxi_min:
+            dxi = self.dxi_min
+            limit = 'dxi_min'
+        self.history.append((solver.xstep, solver.x[2], dxi, limit))
+        return dxi
+
+    #--------------------------------------------------------------------
+    def counts(self):
+        '''Return how many steps each limit chose'''
+        counts = {}
+        for step in self.history:
+            counts[step[3]] = counts.get(step[3], 0) + 1
+        return counts
+
+    def write(self,path=None):
+        '''Write the chosen steps to path (default the log given at setup)'''
+        path = path or self.log
+        if not path:
+            return
+        with open(path, 'w') as fout:
+            fout.write("# step          x          dxi  limit\n")
+            for xstep, x, dxi, limit in self.history:
+                fout.write("%6d %12.8f %12.8e  %s\n" % (xstep, x, dxi, limit))
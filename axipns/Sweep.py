@@ -0,0 +1,190 @@
+#--------------------------------------------------------------------
+# File:     Sweep.py
+#--------------------------------------------------------------------
+
+# Parameter sweep driver
+#   Runs a list of solver input dicts over a pool of worker processes.
+#   Each worker builds the body once and caches outer boundaries by
+#   cone angle. Workers write no solution files; they send back a small
+#   summary row with the wall profile, which is collected into a table.
+
+import concurrent.futures
+import itertools
+import os
+import sys
+
+import numpy as np
+
+from .Backends import solverClass
+from .Body import OgiveCylinder
+from .OuterBoundary import OuterCone
+from .WarmStart import ConicalProfile, chooseSeed, pathOrder, pathScales, \
+    seedValues
+
+# per worker geometry, built by the pool initializer
+_body   = None
+_shocks = {}
+
+def sweepGrid(base,**axes):
+    '''Return the list of value dicts for every combination of axes
+
+    base holds the fixed inputs, each keyword names an input and gives
+    the list of values to sweep, e.g. sweepGrid(v, minf=[5.5, 6.0]).
+    '''
+    names = list(axes)
+    cases = []
+    for combo in itertools.product(*[axes[n] for n in names]):
+        v = dict(base)
+        v.update(zip(names, combo))
+        cases.append(v)
+    return cases
+
+class WallProfile:
+    '''Solver observer recording the wall values at each marching step'''
+
+    def __init__(self):
+        self.x   = []
+        self.p   = []
+        self.rho = []
+
+    def __call__(self,solver):
+        if solver.march:
+            self.x.append(float(solver.x[2]))
+            self.p.append(float(solver.p[1]))
+            self.rho.append(float(solver.rho[1]))
+
+def initWorker(quiet=True):
+    '''Build the shared body once per worker process'''
+    global _body
+    _body = OgiveCylinder()
+    if quiet:
+        sys.stdout = open(os.devnull, 'w')
+
+def shockFor(thetas):
+    '''Return the cached outer boundary for a cone angle'''
+    if thetas not in _shocks:
+        _shocks[thetas] = OuterCone(thetas, _body.bodylength)
+    return _shocks[thetas]
+
+def runCase(index,values,engine=None,observers=()):
+    '''Run one case and return its summary row
+
+    engine is a solver class; by default the case's values['backend']
+    picks one (see Backends). observers are added to the solver's own.
+    '''
+    if _body is None:
+        initWorker(quiet=False)
+    v = dict(values)
+    if engine is None:
+        engine = solverClass(v.get('backend'), v['neta'])
+    v['output'] = None
+    solver = engine(v)
+    solver.mybody = _body
+    solver.shock  = shockFor(v['thetas'])
+    solver.doprint = False
+    wall = WallProfile()
+    solver.observers.append(wall)
+    solver.observers.extend(observers)
+    try:
+        solver.runSolver()
+        status = solver.status
+    except (ArithmeticError, ValueError) as err:
+        status = 'failed: %s' % err
+    row = {
+        'case':    index,
+        'minf':    v['minf'],
+        'thetas':  v['thetas'],
+        'muinf':   v['muinf'],
+        'dxi':     v['dxi'],
+        'neta':    v['neta'],
+        'status':  status,
+        'nconical': getattr(solver, 'mit', 0) - getattr(solver, 'xstep', 0),
+        'xstep':   getattr(solver, 'xstep', 0),
+        'xend':    float(solver.x[2]),
+        'elapsed': getattr(solver, 'elapsed', 0.0),
+        'wall_x':  np.array(wall.x),
+        'wall_p':  np.array(wall.p),
+        'wall_rho': np.array(wall.rho),
+    }
+    return row
+
+def runChain(chain,cases,scales,engine=None,extrapolate=False):
+    '''Run cases in order, each seeded from those solved before it
+
+    A warm started case that does not converge is run again from the
+    free stream. Returns the rows, each with a 'start' entry: 'cold',
+    'warm', 'extrapolated' or 'fallback'.
+    '''
+    rows = []
+    solved = []
+    for index in chain:
+        values = cases[index]
+        seed, how = chooseSeed(values, solved, scales, extrapolate)
+        profile = ConicalProfile()
+        v = values if seed is None else seedValues(values, seed)
+        row = runCase(index, v, engine, [profile])
+        if how != 'cold' and (row['status'] != 'converged' or
+                              not np.all(np.isfinite(row['wall_p']))):
+            profile = ConicalProfile()
+            row = runCase(index, values, engine, [profile])
+            how = 'fallback'
+        row['start'] = how
+        rows.append(row)
+        solved.append((values, profile.converged()))
+    return rows
+
+def runSweep(cases,workers=None,engine=None,warm=False,extrapolate=False):
+    '''Run all cases over a process pool and return the result table
+
+    The table is a list of row dicts in case order. workers defaults to
+    the number of CPUs on the machine. With warm, the cases are ordered
+    along the parameter path and split into one chain per worker, and
+    each conical start is seeded from the nearest case already solved in
+    its chain (see WarmStart); extrapolate extends the two nearest.
+    '''
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rows = [None] * len(cases)
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=initWorker) as pool:
+        if warm:
+            scales = pathScales(cases)
+            order = pathOrder(cases, scales)
+            nchain = max(min(workers, len(order)), 1)
+            chains = [order[w*len(order)//nchain:(w+1)*len(order)//nchain]
+                      for w in range(nchain)]
+            jobs = [pool.submit(runChain, chain, cases, scales, engine,
+                                extrapolate) for chain in chains]
+            for job in concurrent.futures.as_completed(jobs):
+                for row in job.result():
+                    rows[row['case']] = row
+            return rows
+        jobs = {pool.submit(runCase, i, v, engine): i
+                for i, v in enumerate(cases)}
+        for job in concurrent.futures.as_completed(jobs):
+            row = job.result()
+            rows[row['case']] = row
+    return rows
+
+def printTable(rows):
+    '''Print the scalar columns of a sweep result table'''
+    print("case    minf  thetas     muinf       dxi neta  status    "
+          "ncon xstep     xend   time(s)   p_wall")
+    for r in rows:
+        pw = r['wall_p'][-1] if len(r['wall_p']) else float('nan')
+        print("%4d %7.3f %7.2f %9.2e %9.2e %4d  %-9s %4d %5d %8.5f "
+              "%9.4f %8.5f" % (r['case'], r['minf'], r['thetas'],
+              r['muinf'], r['dxi'], r['neta'], r['status'][:9], r['nconical'],
+              r['xstep'], r['xend'], r['elapsed'], pw))
+
+#================================================================================
+if __name__ == '__main__':
+
+    from .main import DEFAULTS
+
+    # test case initial data
+    v = dict(DEFAULTS)
+
+    cases = sweepGrid(v, minf=[5.5, 5.95, 6.5], thetas=[20.0, 22.0])
+    rows = runSweep(cases)
+    printTable(rows)
@@ -0,0 +1,159 @@
+#--------------------------------------------------------------------
+# File:     WarmStart.py
+#--------------------------------------------------------------------
+
+# Warm started conical iterations
+#   The conical start normally begins from the free stream. In a dense
+#   sweep the converged column of a neighbouring case is a much closer
+#   guess: values['seed'] = {'rho': [...], 'u': [...], 'v': [...],
+#   'p': [...]} (full columns, index 0 -> neta) replaces the free stream
+#   values before the first iteration. The sweep never rewrites the
+#   outer boundary point, so it is set back to this case's free stream
+#   (p = pinf matters when the seed comes from another Mach number).
+#
+#   Sweeps order their cases along the parameter path (pathOrder) and
+#   seed each from the nearest case already solved, or extrapolate from
+#   the two nearest along the line through them (extrapolateSeed). An
+#   extrapolated column that is not a usable flow field falls back to
+#   the nearest one.
+
+import numpy as np
+
+FIELDS = ('rho', 'u', 'v', 'p')
+
+# inputs that shape the conical solution
+PATH_KEYS = ('minf', 'thetas', 'muinf')
+
+# conical convergence of a seeded run, the largest pressure change
+SEED_TOL = 0.0001
+
+def applySeed(solver,seed):
+    '''Replace the solver's starting column with a seed'''
+    n = solver.neta
+    for name in FIELDS:
+        col = seed[name]
+        if len(col) != n+1:
+            raise ValueError("seed %s has %d points, the case needs %d" %
+                             (name, len(col), n+1))
+        field = getattr(solver, name)
+        field[:] = [float(q) for q in col]
+
+    # free stream at the ghost point and the outer boundary
+    for i in (0, n):
+        solver.rho[i] = 1.0
+        solver.u[i] = 1.0
+        solver.v[i] = 0.0
+        solver.p[i] = solver.pinf
+
+def seedValues(values,seed):
+    '''Return the inputs for a seeded run of a case
+
+    The plain delm test only sees pressure rising, so a seed approaching
+    from above would pass it on the first iteration. Seeded runs stop on
+    the size of the pressure change instead (see ConicalIteration), at
+    the delm threshold, unless the case sets its own conical_tol.
+    '''
+    v = dict(values, seed=seed)
+    if 'conical_tol' not in v:
+        v['conical_tol'] = SEED_TOL
+        v.setdefault('conical_field', 'p')
+    return v
+
+class ConicalProfile:
+    '''Solver observer keeping the column of the last conical iteration'''
+
+    def __init__(self):
+        self.seed = None
+        self.marched = False
+
+    def __call__(self,solver):
+        if solver.march:
+            self.marched = True
+        elif not self.marched:
+            self.seed = {name: np.array(getattr(solver, name), dtype=float)
+                         for name in FIELDS}
+
+    def converged(self):
+        '''Return the converged conical column, None if it never marched'''
+        return self.seed if self.marched else None
+
+#--------------------------------------------------------------------
+def pathScales(cases,keys=PATH_KEYS):
+    '''Return the range of each path input over the cases (1 if fixed)'''
+    scales = {}
+    for key in keys:
+        vals = [float(v[key]) for v in cases]
+        span = max(vals) - min(vals)
+        scales[key] = span if span > 0 else 1.0
+    return scales
+
+def pathPoint(values,scales):
+    '''Return a case's position on the normalized parameter path'''
+    return np.array([float(values[key])/scales[key] for key in scales])
+
+def pathOrder(cases,scales=None):
+    '''Return case indices ordered so neighbours are close in parameters
+
+    Cases are grouped by neta (a seed only fits its own grid) and each
+    group is walked nearest neighbour first from its lowest corner.
+    '''
+    scales = scales or pathScales(cases)
+    groups = {}
+    for i, v in enumerate(cases):
+        groups.setdefault(v['neta'], []).append(i)
+    order = []
+    for neta in sorted(groups):
+        left = sorted(groups[neta],
+                      key=lambda i: tuple(pathPoint(cases[i], scales)))
+        here = left.pop(0)
+        order.append(here)
+        while left:
+            p = pathPoint(cases[here], scales)
+            here = min(left, key=lambda i:
+                       np.sum((pathPoint(cases[i], scales) - p)**2))
+            left.remove(here)
+            order.append(here)
+    return order
+
+def extrapolateSeed(p,p0,q0,p1,q1,hinf):
+    '''Extend the seeds q0 (at p0) and q1 (at p1) linearly to p
+
+    p1 is the nearer case. The step along the line p0 -> p1 is the
+    projection of p - p1 on it. Returns None if the result has a
+    non-positive density, pressure or temperature.
+    '''
+    d = p1 - p0
+    dd = float(np.dot(d, d))
+    if dd == 0:
+        return None
+    s = float(np.dot(p - p1, d))/dd
+    seed = {name: q1[name] + s*(q1[name] - q0[name]) for name in FIELDS}
+    inner = slice(1, None)
+    if seed['rho'][inner].min() <= 0 or seed['p'][inner].min() <= 0:
+        return None
+    q2 = seed['u']**2 + seed['v']**2
+    if np.any(hinf - 0.5*q2[inner] <= 0):
+        return None
+    return seed
+
+def chooseSeed(values,solved,scales,extrapolate=False):
+    '''Return (seed, how) for a case from the solved (values, seed) list
+
+    how is 'warm' (nearest case), 'extrapolated' or 'cold' (nothing
+    usable solved yet, seed None).
+    '''
+    usable = [(v, q) for v, q in solved
+              if q is not None and v['neta'] == values['neta']]
+    if not usable:
+        return None, 'cold'
+    p = pathPoint(values, scales)
+    usable.sort(key=lambda vq: np.sum((pathPoint(vq[0], scales) - p)**2))
+    if extrapolate and len(usable) > 1:
+        (v1, q1), (v0, q0) = usable[0], usable[1]
+        minf = float(values['minf'])
+        hinf = (1.0+2.0/(0.4*minf**2))/2.0
+        seed = extrapolateSeed(p, pathPoint(v0, scales), q0,
+                               pathPoint(v1, scales), q1, hinf)
+        if seed is not None:
+            return seed, 'extrapolated'
+    return usable[0][1], 'warm'
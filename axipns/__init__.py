@@ -0,0 +1,11 @@
+#--------------------------------------------------------------------
+# File:     __init__.py
+#--------------------------------------------------------------------
+
+# axipns package
+#   The modules import each other relative to the package, and each
+#   tool runs as a module: python -m axipns.Sweep, python -m
+#   axipns.Benchmark, ... Nothing is loaded here, so the command line
+#   (see main) starts without NumPy.
+
+__version__ = "0.1.0"
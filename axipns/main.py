@@ -1,11 +1,239 @@
-from FreeStream import InitialConditions
-from Grid import CreateGrid
-from AxiSolver import ConicalSolution
-from AxiSolver import GenerateMarchingSolution
-class app(object):
-
-	def __init__(self):
-		CreateGrid()
-		InitialConditions()
-		GenerateConicalSolution()
-		GenerateMarchingSolution()
+#--------------------------------------------------------------------
+# File:     main.py
+#--------------------------------------------------------------------
+
+# Command line entry point
+#   Runs the built in test case, or every case in a list of case files,
+#   in one process:
+#
+#       axipns                          the test case -> solution.dat
+#       axipns m55.json m60.toml        one output file per case
+#       python -m axipns --check *.toml validate the files only
+#
+#   A case file holds solver values (see AXIsolver). Keys it leaves out
+#   take the test case values, so a file can be as short as
+#   {"minf": 6.5}. A JSON file holds one values object or a list of
+#   them; a TOML file holds one values table, or shared values at the
+#   top level and a [[cases]] array of tables, one per case (JSON takes
+#   the same layout with a "cases" list). A case may set a "name", the
+#   default is the file name, numbered when the file has several.
+#
+#   The body is built once and outer boundaries are kept per cone
+#   angle, so a batch only pays for its solves. NumPy is imported by the
+#   engines that use it (--backend reference runs without it) and
+#   matplotlib only for --animate; reading and checking case files
+#   imports neither.
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+
+# the test case, and the values a case file does not set
+DEFAULTS = {
+    'minf':   5.95,             # Axial Mach Number
+    'tref':   1464.7157,        # Reference static temperature
+    'reref':  2179168.0,        # Ref Reynolds Number
+    'muref':  7.65034e-7,       # Reference Viscosity
+    'muinf':  0.00002,
+    'thetas': 22.0,             # Outer boundary angle
+    'dxi':    0.0004,           # initial axial step size
+    'neta':   31,               # number or radial points
+    'nitmax': 750,              # max conical iterations
+    'nplot':  25,               # steps per axial data output
+    'dplot':  0.05,
+}
+
+# values that must be whole numbers
+INTEGERS = ('neta', 'nitmax', 'nplot')
+
+def readCaseFile(path):
+    '''Return the raw contents of a JSON or TOML case file'''
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ValueError("%s: reading TOML needs Python 3.11 or "
+                                 "the tomli package" % path)
+        with open(path, 'rb') as fin:
+            return tomllib.load(fin)
+    with open(path) as fin:
+        return json.load(fin)
+
+def loadCases(path):
+    '''Return the (name, values) cases of a case file'''
+    try:
+        data = readCaseFile(path)
+    except ValueError as err:
+        raise ValueError("%s: %s" % (path, err))
+    if isinstance(data, list):
+        shared, entries = {}, data
+    elif isinstance(data, dict) and 'cases' in data:
+        shared = dict(data)
+        entries = shared.pop('cases')
+    else:
+        shared, entries = {}, [data]
+    if not isinstance(entries, list) or not entries or \
+       not all(isinstance(e, dict) for e in entries):
+        raise ValueError("%s: expected a values table or a list of them"
+                         % path)
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cases = []
+    for k, entry in enumerate(entries):
+        values = dict(DEFAULTS)
+        values.update(shared)
+        values.update(entry)
+        name = values.pop('name', None)
+        if name is None:
+            name = stem if len(entries) == 1 else "%s-%d" % (stem, k+1)
+        checkValues(values, "%s (%s)" % (path, name))
+        cases.append((str(name), values))
+    return cases
+
+def checkValues(values,where):
+    '''Raise ValueError if the solver inputs cannot start a run'''
+    for key in DEFAULTS:
+        value = values[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError("%s: %s must be a number, not %r" %
+                             (where, key, value))
+    for key in INTEGERS:
+        if values[key] != int(values[key]):
+            raise ValueError("%s: %s must be a whole number" % (where, key))
+        values[key] = int(values[key])
+    if values['neta'] < 3:
+        raise ValueError("%s: neta must be at least 3" % where)
+
+def parseSetting(text):
+    '''Split a key=value override; the value is read as JSON if it can be'''
+    key, sep, value = text.partition('=')
+    if not sep or not key:
+        raise argparse.ArgumentTypeError("expected key=value, got '%s'" %
+                                         text)
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+#--------------------------------------------------------------------
+class Runner:
+    '''Run cases in this process, sharing the body and outer boundaries'''
+
+    def __init__(self,backend=None):
+        self.backend = backend
+        self.body = None
+        self.shocks = {}
+
+    def shock(self,thetas):
+        '''Return the outer boundary for a cone angle'''
+        from .OuterBoundary import OuterCone
+        if thetas not in self.shocks:
+            self.shocks[thetas] = OuterCone(thetas, self.body.bodylength)
+        return self.shocks[thetas]
+
+    def run(self,values):
+        '''Solve one case and return the finished solver'''
+        from .Backends import solverClass
+        if self.body is None:
+            from .Body import OgiveCylinder
+            self.body = OgiveCylinder()
+        engine = solverClass(self.backend or values.get('backend'),
+                             values['neta'])
+        solver = engine(values)
+        solver.mybody = self.body
+        solver.shock = self.shock(values['thetas'])
+        try:
+            solver.runSolver()
+        except (ArithmeticError, ValueError) as err:
+            solver.status = 'failed: %s' % err
+        return solver
+
+def outputName(name,values,outdir):
+    '''Return the default output file of a case'''
+    ext = '.npy' if values.get('format', 'text') == 'binary' else '.dat'
+    return os.path.join(outdir, name + ext)
+
+def summary(name,solver,seconds):
+    pw = float(solver.p[1]) if solver.status == 'converged' else float('nan')
+    return ("%s: %s, %d conical, %d steps, x = %.5f, p_wall = %.6f, "
+            "%.3f s" % (name, solver.status, solver.mit - solver.xstep,
+                        solver.xstep, float(solver.x[2]), pw, seconds))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="axipns",
+        description="axisymmetric parabolized Navier Stokes solver")
+    parser.add_argument('cases', nargs='*',
+                        help="JSON or TOML case files (default: the test "
+                             "case)")
+    parser.add_argument('--set', dest='settings', action='append',
+                        type=parseSetting, default=[], metavar="KEY=VALUE",
+                        help="override a value in every case")
+    parser.add_argument('--backend',
+                        help="compute backend (see Backends), default auto")
+    parser.add_argument('--outdir', default=".",
+                        help="directory for case output files")
+    parser.add_argument('--no-output', action='store_true',
+                        help="write no solution files")
+    parser.add_argument('--quiet', action='store_true',
+                        help="only print the summary line of each case")
+    parser.add_argument('--check', action='store_true',
+                        help="read and check the case files, do not run")
+    parser.add_argument('--animate', type=int, metavar="PROP",
+                        help="animate a property of the last case "
+                             "(see Animate.propName)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cases:
+            cases = []
+            for path in args.cases:
+                cases.extend(loadCases(path))
+        else:
+            cases = [("solution", dict(DEFAULTS))]
+        for name, values in cases:
+            values.update(args.settings)
+            checkValues(values, name)
+    except (OSError, ValueError) as err:
+        print("axipns: %s" % err, file=sys.stderr)
+        return 2
+
+    if args.check:
+        for name, values in cases:
+            print("%s: minf %g, thetas %g, neta %d" %
+                  (name, values['minf'], values['thetas'], values['neta']))
+        return 0
+
+    runner = Runner(args.backend)
+    failed = 0
+    output = None
+    for name, values in cases:
+        if args.no_output:
+            values['output'] = None
+        elif 'output' not in values:
+            values['output'] = outputName(name, values, args.outdir)
+        output = values['output']
+        tic = time.perf_counter()
+        if args.quiet:
+            with open(os.devnull, 'w') as devnull, \
+                 contextlib.redirect_stdout(devnull):
+                solver = runner.run(values)
+        else:
+            solver = runner.run(values)
+        print(summary(name, solver, time.perf_counter() - tic), flush=True)
+        if solver.status != 'converged':
+            failed += 1
+
+    if args.animate is not None and output:
+        from .Animate import DisplayProperty
+        DisplayProperty(args.animate, output).run()
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
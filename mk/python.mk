@@ -32,3 +32,15 @@ pydev:		## Install package in development mode
 .PHONY:	run
 run:	## simple run of application (no parameters)
 	python -m ${APPNAME}
+
+.PHONY: bench
+bench:	## time the solver and compare with bench_baseline.json
+	python -m ${APPNAME}.Benchmark --out bench.json --baseline bench_baseline.json
+
+.PHONY: equiv
+equiv:	## check the solver backends against the reference engine
+	python -m ${APPNAME}.Equivalence
+
+.PHONY: bench-baseline
+bench-baseline:	## rewrite bench_baseline.json from this machine
+	python -m ${APPNAME}.Benchmark --out bench.json --baseline bench_baseline.json --update
@@ -0,0 +1,42 @@
+import pytest
+
+from axipns.Backends import solverClass
+from axipns.Body import OgiveCylinder
+from axipns.OuterBoundary import OuterCone
+from axipns.main import DEFAULTS
+
+@pytest.fixture(scope='session')
+def body():
+    return OgiveCylinder()
+
+@pytest.fixture
+def solve(body):
+    '''Run the test case with some values changed, return the solver'''
+    def run(backend='numpy', observers=(), restart=None, doprint=False,
+            **values):
+        v = dict(DEFAULTS, output=None)
+        v.update(values)
+        solver = solverClass(backend)(v)
+        solver.mybody = body
+        solver.shock = OuterCone(v['thetas'], body.bodylength)
+        solver.doprint = doprint
+        solver.observers.extend(observers)
+        if restart:
+            solver.restart(restart)
+        solver.runSolver()
+        return solver
+    return run
+
+class Crash(Exception):
+    '''Stands in for a run killed part way'''
+
+@pytest.fixture
+def crashAt():
+    '''Return an observer raising crashAt.Crash from iteration mit on'''
+    def make(mit):
+        def observer(solver):
+            if solver.mit >= mit:
+                raise Crash()
+        return observer
+    make.Crash = Crash
+    return make
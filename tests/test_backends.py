@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from axipns import Backends
+from axipns.AXIsolver import AXIsolver
+from axipns.ArraySolver import ArraySolver
+from axipns.Backends import AUTO_NETA, BACKENDS, autoBackend, solverClass
+from axipns.Equivalence import canonicalCases, checkCase
+from axipns.JitSolver import JitSolver
+from axipns.main import DEFAULTS
+
+def test_auto_follows_the_column_size(monkeypatch):
+    monkeypatch.delenv('AXIPNS_BACKEND', raising=False)
+    assert solverClass('auto', AUTO_NETA - 1) is AXIsolver
+    assert solverClass(None, 31) is AXIsolver
+    assert solverClass('auto', AUTO_NETA) is not AXIsolver
+
+def test_environment_replaces_only_auto(monkeypatch):
+    monkeypatch.setenv('AXIPNS_BACKEND', 'numpy')
+    assert solverClass() is ArraySolver
+    assert solverClass('auto', 31) is ArraySolver
+    assert solverClass('reference') is AXIsolver
+
+def fakeNumba():
+    return ArraySolver
+
+def test_auto_prefers_a_compiled_backend(monkeypatch):
+    monkeypatch.delenv('AXIPNS_BACKEND', raising=False)
+    monkeypatch.setitem(BACKENDS, 'numba', (20, fakeNumba))
+    assert autoBackend(31) == 'numba'
+    assert autoBackend(AUTO_NETA) == 'numba'
+
+def test_no_backend_is_a_clear_error(monkeypatch):
+    def missing():
+        raise ImportError("No module named 'numpy'")
+    monkeypatch.setattr(Backends, 'BACKENDS',
+                        {name: (BACKENDS[name][0], missing)
+                         for name in BACKENDS})
+    with pytest.raises(ImportError, match="no solver backend"):
+        solverClass('auto', 31)
+
+def test_jit_sweep_matches_the_reference(solve, body):
+    # the sweep functions also run as plain Python, without numba
+    ref = solve('reference', nitmax=30)
+    run = JitSolver(dict(DEFAULTS, output=None, nitmax=30))
+    run.mybody = body
+    run.shock = ref.shock
+    run.doprint = False
+    run.runSolver()
+    assert run.mit == ref.mit
+    for name in ('rho', 'u', 'v', 'p'):
+        assert np.array_equal(np.asarray(getattr(run, name)),
+                              np.asarray(getattr(ref, name)))
+
+def test_numba_matches_the_reference(body):
+    pytest.importorskip('numba')
+    values = canonicalCases(machs=(5.95,), netas=(31,))[0]
+    row = checkCase(values, 'numba', body=body)
+    assert row['passed']
+    assert row['mit'][0] == row['mit'][1]
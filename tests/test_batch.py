@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from axipns.BatchSolver import BatchSolver
+from axipns.OuterBoundary import OuterCone
+from axipns.main import DEFAULTS
+
+def test_batch_matches_single_runs(solve, body):
+    cases = [dict(DEFAULTS, minf=minf, output=None) for minf in (5.5, 6.5)]
+    batch = BatchSolver(cases)
+    batch.mybody = body
+    batch.shocks = [OuterCone(v['thetas'], body.bodylength) for v in cases]
+    batch.runSolver()
+
+    for c, v in enumerate(cases):
+        single = solve('numpy', **v)
+        assert batch.status[c] == single.status == 'converged'
+        assert batch.mit[c] == single.mit
+        assert batch.xstep[c] == single.xstep
+        for name in ('rho', 'u', 'v', 'p'):
+            assert np.array_equal(getattr(batch, name)[c],
+                                  getattr(single, name))
+
+@pytest.mark.parametrize('option', [
+    {'output': 'solution.dat'}, {'checkpoint': 'ck.npz'},
+    {'conical_cache': 'cache'}, {'conical_relax': 1.5},
+    {'step_control': True}, {'history': 'history.npy'},
+    {'grid': 'tanh'},
+])
+def test_unsupported_options_are_refused(option):
+    cases = [dict(DEFAULTS), dict(DEFAULTS, minf=6.5, **option)]
+    with pytest.raises(ValueError, match="BatchSolver"):
+        BatchSolver(cases)
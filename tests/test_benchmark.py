@@ -0,0 +1,28 @@
+import numpy as np
+
+from axipns.AXIsolver import AXIsolver
+from axipns.Benchmark import benchPhases, compare, main
+from axipns.OuterBoundary import OuterCone
+
+def test_compare_flags_only_slowdowns_past_the_threshold():
+    base = {'results': {'a': 1.0, 'b': 1.0, 'c': 1.0}}
+    now = {'results': {'a': 1.2, 'b': 1.5, 'c': 0.5, 'd': 1.0}}
+    rows, slow = compare(now, base, 0.3)
+    assert slow == ['b']
+    assert ('d', None, 1.0, None) in rows
+
+def test_missing_baseline_fails_in_ci(tmp_path):
+    missing = str(tmp_path / "baseline.json")
+    assert main(['--ci', '--baseline', missing,
+                 '--out', str(tmp_path / "bench.json")]) == 2
+    assert not (tmp_path / "baseline.json").exists()
+
+def test_phases_are_per_iteration_and_leave_numpy_alone(body):
+    before = np.geterr()
+    results = {}
+    benchPhases(results, 'reference', AXIsolver, 31, 0.0004, body,
+                OuterCone(22.0, body.bodylength), 2, 2)
+    assert np.geterr() == before
+    assert sorted(k.split('/')[0] for k in results) == \
+        ['conical-iter', 'marching-step', 'precor']
+    assert all(t > 0 for t in results.values())
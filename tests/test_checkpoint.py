@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+@pytest.mark.parametrize('backend', ['reference', 'numpy'])
+@pytest.mark.parametrize('accel', [{'conical_relax': 1.5},
+                                   {'conical_relax': 1.5,
+                                    'conical_extrap': 5}])
+def test_restart_mid_conical_repeats_the_run(solve, body, tmp_path, crashAt,
+                                             backend, accel):
+    ref = solve(backend, **accel)
+
+    path = str(tmp_path / "ck.npz")
+    with pytest.raises(crashAt.Crash):
+        # stops between checkpoints, well inside the conical start
+        solve(backend, checkpoint=path, checkpoint_every=50,
+              observers=[crashAt(217)], **accel)
+
+    run = solve(backend, restart=path, **accel)
+    assert run.status == ref.status == 'converged'
+    assert run.mit == ref.mit
+    for name in ('rho', 'u', 'v', 'p', 'x'):
+        assert np.array_equal(np.asarray(getattr(run, name)),
+                              np.asarray(getattr(ref, name)))
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+
+from axipns.AXIsolver import AXIsolver
+from axipns.Checkpoint import saveCheckpoint
+from axipns.ConicalCache import ConicalCache
+from axipns.OuterBoundary import OuterCone
+from axipns.main import DEFAULTS
+
+def test_integer_and_float_inputs_share_a_key(body, tmp_path):
+    cache = ConicalCache(str(tmp_path))
+    keys = []
+    for minf, thetas in ((6, 22), (6.0, 22.0)):
+        solver = AXIsolver(dict(DEFAULTS, minf=minf, thetas=thetas))
+        solver.mybody = body
+        solver.shock = OuterCone(thetas, body.bodylength)
+        keys.append(cache.key(solver))
+    assert keys[0] == keys[1]
+
+def test_integer_inputs_hit_the_cache(solve, tmp_path):
+    ref = solve(conical_cache=str(tmp_path), minf=6.0)
+    run = solve(conical_cache=str(tmp_path), minf=6)
+    assert run.conical.hits == 1
+    assert np.array_equal(run.p, ref.p)
+
+def test_writers_sharing_an_entry_do_not_collide(solve, tmp_path):
+    # sweep workers storing the same key write the same path at once
+    import threading
+    solver = solve(conical_cache=str(tmp_path), nitmax=20)
+    path = solver.conical.path(solver.conical.key(solver))
+    errors = []
+
+    def write():
+        try:
+            for k in range(20):
+                saveCheckpoint(solver, path)
+        except Exception as err:
+            errors.append(err)
+
+    threads = [threading.Thread(target=write) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert sorted(os.listdir(str(tmp_path))) == [os.path.basename(path)]
+    assert solver.conical.fetch(solver)
+
+def test_entries_gone_from_under_the_cache(tmp_path, monkeypatch):
+    cache = ConicalCache(str(tmp_path), maxbytes=0)
+    (tmp_path / "kept.npz").write_bytes(b"x"*10)
+
+    # listed, then evicted by another process before this one looks
+    listdir = os.listdir
+    monkeypatch.setattr(os, 'listdir',
+                        lambda d: listdir(d) + ['gone.npz'])
+    cache.evict()
+    assert listdir(str(tmp_path)) == []
@@ -0,0 +1,35 @@
+import numpy as np
+
+from axipns import Equivalence
+from axipns.AXIsolver import AXIsolver
+from axipns.ArraySolver import ArraySolver
+from axipns.Equivalence import FieldRecorder, canonicalCases, checkCase, \
+    compareRuns
+
+def recorder(*stations):
+    rec = FieldRecorder()
+    rec.stations = [[np.array(s, dtype=float)]*5 for s in stations]
+    return rec
+
+def test_nan_on_both_sides_fails():
+    ref = recorder([1.0, 2.0], [1.0, np.nan])
+    alt = recorder([1.0, 2.0], [1.0, np.nan])
+    cmp = compareRuns(ref, alt, 1e-9, 1e-12)
+    assert not cmp['finite']
+    assert cmp['first'] is not None
+
+def test_numpy_matches_the_reference(body, monkeypatch):
+    # the environment must not turn the reference into the engine checked
+    monkeypatch.setenv('AXIPNS_BACKEND', 'numpy')
+    engines = []
+    runEngine = Equivalence.runEngine
+    def recordEngine(cls, values, body):
+        engines.append(cls)
+        return runEngine(cls, values, body)
+    monkeypatch.setattr(Equivalence, 'runEngine', recordEngine)
+
+    values = canonicalCases(machs=(5.95,), netas=(31,))[0]
+    row = checkCase(values, 'numpy', body=body)
+    assert engines == [AXIsolver, ArraySolver]
+    assert row['passed']
+    assert row['mit'][0] == row['mit'][1]
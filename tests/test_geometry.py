@@ -0,0 +1,13 @@
+import numpy as np
+import pytest
+
+from axipns.OuterBoundary import OuterCone
+
+@pytest.mark.parametrize('kind', ['Point', 'Slope', 'Curvature'])
+def test_array_helpers_match_the_point_helpers(body, kind):
+    shock = OuterCone(22.0, body.bodylength)
+    for obj, name in ((body, 'getBody'), (shock, 'getBoundary')):
+        rows = getattr(obj, name + kind + 'Array')(300, 0.17, 2.0)
+        points = getattr(obj, name + kind + 's')(300, 0.17, 2.0)
+        assert rows.shape == (300, 2)
+        assert np.allclose(rows, points, rtol=1e-12, atol=0.0)
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from axipns.Grid import etaGrid
+
+def columns(solver):
+    return [np.asarray(getattr(solver, f)) for f in ('rho', 'u', 'v', 'p')]
+
+@pytest.mark.parametrize('backend', ['reference', 'numpy'])
+def test_stretched_grid_runs_to_the_end(solve, backend):
+    solver = solve(backend, grid='tanh', nitmax=5000)
+    assert solver.stepper is not None
+    assert solver.status == 'converged'
+    assert solver.x[2] > 0.99
+    assert all(np.isfinite(q).all() for q in columns(solver))
+
+def test_clustered_fine_grid_runs_to_the_end(solve):
+    # the wall spacing is 0.42 of the outer one and an eighth of the
+    # spacing of the test case grid
+    eta = etaGrid(201, 'tanh')
+    assert (eta[2] - eta[1])*30 < 0.15
+    solver = solve(neta=201, grid='tanh', nitmax=100000)
+    assert solver.status == 'converged'
+    assert solver.x[2] > 0.99
+    assert all(np.isfinite(q).all() for q in columns(solver))
+
+    # the same wall pressure as the test case grid, to a few percent
+    coarse = solve(grid='tanh', nitmax=5000)
+    assert solver.p[1] == pytest.approx(coarse.p[1], rel=0.05)
+
+def test_divergence_is_reported(solve):
+    # strong clustering with the fixed step growth goes NaN while marching
+    eta = etaGrid(51, 'tanh', 1.0)
+    dxi = 0.0004*30*min(np.diff(eta[1:]))
+    solver = solve(neta=51, grid='tanh', grid_stretch=1.0, dxi=dxi,
+                   step_control=False, nitmax=3000)
+    assert solver.status == 'diverged'
+    assert solver.x[2] < 0.99
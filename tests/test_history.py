@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from axipns.History import FieldHistory
+
+@pytest.mark.parametrize('cap', [256, 0.05])
+def test_restart_keeps_the_history(solve, tmp_path, crashAt, cap):
+    # a 0.05 MB cap holds about 50 stations and thins several times
+    ref = solve(history=str(tmp_path / "ref.npy"), history_max_mb=cap)
+
+    path = str(tmp_path / "run.npy")
+    ck = str(tmp_path / "ck.npz")
+    with pytest.raises(crashAt.Crash):
+        solve(history=path, history_max_mb=cap, checkpoint=ck,
+              checkpoint_every=50, observers=[crashAt(ref.mit - 150)])
+    solve(history=path, history_max_mb=cap, restart=ck)
+
+    done = FieldHistory.open(path)
+    assert done.count == ref.history.count > 0
+    assert np.array_equal(done.rows(), ref.history.rows())
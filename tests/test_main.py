@@ -0,0 +1,79 @@
+import argparse
+import json
+import subprocess
+import sys
+
+import pytest
+
+from axipns.main import DEFAULTS, checkValues, loadCases, main, parseSetting
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+def test_short_json_case_takes_the_defaults(tmp_path):
+    path = write(tmp_path / "m65.json", '{"minf": 6.5}')
+    assert loadCases(path) == [("m65", dict(DEFAULTS, minf=6.5))]
+
+def test_json_list_and_cases_layouts(tmp_path):
+    listed = write(tmp_path / "runs.json",
+                   '[{"minf": 5.5}, {"minf": 6.5, "name": "fast"}]')
+    shared = write(tmp_path / "shared.json",
+                   '{"thetas": 20, "cases": [{"minf": 5.5}, {"minf": 6.5}]}')
+    assert [(n, v['minf']) for n, v in loadCases(listed)] == \
+        [("runs-1", 5.5), ("fast", 6.5)]
+    cases = loadCases(shared)
+    assert [n for n, v in cases] == ["shared-1", "shared-2"]
+    assert all(v['thetas'] == 20 for n, v in cases)
+
+def test_toml_table_and_cases_array(tmp_path):
+    single = write(tmp_path / "one.toml", 'minf = 6.5\nneta = 41\n')
+    shared = write(tmp_path / "sweep.toml",
+                   'thetas = 20.0\n\n[[cases]]\nminf = 5.5\n\n'
+                   '[[cases]]\nminf = 6.5\nname = "fast"\n')
+    assert loadCases(single) == [("one", dict(DEFAULTS, minf=6.5, neta=41))]
+    cases = loadCases(shared)
+    assert [n for n, v in cases] == ["sweep-1", "fast"]
+    assert [v['minf'] for n, v in cases] == [5.5, 6.5]
+    assert all(v['thetas'] == 20.0 for n, v in cases)
+
+@pytest.mark.parametrize('text', ['[]', '[1, 2]', '{"cases": {}}', '{"minf":'])
+def test_bad_layouts_are_refused(tmp_path, text):
+    path = write(tmp_path / "bad.json", text)
+    with pytest.raises(ValueError, match="bad.json"):
+        loadCases(path)
+
+def test_check_values():
+    values = dict(DEFAULTS, neta=41.0)
+    checkValues(values, "case")
+    assert values['neta'] == 41 and isinstance(values['neta'], int)
+    for bad in ({'minf': "6"}, {'minf': True}, {'neta': 41.5},
+                {'neta': 2}):
+        with pytest.raises(ValueError, match="case"):
+            checkValues(dict(DEFAULTS, **bad), "case")
+    with pytest.raises(KeyError):
+        checkValues({'minf': 6.5}, "case")
+
+def test_settings_are_read_as_json():
+    assert parseSetting("minf=6.5") == ("minf", 6.5)
+    assert parseSetting("grid=tanh") == ("grid", "tanh")
+    assert parseSetting("step_control=true") == ("step_control", True)
+    with pytest.raises(argparse.ArgumentTypeError):
+        parseSetting("minf")
+
+def test_check_applies_settings_without_running(tmp_path, capsys):
+    path = write(tmp_path / "m65.json", '{"minf": 6.5}')
+    assert main([path, '--set', 'neta=41', '--check']) == 0
+    assert capsys.readouterr().out == "m65: minf 6.5, thetas 22, neta 41\n"
+    assert main([path, '--set', 'neta=2', '--check']) == 2
+    assert "neta must be at least 3" in capsys.readouterr().err
+
+def test_case_files_and_geometry_need_no_numpy(tmp_path):
+    path = write(tmp_path / "m65.json", json.dumps({'minf': 6.5}))
+    code = ("import sys; from axipns.main import main; "
+            "main([%r, '--check']); "
+            "from axipns.Body import OgiveCylinder; "
+            "OgiveCylinder().body.getRadius(10.0); "
+            "assert 'numpy' not in sys.modules" % path)
+    subprocess.run([sys.executable, '-c', code], check=True,
+                   stdout=subprocess.DEVNULL)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from axipns.Equivalence import canonicalCases, checkCase
+
+def test_float32_stays_close_to_float64(solve):
+    ref = solve('numpy')
+    run = solve('numpy', dtype='float32')
+    assert run.status == ref.status == 'converged'
+    assert (run.mit, run.xstep) == (ref.mit, ref.xstep)
+    n = run.neta + 1
+    for name in ('rho', 'u', 'v', 'p'):
+        field = getattr(run, name)
+        assert field.dtype == np.float32
+        scale = np.max(np.abs(getattr(ref, name)[1:n]))
+        assert np.max(np.abs(field[1:n] - getattr(ref, name)[1:n])) \
+            <= 2e-4*scale
+
+def test_float32_passes_the_equivalence_check_at_its_tolerance(body):
+    values = canonicalCases(machs=(5.95,), netas=(31,))[0]
+    assert checkCase(values, 'numpy', rtol=1e-3, body=body,
+                     dtype='float32')['passed']
+    assert not checkCase(values, 'numpy', body=body,
+                         dtype='float32')['passed']
+
+def test_unsupported_dtype_is_refused(solve):
+    with pytest.raises(ValueError, match="float16"):
+        solve('numpy', dtype='float16')
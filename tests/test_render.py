@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+pytest.importorskip('matplotlib')
+Image = pytest.importorskip('PIL.Image')
+
+from axipns.Render import main, makeGif, renderFrames
+
+@pytest.fixture
+def solution(solve, tmp_path):
+    path = str(tmp_path / "sol.npy")
+    solve(output=path, format='binary', doprint=True)
+    return path
+
+def test_frames_are_the_same_on_any_number_of_workers(solution, tmp_path):
+    one = renderFrames(solution, 6, str(tmp_path / "one"), [0, 3, 5, 8],
+                       workers=1, dpi=30)
+    two = renderFrames(solution, 6, str(tmp_path / "two"), [0, 3, 5, 8],
+                       workers=2, dpi=30)
+    assert one['workers'] == 1 and two['workers'] == 2
+    assert [os.path.basename(f) for f in one['frames']] == \
+        ["frame_00000.png", "frame_00003.png", "frame_00005.png",
+         "frame_00008.png"]
+    for a, b in zip(one['frames'], two['frames']):
+        with open(a, 'rb') as fa, open(b, 'rb') as fb:
+            assert fa.read() == fb.read()
+
+def test_gif_has_a_frame_per_station(solution, tmp_path):
+    frames = renderFrames(solution, 4, str(tmp_path / "frames"), [1, 2, 3],
+                          workers=1, dpi=30)['frames']
+    gif = str(tmp_path / "p.gif")
+    makeGif(frames, gif, fps=5)
+    with Image.open(gif) as image:
+        assert image.n_frames == 3
+
+def test_gif_without_frames_is_refused(tmp_path):
+    gif = str(tmp_path / "empty.gif")
+    with pytest.raises(ValueError, match="no frames"):
+        makeGif([], gif)
+    assert not os.path.exists(gif)
+
+def test_command_line_renders_every_nth_station(solution, tmp_path, capsys):
+    out = tmp_path / "frames"
+    gif = str(tmp_path / "m.gif")
+    assert main([solution, '--prop', '6', '--out', str(out), '--every', '10',
+                 '--workers', '1', '--dpi', '30', '--gif', gif]) == 0
+    assert "Mach Number" in capsys.readouterr().out
+    names = sorted(os.listdir(out))
+    assert names[:2] == ["frame_00000.png", "frame_00010.png"]
+    with Image.open(gif) as image:
+        assert image.n_frames == len(names)
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from axipns.Service import SolverService, submit
+from axipns.main import DEFAULTS
+
+def test_solve_share_cache_and_shutdown(tmp_path):
+    async def session():
+        service = SolverService(workers=1)
+        await service.start(str(tmp_path / "axipns.sock"))
+        address = service.address()
+        events = []
+
+        def client(values):
+            return submit(values, address, progress=events.append)
+
+        try:
+            # 6 and 6.0 are one case: the second request joins the first
+            first, second = await asyncio.gather(
+                asyncio.to_thread(client, dict(DEFAULTS, minf=6.0)),
+                asyncio.to_thread(client, dict(DEFAULTS, minf=6)))
+            # a short request is the same case once the defaults fill in
+            again = await asyncio.to_thread(client, {'minf': 6})
+            stats = service.stats()
+        finally:
+            await asyncio.wait_for(service.close(), 60)
+        return first, second, again, stats, events
+
+    first, second, again, stats, events = asyncio.run(session())
+    assert first['status'] == 'converged'
+    assert first == second == again
+    assert stats['computed'] == 1
+    assert stats['shared'] == 1
+    assert stats['cached'] == 1
+    assert events and all(e['mit'] % 25 == 0 for e in events)
+
+@pytest.mark.parametrize('values, geometry', [
+    ({'neta': 2}, None),
+    ({'minf': 'fast'}, None),
+    ({'minf': 6.0}, {'body': 'cone'}),
+    ({'minf': 6.0}, {'body': 'ogive-cylinder', 'length': 2.0}),
+])
+def test_bad_requests_are_refused(values, geometry):
+    service = SolverService(workers=1)
+    with pytest.raises(ValueError):
+        service.submit(values, geometry)
+    assert service.stats()['submitted'] == 0
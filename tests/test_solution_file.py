@@ -0,0 +1,55 @@
+import numpy as np
+
+from axipns.SolutionFile import NPROP, SolutionWriter, loadSolution
+from axipns.SolutionReader import SolutionReader
+
+def block(k, neta=5):
+    return np.arange(NPROP*neta, dtype=float).reshape(NPROP, neta) + 100*k
+
+def test_writer_grows_by_chunks_and_trims_on_close(tmp_path):
+    path = str(tmp_path / "sol.npy")
+    out = SolutionWriter(path, 5, chunk=2)
+    for k in range(5):
+        out.append(block(k))
+        assert out.capacity >= out.count == k + 1
+    out.close()
+    data = loadSolution(path, mmap=False)
+    assert data.shape == (5, NPROP, 5)
+    for k in range(5):
+        assert np.array_equal(data[k], block(k))
+
+def test_writer_reopens_keeping_count_stations(tmp_path):
+    path = str(tmp_path / "sol.npy")
+    out = SolutionWriter(path, 5, chunk=2)
+    for k in range(4):
+        out.append(block(k))
+    out.close()
+
+    # as a restart does: keep the first two stations, write on from there
+    out = SolutionWriter(path, 5, count=2)
+    out.append(block(9))
+    out.close()
+    data = loadSolution(path, mmap=False)
+    assert data.shape == (3, NPROP, 5)
+    assert np.array_equal(data[1], block(1))
+    assert np.array_equal(data[2], block(9))
+
+def test_binary_output_matches_the_text_file(solve, tmp_path):
+    text = str(tmp_path / "sol.dat")
+    binary = str(tmp_path / "sol.npy")
+    solve(output=text, doprint=True)
+    run = solve(output=binary, format='binary', doprint=True)
+
+    data = loadSolution(binary)
+    reader = SolutionReader(text)
+    assert data.shape == (len(reader), NPROP, run.neta)
+    assert len(reader) > 10
+
+    # the text file prints five decimals and x to the nearest integer
+    for k in range(len(reader)):
+        assert np.allclose(data[k, 1:], reader.station(k)[1:],
+                           rtol=0, atol=6e-6)
+        assert round(data[k, 0, 0]) == reader.x[k]
+    assert np.all(np.diff(data[:, 0, 0]) >= 0)
+    assert np.all(data[-1, 0] == data[-1, 0, 0])
+    assert data[-1, 0, 0] < run.x[2]
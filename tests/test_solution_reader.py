@@ -0,0 +1,71 @@
+import os
+
+import numpy as np
+import pytest
+
+from axipns.SolutionFile import ETA, NPROP
+from axipns.SolutionReader import SolutionReader, openSolution
+
+@pytest.fixture
+def output(solve, tmp_path):
+    '''Write the test case (with some values changed) to a file'''
+    def run(name, **values):
+        path = str(tmp_path / name)
+        fmt = 'binary' if name.endswith('.npy') else 'text'
+        return solve(output=path, format=fmt, doprint=True, **values), path
+    return run
+
+@pytest.mark.parametrize('name', ['sol.dat', 'sol.npy'])
+def test_stations_are_indexed_from_either_end(output, name):
+    run, path = output(name)
+    reader = SolutionReader(path)
+    n = len(reader)
+    assert n > 10 and reader.neta == run.neta
+    assert reader.station(0).shape == (NPROP, run.neta)
+    assert np.array_equal(reader.station(-1), reader.station(n - 1))
+    assert np.array_equal(reader.property(4, -n), reader.station(0)[4])
+    for k in (n, -n - 1):
+        with pytest.raises(IndexError, match="sol"):
+            reader.station(k)
+    assert [len(col) for col in reader.frames(6, [0, 2])] == [run.neta]*2
+
+def test_stations_are_cached_least_recently_used_first(output):
+    run, path = output('sol.dat')
+    reader = SolutionReader(path, cache=2)
+    first = reader.station(0)
+    reader.station(1)
+    assert reader.station(0) is first
+    reader.station(2)
+    assert list(reader.cache) == [0, 2]
+    again = reader.station(1)
+    assert list(reader.cache) == [2, 1]
+    assert reader.station(0) is not first
+    assert np.array_equal(reader.station(0), first)
+    assert np.array_equal(reader.station(1), again)
+
+@pytest.mark.parametrize('name', ['sol.dat', 'sol.npy'])
+def test_the_eta_grid_comes_from_the_file(output, name):
+    run, path = output(name, grid='geometric', nitmax=5000)
+    reader = SolutionReader(path)
+    eta = np.asarray(run.eta[1:run.neta+1])
+    assert np.allclose(reader.eta, eta, rtol=0, atol=1e-10)
+    assert not np.allclose(reader.eta, np.linspace(0, 1, run.neta))
+    assert np.array_equal(reader.station(-1)[ETA], reader.eta)
+
+def test_a_uniform_text_file_keeps_the_original_format(output):
+    run, path = output('sol.dat')
+    with open(path) as fin:
+        assert fin.readline().startswith("Axial Location =")
+    reader = SolutionReader(path)
+    assert np.allclose(reader.eta, run.eta[1:run.neta+1], rtol=0, atol=1e-12)
+
+def test_readers_are_shared_until_the_file_changes(output):
+    run, path = output('sol.dat')
+    reader = openSolution(path)
+    assert openSolution(path) is reader
+    with open(path, 'a') as fout:
+        fout.write("Axial Location = %10.f\n" % 1.0)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+    assert not reader.current()
+    assert len(openSolution(path)) == len(reader) + 1
@@ -0,0 +1,25 @@
+def test_observers_see_the_counts_of_their_step(solve):
+    seen = []
+    solver = solve(observers=[lambda s: seen.append((s.mit, s.xstep))])
+    assert [m for m, _ in seen] == list(range(1, solver.mit + 1))
+    assert seen[-1] == (solver.mit, solver.xstep)
+
+def test_geometry_cache_holds_the_conical_stations(solve, body):
+    calls = []
+    getRadius = body.body.getRadius
+
+    def counted(x):
+        calls.append(x)
+        return getRadius(x)
+
+    body.body.getRadius = counted
+    try:
+        solver = solve('reference')
+    finally:
+        del body.body.getRadius
+    conical = solver.mit - solver.xstep
+
+    # two conical stations looked up once, then one per marching step
+    assert len(calls) == 2 + solver.xstep
+    assert conical > 100
+    assert len(solver.stations) <= 2
@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+from axipns.StationWriter import StationWriter
+
+class Broken(Exception):
+    pass
+
+def test_stations_are_written_in_order():
+    written = []
+    writer = StationWriter(written.append, 2)
+    for k in range(50):
+        writer.put(k)
+    writer.drain()
+    assert written == list(range(50))
+    writer.put(50)
+    writer.close()
+    assert written == list(range(51))
+    assert not writer.is_alive()
+
+def test_a_write_error_is_raised_on_put_drain_and_close():
+    release = threading.Event()
+    def write(k):
+        release.wait()
+        if k == 1:
+            raise Broken(k)
+    writer = StationWriter(write, 3)
+    for k in range(3):
+        writer.put(k)
+    release.set()
+    with pytest.raises(Broken):
+        writer.drain()
+    with pytest.raises(Broken):
+        writer.put(3)
+    with pytest.raises(Broken):
+        writer.close()
+    assert not writer.is_alive()
+
+def test_the_queue_keeps_draining_after_an_error():
+    written = []
+    def write(k):
+        if k == 0:
+            raise Broken(k)
+        written.append(k)
+    writer = StationWriter(write, 1)
+    writer.put(0)
+    # the failed writer never holds up a solver that is still queueing
+    with pytest.raises(Broken):
+        for k in range(1, 20):
+            writer.put(k)
+    with pytest.raises(Broken):
+        writer.close()
+    assert written == []
+
+def test_background_output_matches_direct_output(solve, tmp_path):
+    direct = tmp_path / "direct.dat"
+    background = tmp_path / "background.dat"
+    solve(output=str(direct), doprint=True)
+    run = solve(output=str(background), writer=3, doprint=True)
+    assert run.writer is None
+    assert background.read_bytes() == direct.read_bytes()
+
+def test_a_failed_station_write_stops_the_run(solve, tmp_path, monkeypatch):
+    from axipns.ArraySolver import ArraySolver
+    def write(self, st):
+        raise Broken(st.mit)
+    monkeypatch.setattr(ArraySolver, 'writeStation', write)
+    with pytest.raises(Broken):
+        solve(output=str(tmp_path / "sol.dat"), writer=3, doprint=True)
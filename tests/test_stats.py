@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+@pytest.fixture
+def runs(solve):
+    return {backend: solve(backend, stats=True)
+            for backend in ('reference', 'numpy')}
+
+@pytest.mark.parametrize('backend', ['reference', 'numpy'])
+def test_counters_follow_the_run(runs, backend):
+    run = runs[backend]
+    stats = run.stats
+    counters = stats.counters
+    assert stats.status == run.status == 'converged'
+    assert counters['conical_iterations'] + counters['marching_steps'] \
+        == run.mit
+    assert counters['marching_steps'] == run.xstep
+    # a predictor and a corrector reduction over the interior points
+    assert counters['solve_points'] == 2*(run.neta - 2)*run.mit
+    assert stats.calls['precor'] == run.mit
+    assert stats.calls['body'] == run.mit + 1
+    assert stats.times['solve'] < stats.times['precor']
+    assert stats.peak_delm > 0
+
+def test_engines_count_the_same_events(runs):
+    ref = runs['reference'].stats
+    arr = runs['numpy'].stats
+    assert ref.counters['solve_calls'] == ref.counters['solve_points']
+    assert arr.counters['solve_calls'] == 2*runs['numpy'].mit
+    for name in ('solve_points', 'betloc_activations', 'radical_hits',
+                 'conical_iterations', 'marching_steps'):
+        assert arr.counters[name] == ref.counters[name]
+    assert arr.calls['predictor'] == arr.calls['corrector'] \
+        == runs['numpy'].mit
+
+def test_stats_round_trip_through_json(runs, tmp_path):
+    stats = runs['numpy'].stats
+    path = tmp_path / "stats.json"
+    text = stats.toJSON(str(path))
+    assert json.loads(path.read_text()) == json.loads(text) == stats.asDict()
+
+def test_runs_without_stats_are_not_instrumented(solve):
+    run = solve(nitmax=5)
+    assert run.stats is None
+    assert 'body' not in vars(run)
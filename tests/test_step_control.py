@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from axipns.StepControl import StepControl
+
+def test_values_set_the_controller():
+    stepper = StepControl.fromValues({'step_safety': 0.5,
+                                      'step_growth': 1.02}, 0.0004)
+    assert stepper.safety == 0.5
+    assert stepper.growth == 1.02
+    assert stepper.dxi_min == pytest.approx(4e-6)
+    assert StepControl.fromValues({'step_dxi_min': 1e-7},
+                                  0.0004).dxi_min == 1e-7
+
+def test_limits_cover_the_wall_layer(solve):
+    # the solve clamp holds the point next to the wall sonic in x, so
+    # there the radial signal speed bounds the step
+    solver = solve()
+    u, v = solver.u[2], solver.v[2]
+    a = np.sqrt(0.4*(solver.hinf - 0.5*(u*u + v*v)))
+    assert 0 < u < 1.1*a
+    etar = 1.0/(solver.rs[2] - solver.rb[2])
+    deta = solver.eta[2] - solver.eta[1]
+    wall = deta/(abs(((solver.eta[2] - 1.0)*solver.rbx[2] -
+                      solver.eta[2]*solver.rsx[2])*etar) +
+                 etar*(abs(v) + a)/u)
+    cfl = StepControl().limits(solver)['cfl']
+    assert 0 < cfl <= wall*(1 + 1e-12)
+
+def test_fine_uniform_grid_stays_stable(solve):
+    # step control starts from the step cut to the fine spacing and
+    # follows the stable limit to the end of the body
+    solver = solve(neta=201, step_control=True, nitmax=100000)
+    assert solver.status == 'converged'
+    assert solver.x[2] > 0.99
+    counts = solver.stepper.counts()
+    assert counts.get('cfl', 0) > counts.get('dxi_min', 0)
+    steps = [step[2] for step in solver.stepper.history]
+    assert max(steps) > 10*min(steps)
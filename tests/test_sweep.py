@@ -0,0 +1,22 @@
+import numpy as np
+
+from axipns import Sweep
+from axipns.main import DEFAULTS
+
+def test_grid_combines_every_axis():
+    cases = Sweep.sweepGrid(dict(DEFAULTS), minf=[5.5, 6.0],
+                            thetas=[20.0, 22.0])
+    assert [(v['minf'], v['thetas']) for v in cases] == \
+        [(5.5, 20.0), (5.5, 22.0), (6.0, 20.0), (6.0, 22.0)]
+    assert all(v['neta'] == DEFAULTS['neta'] for v in cases)
+
+def test_pool_returns_the_rows_in_case_order():
+    cases = Sweep.sweepGrid(dict(DEFAULTS, backend='numpy'),
+                            minf=[6.0, 5.9])
+    rows = Sweep.runSweep(cases, workers=2)
+    assert [r['case'] for r in rows] == [0, 1]
+    alone = Sweep.runCase(1, cases[1])
+    assert rows[1]['status'] == alone['status'] == 'converged'
+    assert rows[1]['minf'] == 5.9
+    assert np.array_equal(rows[1]['wall_p'], alone['wall_p'])
+    assert rows[1]['nconical'] == alone['nconical']
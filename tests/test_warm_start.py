@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from axipns import Sweep
+from axipns.WarmStart import FIELDS, chooseSeed, extrapolateSeed, \
+    pathOrder, pathScales
+from axipns.main import DEFAULTS
+
+@pytest.fixture(scope='module')
+def cases():
+    return Sweep.sweepGrid(dict(DEFAULTS, backend='numpy'),
+                           minf=[6.0, 5.9, 5.95])
+
+def column(value, n=4):
+    return {name: np.full(n, float(value)) for name in FIELDS}
+
+def test_path_walks_neighbours_within_each_grid():
+    cases = [dict(DEFAULTS, minf=m, neta=n) for m, n in
+             ((6.0, 31), (5.5, 41), (5.9, 31), (6.5, 31), (5.95, 31))]
+    assert pathOrder(cases) == [2, 4, 0, 3, 1]
+
+def test_extrapolation_follows_the_line_or_gives_up():
+    p0, p1 = np.array([0.0]), np.array([1.0])
+    q0, q1 = column(1.0), column(1.5)
+    seed = extrapolateSeed(np.array([2.0]), p0, q0, p1, q1, hinf=10.0)
+    assert np.allclose(seed['p'], 2.0)
+    # too far along, the density goes negative
+    assert extrapolateSeed(np.array([-4.0]), p0, q0, p1, q1, 10.0) is None
+    assert extrapolateSeed(np.array([2.0]), p0, q0, p0, q1, 10.0) is None
+
+def test_seed_comes_from_the_nearest_case_on_the_same_grid(cases):
+    scales = pathScales(cases)
+    near, far = column(1.0), column(2.0)
+    other = dict(cases[2], neta=41)
+    assert chooseSeed(cases[2], [], scales) == (None, 'cold')
+    assert chooseSeed(cases[2], [(other, near)], scales) == (None, 'cold')
+    case = dict(cases[2], minf=5.92)
+    seed, how = chooseSeed(case, [(cases[0], far), (cases[1], near),
+                                  (cases[2], None)], scales)
+    assert how == 'warm' and seed is near
+
+def test_warm_starts_match_cold_runs_in_fewer_iterations(cases):
+    scales = pathScales(cases)
+    order = pathOrder(cases, scales)
+    cold = [Sweep.runCase(i, v) for i, v in enumerate(cases)]
+    warm = {r['case']: r for r in Sweep.runChain(order, cases, scales,
+                                                 extrapolate=True)}
+    assert [warm[i]['start'] for i in order] == \
+        ['cold', 'warm', 'extrapolated']
+    for i in range(len(cases)):
+        assert warm[i]['status'] == cold[i]['status'] == 'converged'
+        assert warm[i]['wall_p'][-1] == pytest.approx(cold[i]['wall_p'][-1],
+                                                      rel=2e-3)
+    seeded = [i for i in order if warm[i]['start'] != 'cold']
+    assert all(warm[i]['nconical'] < cold[i]['nconical']/4 for i in seeded)
+
+def test_failed_warm_start_runs_cold(cases, monkeypatch):
+    # a seed that is not a flow field diverges on its first iteration
+    def badSeed(values, solved, scales, extrapolate=False):
+        if not solved:
+            return None, 'cold'
+        return column(np.nan, values['neta'] + 1), 'warm'
+
+    monkeypatch.setattr(Sweep, 'chooseSeed', badSeed)
+    scales = pathScales(cases)
+    rows = Sweep.runChain([1, 2], cases, scales)
+    assert [r['start'] for r in rows] == ['cold', 'fallback']
+    assert rows[1]['status'] == 'converged'
+    assert np.array_equal(rows[1]['wall_p'],
+                          Sweep.runCase(2, cases[2])['wall_p'])